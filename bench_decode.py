@@ -0,0 +1,174 @@
+"""
+Benchmark: decoding a CMC listings/latest payload with a full json.loads
+versus the streaming selective decoder in utils/decode.py.
+
+Usage:
+    python bench_decode.py                               # synthetic 100-coin payload
+    python bench_decode.py --coins 5000                  # screener-sized payload
+    python bench_decode.py --fixture cmc_listings.json   # a recorded response
+    python bench_decode.py --record cmc_listings.json --coins 5000   # record one (needs CMC_API_KEY)
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.getcwd())
+
+from utils.decode import ListingStreamDecoder
+from utils.sources import CMCListingsProvider, STABLECOINS, top_gainers
+
+CHUNK_SIZE = 64 * 1024
+
+
+def synthetic_payload(coins: int) -> bytes:
+    """Build a body with the same shape and field set as listings/latest"""
+    rng = random.Random(42)
+    data = []
+    for rank in range(1, coins + 1):
+        symbol = f"C{rank}" if rank > 4 else ("BTC", "ETH", "USDT", "SOL")[rank - 1]
+        data.append({
+            "id": rank,
+            "name": f"Coin {rank}",
+            "symbol": symbol,
+            "slug": f"coin-{rank}",
+            "num_market_pairs": rng.randint(1, 10000),
+            "date_added": "2019-06-24T00:00:00.000Z",
+            "tags": ["mineable", "pow", "store-of-value", "layer-1", "defi"][: rng.randint(0, 5)],
+            "max_supply": None,
+            "circulating_supply": rng.uniform(1e6, 1e10),
+            "total_supply": rng.uniform(1e6, 1e10),
+            "infinite_supply": False,
+            "platform": None,
+            "cmc_rank": rank,
+            "self_reported_circulating_supply": None,
+            "self_reported_market_cap": None,
+            "tvl_ratio": None,
+            "last_updated": "2026-10-19T12:00:00.000Z",
+            "quote": {
+                "USD": {
+                    "price": rng.uniform(0.001, 100000),
+                    "volume_24h": rng.uniform(1e5, 1e10),
+                    "volume_change_24h": rng.uniform(-50, 50),
+                    "percent_change_1h": rng.uniform(-5, 5),
+                    "percent_change_24h": rng.uniform(-20, 20),
+                    "percent_change_7d": rng.uniform(-40, 40),
+                    "percent_change_30d": rng.uniform(-60, 60),
+                    "percent_change_60d": rng.uniform(-80, 80),
+                    "percent_change_90d": rng.uniform(-90, 90),
+                    "market_cap": rng.uniform(1e6, 1e12),
+                    "market_cap_dominance": rng.uniform(0, 50),
+                    "fully_diluted_market_cap": rng.uniform(1e6, 1e12),
+                    "tvl": None,
+                    "last_updated": "2026-10-19T12:00:00.000Z"
+                }
+            }
+        })
+    status = {
+        "timestamp": "2026-10-19T12:00:00.000Z",
+        "error_code": 0,
+        "error_message": None,
+        "elapsed": 25,
+        "credit_count": max(1, coins // 200),
+        "notice": None,
+        "total_count": 9500
+    }
+    return json.dumps({"status": status, "data": data}).encode()
+
+
+def record_payload(path: str, coins: int) -> None:
+    import requests
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    response = requests.get(
+        "https://pro-api.coinmarketcap.com/v1/cryptocurrency/listings/latest",
+        params={"start": "1", "limit": str(coins), "sort": "market_cap", "sort_dir": "desc"},
+        headers={"Accept": "application/json", "X-CMC_PRO_API_KEY": os.getenv("CMC_API_KEY", "")},
+        timeout=30
+    )
+    response.raise_for_status()
+    with open(path, "wb") as file:
+        file.write(response.content)
+    print(f"Recorded {len(response.content) / 1024:.0f} KiB to {path}")
+
+
+def decode_full(body: bytes):
+    """The old path: materialise the whole tree, then read a few fields"""
+    coins = json.loads(body)["data"]
+    result = {}
+    for field in ("percent_change_24h", "percent_change_7d", "percent_change_30d"):
+        performers = []
+        for coin in coins:
+            if coin.get("symbol") in STABLECOINS:
+                continue
+            change = coin.get("quote", {}).get("USD", {}).get(field)
+            if change is not None and change > 0:
+                performers.append((coin["symbol"], change))
+        performers.sort(key=lambda item: item[1], reverse=True)
+        result[field] = performers[:5]
+    return coins, result
+
+
+def decode_stream(body: bytes):
+    decoder = ListingStreamDecoder(CMCListingsProvider.FIELDS)
+    for start in range(0, len(body), CHUNK_SIZE):
+        decoder.feed(body[start:start + CHUNK_SIZE])
+    payload = decoder.close()
+    result = {field: top_gainers(payload.records, field) for field in ("percent_change_24h", "percent_change_7d", "percent_change_30d")}
+    return payload, result
+
+
+def measure(func, body: bytes, repeats: int):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func(body)
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    kept = func(body)
+    _, peak = tracemalloc.get_traced_memory()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    timings.sort()
+    return timings[len(timings) // 2], peak, retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--coins", type=int, default=100)
+    parser.add_argument("--fixture")
+    parser.add_argument("--record")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.record:
+        record_payload(args.record, args.coins)
+        return
+
+    if args.fixture:
+        with open(args.fixture, "rb") as file:
+            body = file.read()
+        source = args.fixture
+    else:
+        body = synthetic_payload(args.coins)
+        source = f"synthetic, {args.coins} coins"
+
+    full = decode_full(body)[1]
+    stream = decode_stream(body)[1]
+    assert full == stream, "decoders disagree"
+
+    print(f"Payload: {len(body) / 1024:.0f} KiB ({source})")
+    print(f"{'decoder':<10} {'median ms':>10} {'peak KiB':>10} {'retained KiB':>13}")
+    for name, func in (("json.loads", decode_full), ("streaming", decode_stream)):
+        median, peak, retained = measure(func, body, args.repeats)
+        print(f"{name:<10} {median * 1000:>10.2f} {peak / 1024:>10.0f} {retained / 1024:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Benchmark: resident memory of the gateway caches under the "lean" and "full"
+profiles in utils/gateway.py.
+
+Each profile runs in its own process. Synthetic GUILD_CREATE payloads are fed
+into discord.py's connection state, shaped like what Discord sends for the
+profile's intents: the full profile gets every member (as after chunking)
+with presences, the lean one only the bot's own member. A stream of message
+events then fills whatever message cache the profile keeps. Resident size is
+read before and after and reported per 1k guilds.
+
+Usage:
+    python bench_memory.py                           # 1000 guilds, 200 members each
+    python bench_memory.py --guilds 5000 --members 50
+"""
+import argparse
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+
+sys.path.append(os.getcwd())
+
+BOT_ID = 1
+
+
+def rss_bytes() -> int:
+    """Current resident set size (peak RSS where /proc isn't available)"""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def user(user_id: int) -> dict:
+    return {"id": str(user_id), "username": f"user{user_id}", "discriminator": "0", "global_name": None, "avatar": None}
+
+
+def member(user_id: int) -> dict:
+    return {"user": user(user_id), "roles": [], "joined_at": "2024-01-01T00:00:00+00:00", "deaf": False, "mute": False, "flags": 0}
+
+
+def guild_payload(guild_id: int, args, intents) -> dict:
+    channel_base = guild_id * 1000
+    member_ids = range(guild_id * 100000, guild_id * 100000 + args.members) if intents.members else ()
+    members = [member(BOT_ID)] + [member(user_id) for user_id in member_ids]
+    presences = [
+        {"user": {"id": str(user_id)}, "status": "online", "activities": [], "client_status": {"desktop": "online"}}
+        for user_id in member_ids
+    ] if intents.presences else []
+    return {
+        "id": str(guild_id),
+        "name": f"Guild {guild_id}",
+        "member_count": args.members + 1,
+        "roles": [
+            {"id": str(guild_id if index == 0 else channel_base + 900 + index), "name": f"role{index}", "permissions": "0",
+             "position": index, "color": 0, "hoist": False, "managed": False, "mentionable": False}
+            for index in range(args.roles)
+        ],
+        "channels": [
+            {"id": str(channel_base + index), "type": 0, "name": f"channel-{index}", "position": index,
+             "permission_overwrites": [], "nsfw": False, "parent_id": None}
+            for index in range(args.channels)
+        ],
+        "emojis": [
+            {"id": str(channel_base + 500 + index), "name": f"emoji{index}", "roles": [], "require_colons": True,
+             "managed": False, "animated": False, "available": True}
+            for index in range(args.emojis)
+        ],
+        "members": members,
+        "presences": presences,
+        "voice_states": [],
+        "threads": [],
+    }
+
+
+def message_payload(message_id: int, guild_id: int) -> dict:
+    return {
+        "id": str(message_id), "channel_id": str(guild_id * 1000), "guild_id": str(guild_id),
+        "author": user(guild_id * 100000), "member": {"roles": [], "joined_at": "2024-01-01T00:00:00+00:00", "deaf": False, "mute": False},
+        "content": "gm " * 40, "timestamp": "2026-10-19T12:00:00+00:00", "edited_timestamp": None, "tts": False,
+        "mention_everyone": False, "mentions": [], "mention_roles": [], "attachments": [], "embeds": [],
+        "pinned": False, "type": 0,
+    }
+
+
+def measure(profile: str, args) -> dict:
+    import discord
+    from utils.gateway import bot_options
+
+    options = bot_options(profile)
+    options.pop("shard_count", None)
+    options.pop("shard_ids", None)
+    client = discord.Client(**options)
+    state = client._connection
+    state.user = discord.ClientUser(state=state, data=user(BOT_ID))
+
+    gc.collect()
+    before = rss_bytes()
+    for guild_id in range(1, args.guilds + 1):
+        state._add_guild_from_data(guild_payload(guild_id, args, options["intents"]))
+    for index in range(args.messages):
+        if not options["intents"].guild_messages:
+            break
+        state.parse_message_create(message_payload(10**12 + index, index % args.guilds + 1))
+    gc.collect()
+    after = rss_bytes()
+
+    return {
+        "profile": profile,
+        "guilds": len(state._guilds),
+        "members": sum(len(guild._members) for guild in state._guilds.values()),
+        "messages": len(state._messages or ()),
+        "rss_mb": after / 2**20,
+        "per_1k_guilds_mb": (after - before) / 2**20 * 1000 / args.guilds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guilds", type=int, default=1000)
+    parser.add_argument("--members", type=int, default=200, help="members per guild (full profile)")
+    parser.add_argument("--channels", type=int, default=20)
+    parser.add_argument("--roles", type=int, default=10)
+    parser.add_argument("--emojis", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=5000, help="message events replayed after connecting")
+    parser.add_argument("--profile", choices=("lean", "full"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        print(json.dumps(measure(args.profile, args)))
+        return
+
+    print(f"{args.guilds} guilds, {args.members} members, {args.channels} channels, {args.roles} roles, "
+          f"{args.emojis} emojis each; {args.messages} message events\n")
+    print(f"{'profile':<8} {'members cached':>15} {'messages cached':>16} {'RSS MB':>8} {'MB / 1k guilds':>15}")
+    results = {}
+    for profile in ("full", "lean"):
+        output = subprocess.run([sys.executable, __file__, "--profile", profile, *sys.argv[1:]],
+                                capture_output=True, text=True, check=True).stdout
+        result = results[profile] = json.loads(output.strip().splitlines()[-1])
+        print(f"{profile:<8} {result['members']:>15} {result['messages']:>16} {result['rss_mb']:>8.1f} {result['per_1k_guilds_mb']:>15.1f}")
+
+    if results["full"]["per_1k_guilds_mb"] > 0:
+        saved = 1 - results["lean"]["per_1k_guilds_mb"] / results["full"]["per_1k_guilds_mb"]
+        print(f"\nlean uses {saved:.0%} less memory per guild")
+
+
+if __name__ == "__main__":
+    main()
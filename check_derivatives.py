@@ -0,0 +1,170 @@
+"""
+Check: the Binance, Bybit and OKX derivatives adapters against a local stub
+server, without touching the real exchanges.
+
+The stub (aiohttp.web) serves each exchange's endpoints under its own path
+prefix with known open interest and funding rates. Each scenario checks the
+per-exchange normalisation (OI in USD, funding in %) and the aggregated
+totals and OI-weighted funding, including an exchange that times out and one
+that answers with a 5xx.
+
+Usage:
+    python check_derivatives.py
+    python check_derivatives.py --timeout 1    # per-exchange timeout for the slow scenario
+"""
+import argparse
+import asyncio
+import math
+import os
+import sys
+
+from aiohttp import web
+
+sys.path.append(os.getcwd())
+
+from utils.derivatives import ASSETS, DerivativesProvider
+from utils.fetch import Fetcher
+from utils.health import HealthTracker
+from utils.ratelimit import RateLimiter
+
+# What each exchange reports per asset: open interest in USD and funding in % per period.
+# Binance reports OI in contracts, so the stub serves OI / mark price.
+MARKS = {"BTC": 60000.0, "ETH": 3000.0}
+EXPECTED = {
+    "binance": {"BTC": (60_000_000.0, 0.01), "ETH": (30_000_000.0, -0.005)},
+    "bybit": {"BTC": (40_000_000.0, 0.02), "ETH": (15_000_000.0, 0.01)},
+    "okx": {"BTC": (20_000_000.0, 0.005), "ETH": (5_000_000.0, 0.03)},
+}
+
+
+def stub_app(faults: dict, delay: float) -> web.Application:
+    """Stub exchange APIs; ``faults`` maps an exchange to "slow" or "error" for the current scenario"""
+
+    async def fault(exchange):
+        mode = faults.get(exchange)
+        if mode == "slow":
+            await asyncio.sleep(delay)
+        elif mode == "error":
+            raise web.HTTPInternalServerError(text="upstream error")
+
+    def asset(symbol: str) -> str:
+        return next(name for name in ASSETS if symbol.startswith(name))
+
+    async def binance_open_interest(request):
+        await fault("binance")
+        name = asset(request.query["symbol"])
+        interest, _ = EXPECTED["binance"][name]
+        return web.json_response({"symbol": request.query["symbol"], "openInterest": str(interest / MARKS[name])})
+
+    async def binance_premium_index(request):
+        await fault("binance")
+        name = asset(request.query["symbol"])
+        _, funding = EXPECTED["binance"][name]
+        return web.json_response({"symbol": request.query["symbol"], "markPrice": str(MARKS[name]), "lastFundingRate": str(funding / 100)})
+
+    async def bybit_tickers(request):
+        await fault("bybit")
+        name = asset(request.query["symbol"])
+        interest, funding = EXPECTED["bybit"][name]
+        ticker = {"symbol": request.query["symbol"], "openInterestValue": str(interest), "fundingRate": str(funding / 100)}
+        return web.json_response({"retCode": 0, "result": {"category": "linear", "list": [ticker]}})
+
+    async def okx_open_interest(request):
+        await fault("okx")
+        interest, _ = EXPECTED["okx"][asset(request.query["instId"])]
+        return web.json_response({"code": "0", "data": [{"instId": request.query["instId"], "oiUsd": str(interest)}]})
+
+    async def okx_funding_rate(request):
+        await fault("okx")
+        _, funding = EXPECTED["okx"][asset(request.query["instId"])]
+        return web.json_response({"code": "0", "data": [{"instId": request.query["instId"], "fundingRate": str(funding / 100)}]})
+
+    app = web.Application()
+    app.router.add_get("/binance/fapi/v1/openInterest", binance_open_interest)
+    app.router.add_get("/binance/fapi/v1/premiumIndex", binance_premium_index)
+    app.router.add_get("/bybit/v5/market/tickers", bybit_tickers)
+    app.router.add_get("/okx/api/v5/public/open-interest", okx_open_interest)
+    app.router.add_get("/okx/api/v5/public/funding-rate", okx_funding_rate)
+    return app
+
+
+def expected_aggregate(exchanges) -> dict:
+    """Total OI and OI-weighted funding per asset, worked out from the stub's own figures"""
+    result = {}
+    for name in ASSETS:
+        entries = [EXPECTED[exchange][name] for exchange in exchanges]
+        total = sum(interest for interest, _ in entries)
+        result[f"{name}_OI"] = total
+        result[f"{name}_FUNDING"] = sum(interest * funding for interest, funding in entries) / total
+    return result
+
+
+def close(a: float, b: float) -> bool:
+    return a is not None and math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-12)
+
+
+async def run_scenario(base: str, faults: dict, title: str, timeout: float) -> bool:
+    print(f"\n---------- {title} ----------")
+    healthy = [exchange for exchange in EXPECTED if exchange not in faults]
+    health = HealthTracker()
+    provider = DerivativesProvider(health, {exchange: f"{base}/{exchange}" for exchange in EXPECTED}, timeout=timeout)
+    # Every stub exchange shares one host, so give it room for all of them at once
+    fetcher = Fetcher(limiter=RateLimiter({"default": {"rate": 100.0, "burst": 100, "concurrency": 16}}))
+    ok = True
+    try:
+        result = await provider.fetch(fetcher)
+    finally:
+        await fetcher.close()
+
+    for exchange in EXPECTED:
+        quotes = provider.last_quotes.get(exchange)
+        if exchange in faults:
+            breaker = health.get(f"derivatives/{exchange}")
+            passed = quotes is None and breaker.failures > 0
+            print(f"{'PASS' if passed else 'FAIL'} {exchange}: left out ({faults[exchange]}), breaker failures={breaker.failures}")
+        else:
+            passed = quotes is not None and all(
+                name in quotes and close(quotes[name].open_interest, interest) and close(quotes[name].funding, funding)
+                for name, (interest, funding) in EXPECTED[exchange].items()
+            )
+            print(f"{'PASS' if passed else 'FAIL'} {exchange}: {quotes}")
+        ok &= passed
+
+    expected = expected_aggregate(healthy)
+    for metric, value in expected.items():
+        passed = close(result.get(metric), value)
+        print(f"{'PASS' if passed else 'FAIL'} {metric}: {result.get(metric)} (expected {value})")
+        ok &= passed
+    return ok
+
+
+async def main(args) -> int:
+    faults = {}
+    runner = web.AppRunner(stub_app(faults, delay=args.timeout * 3))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    base = f"http://{host}:{port}"
+
+    ok = True
+    try:
+        for scenario, title in (
+            ({}, "All exchanges answering"),
+            ({"okx": "slow"}, "OKX timing out"),
+            ({"bybit": "error"}, "Bybit returning 500"),
+        ):
+            faults.clear()
+            faults.update(scenario)
+            ok &= await run_scenario(base, scenario, title, args.timeout)
+    finally:
+        await runner.cleanup()
+
+    print(f"\n{'All checks passed' if ok else 'Some checks FAILED'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--timeout", type=float, default=0.5, help="per-exchange timeout in seconds")
+    sys.exit(asyncio.run(main(parser.parse_args())))
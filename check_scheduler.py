@@ -0,0 +1,101 @@
+"""
+Check: CycleCoordinator.run_now against cycles that are already running.
+
+A forced update (/force-update, the startup refresh) must not return before
+every key it asked for has been through a finished cycle, even when it joins
+a cycle in progress and a follow-up cycle for held keys starts right after,
+and it must report a cycle that failed.
+
+Usage:
+    python check_scheduler.py
+"""
+import asyncio
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+from utils.scheduler import CycleCoordinator
+
+
+class Recorder:
+    """Cycle function that records the keys of every cycle and takes ``duration`` seconds;
+    a cycle including a key in ``failing`` raises
+    """
+
+    def __init__(self, duration: float = 0.05, failing=()):
+        self.duration = duration
+        self.failing = set(failing)
+        self.cycles = []
+
+    async def __call__(self, keys):
+        await asyncio.sleep(self.duration)
+        self.cycles.append(sorted(keys))
+        if self.failing & set(keys):
+            raise RuntimeError("upstream down")
+
+
+def coordinator(recorder: Recorder) -> CycleCoordinator:
+    # Long interval so nothing falls due on its own while a scenario runs
+    return CycleCoordinator(recorder, lambda key: 3600, jitter=0)
+
+
+def report(title: str, passed: bool, detail) -> bool:
+    print(f"{'PASS' if passed else 'FAIL'} {title}: {detail}")
+    return passed
+
+
+async def idle() -> bool:
+    recorder = Recorder()
+    ok = await coordinator(recorder).run_now([0, 1])
+    return report("nothing running", ok and recorder.cycles == [[0, 1]], recorder.cycles)
+
+
+async def joins_running() -> bool:
+    recorder = Recorder()
+    scheduler = coordinator(recorder)
+    scheduler.trigger([1])
+    await scheduler.run_now([0, 1])
+    return report("joins the running cycle, then runs the rest", recorder.cycles == [[1], [0]], recorder.cycles)
+
+
+async def behind_held_follow_up() -> bool:
+    # A cycle is running for 1 and 2 is held: finishing it starts the follow-up for 2 only,
+    # and run_now must still get 0 and 3 updated after that
+    recorder = Recorder()
+    scheduler = coordinator(recorder)
+    scheduler.trigger([1])
+    scheduler._held.add(2)
+    ok = await scheduler.run_now([0, 1, 2, 3])
+    covered = set().union(*map(set, recorder.cycles))
+    return report("covers every key behind a held follow-up", ok and {0, 1, 2, 3} <= covered and not scheduler.running, recorder.cycles)
+
+
+async def failed_cycle() -> bool:
+    recorder = Recorder(failing={1})
+    scheduler = coordinator(recorder)
+    scheduler.trigger([1])
+    ok = await scheduler.run_now([0, 1])
+    return report("reports a failed cycle it joined", ok is False, recorder.cycles)
+
+
+async def failed_unrelated_cycle() -> bool:
+    # The held follow-up fails, but it covered none of the requested keys
+    recorder = Recorder(failing={2})
+    scheduler = coordinator(recorder)
+    scheduler.trigger([1])
+    scheduler._held.add(2)
+    ok = await scheduler.run_now([0, 1])
+    return report("ignores failures of cycles for other keys", ok is True, recorder.cycles)
+
+
+async def main() -> int:
+    ok = True
+    for scenario in (idle, joins_running, behind_held_follow_up, failed_cycle, failed_unrelated_cycle):
+        ok &= await scenario()
+    print(f"\n{'All checks passed' if ok else 'Some checks FAILED'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -1,39 +1,141 @@
-import aiohttp
-import discord, json, os, asyncio
+import discord, json, os, asyncio, time
 from discord.ext import commands, tasks
 from discord import app_commands
 from datetime import datetime, timedelta, timezone
-from bs4 import BeautifulSoup
-import re
 
 from dotenv import load_dotenv
 
 
 load_dotenv()
 COINDESK_API_KEY = os.getenv("COINDESK_API_KEY")
-COINDESK_BASE_URL = "https://data-api.coindesk.com"
 CMC_API_KEY = os.getenv("CMC_API_KEY")
-CMC_BASE_URL = "https://pro-api.coinmarketcap.com"
 import config
+from utils.alerts import ABOVE, ALERT_METRICS, BELOW, AlertEngine, AlertError
+from utils.dashboards import DashboardRegistry
+from utils.delivery import WebhookDelivery, WebhookGone
+from utils.fx import convert, currency_prefix
+from utils.ipc import SnapshotFeed
+from utils.market import MarketData
+from utils.ratelimit import INTERACTIVE, request_priority
+from utils.scheduler import CycleCoordinator
+from utils.snapshot import FALLBACK, Snapshot
+from utils.symbols import SymbolIndex
+from utils.tracing import tracer
+from utils.views import DashboardView, render_detail
+from utils import formatting as fmt
+
+# Scheduler key for the snapshot/alerts refresh (message ids are never 0)
+SNAPSHOT_KEY = 0
+# /perf-stats sections (each rendered by Dashboard.perf_<key>)
+PERF_SECTIONS = {"stages": "Timings per stage", "cycles": "Update cycles", "queues": "Outbound queues", "providers": "Provider latency", "io": "Bytes per provider", "cmc": "CMC credits"}
+# Seconds a reload's handed-over state waits for the new instance before it is closed
+HANDOFF_EXPIRY = 60
+
+
+def perf_ms(value: float) -> str:
+    return f"{value:.1f}" if value < 10 else f"{value:.0f}"
+
+
+async def expire_handoff(bot, handoff: dict) -> None:
+    """Close a handoff nobody adopted (the reload failed for good), so its sessions aren't leaked"""
+    await asyncio.sleep(HANDOFF_EXPIRY)
+    if getattr(bot, "dashboard_handoff", None) is handoff:
+        bot.dashboard_handoff = None
+        print("Dashboard handoff not adopted; closing its connections")
+        handoff["view"].stop()
+        if handoff["api"] is not None:
+            await handoff["api"].close()
+        await handoff["market"].close()
+
 
 class Dashboard(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.config_path = "./data/config.json"
-        self.config_data = self.load_config()
-        self.all_data = {}
+        # On a reload the previous instance hands over its in-memory state (see cog_unload): the
+        # snapshot and caches, open HTTP sessions, the snapshot API and the update schedule
+        handoff = getattr(bot, "dashboard_handoff", None)
+        if not isinstance(handoff, dict):
+            handoff = None
+        if handoff is not None:
+            self.config_data = handoff["config_data"]
+            self.sweep_cursor = handoff["sweep_cursor"]
+            self.market = handoff["market"]
+            self.alerts = handoff["alerts"]
+            self.symbols = handoff["symbols"]
+            self.render_cache = handoff["render_cache"]
+            self.api = handoff["api"]
+            self.delivery = handoff["delivery"]
+            self.delivery.save = self.save_config
+            # The bot's view store still maps every dashboard message to this view; keep it live
+            self.view = handoff["view"]
+            self.view.rebind(self.render_detail)
+        else:
+            self.config_data = self.load_config()
+            self.sweep_cursor = 0
+            # Market data comes from the upstream APIs in this process, or from a separate
+            # fetcher process (fetcher.py) over a local socket when SNAPSHOT_SOURCE = "ipc"
+            if getattr(config, "SNAPSHOT_SOURCE", "local") == "ipc":
+                self.market = SnapshotFeed()
+                self.market.start()
+            else:
+                self.market = MarketData(CMC_API_KEY, COINDESK_API_KEY)
+            self.alerts = AlertEngine()
+            self.symbols = SymbolIndex()
+
+            # Warm start: serve the last saved snapshot until the first fetch replaces it
+            self.market.restore_state()
+
+            # Detail views are rendered from the latest snapshot only, once per snapshot
+            self.render_cache = {}
+
+            # Optional local HTTP endpoint serving the snapshot to other services from memory
+            self.api = None
+            if getattr(config, "SNAPSHOT_API_ENABLED", False):
+                from utils.http_api import SnapshotAPI  # deferred: aiohttp.web is only needed when the API is on
+                self.api = SnapshotAPI(self.market)
+                asyncio.ensure_future(self.start_api())
+            self.delivery = WebhookDelivery(self.bot, self.config_data.setdefault("webhooks", {}), self.save_config)
+            self.view = DashboardView(self.render_detail)
+            self.bot.add_view(self.view)
+
+            # Per-stage spans of every cycle to rotating JSONL files (written off the event loop)
+            tracer.start()
+
+        self.dashboards = DashboardRegistry(self.config_data["message-ids"], self.save_dashboards)
+        self.market.listeners.append(self.clear_render_cache)
+        self.refresh_symbols_task.start()
+        self.save_state_task.change_interval(minutes=getattr(config, "STATE_SAVE_MINUTES", 5))
+        self.save_state_task.start()
+        self.webhook_mode = getattr(config, "DASHBOARD_DELIVERY", "bot") == "webhook"
         
-        # Calculate minutes for initial loop
+        # Calculate minutes for the default interval
         hours = self.config_data.get("time", 1) # Legacy support/Default
         if "minutes" not in self.config_data:
             self.config_data["minutes"] = 0
             
         # If "time" key exists, treat it as hours for compatibility, but prefer "hours" key
-        current_hours = self.config_data.get("hours", hours)
-        current_minutes = self.config_data.get("minutes", 0)
-        
-        self.update_dashboard_task.change_interval(hours=current_hours, minutes=current_minutes)
-        self.update_dashboard_task.start()
+        self.config_data["hours"] = self.config_data.get("hours", hours)
+
+        # Every dashboard is scheduled on its own interval; SNAPSHOT_KEY keeps the snapshot refreshing
+        # at the default interval even with no dashboards, as long as alerts or the snapshot API use it
+        self.coordinator = CycleCoordinator(self.update_all_dashboards, self.interval_for, before=self.bot.wait_until_ready)
+        self.coordinator.schedule(SNAPSHOT_KEY)
+        for entry in self.dashboards.entries():
+            self.coordinator.schedule(entry["message_id"])
+        if handoff is not None:
+            self.coordinator.adopt(handoff["schedule"])
+        self.coordinator.start()
+        # After a reload the snapshot is current and the schedule carried over: nothing to catch up on
+        self.warm_up_task = asyncio.ensure_future(self.warm_up()) if handoff is None else None
+        self.sweep_dashboards_task.change_interval(minutes=getattr(config, "DASHBOARD_SWEEP_MINUTES", 15))
+        self.sweep_dashboards_task.start()
+
+        # Only claimed once fully set up, so if this instance fails the old code's fallback can still adopt it
+        if handoff is not None:
+            bot.dashboard_handoff = None
+            handoff["expiry"].cancel()
+            print("Dashboard reloaded with its previous state")
 
     def load_config(self) -> dict:
         try:
@@ -66,253 +168,373 @@ class Dashboard(commands.Cog):
                 }
                 json.dump(default_data, file, indent=4)
 
-    def cog_unload(self):
-        """Clean up when cog is unloaded"""
-        self.update_dashboard_task.cancel()
+    def default_interval(self) -> int:
+        return self.config_data.get("hours", 1) * 3600 + self.config_data.get("minutes", 0) * 60 + self.config_data.get("seconds", 0)
+
+    def interval_for(self, key):
+        """Refresh interval in seconds for a dashboard (its own, else the default); None if it's gone"""
+        if key == SNAPSHOT_KEY:
+            return self.default_interval()
+        entry = self.dashboards.get(key)
+        if entry is None:
+            return None
+        return entry.get("interval") or self.default_interval()
+
+    def replace_dashboard(self, message_id, entry) -> None:
+        """Swap a registration for a re-posted/migrated one and keep it on its schedule"""
+        old = self.dashboards.get(message_id)
+        if old is not None:
+            entry = dict(entry, **{key: old[key] for key in ("interval", "currency") if old.get(key)})
+        self.dashboards.replace(message_id, entry)
+        self.coordinator.unschedule(message_id)
+        self.coordinator.schedule(entry["message_id"])
+
+    def save_dashboards(self) -> None:
+        self.config_data["message-ids"] = self.dashboards.to_list()
+        self.save_config()
+
+    async def cog_unload(self):
+        """Clean up when cog is unloaded; on a reload, hand the state to the new instance instead of closing it"""
+        reloading = getattr(self.bot, "reloading", False) is True
+        if reloading:
+            # Let an update cycle in progress finish rather than cutting its dashboards' edits short
+            await self.coordinator.wait_idle(getattr(config, "RELOAD_DRAIN_SECONDS", 10))
+            schedule = self.coordinator.handoff()
+        self.coordinator.stop()
+        if self.warm_up_task is not None:
+            self.warm_up_task.cancel()
+        self.sweep_dashboards_task.cancel()
+        self.refresh_symbols_task.cancel()
+        self.save_state_task.cancel()
+        self.market.save_state()
+        self.alerts.flush()
+        self.market.listeners.remove(self.clear_render_cache)
+        if reloading:
+            handoff = {
+                "config_data": self.config_data,
+                "sweep_cursor": self.sweep_cursor,
+                "market": self.market,
+                "alerts": self.alerts,
+                "symbols": self.symbols,
+                "render_cache": self.render_cache,
+                "api": self.api,
+                "delivery": self.delivery,
+                "view": self.view,
+                "schedule": schedule,
+            }
+            handoff["expiry"] = asyncio.ensure_future(expire_handoff(self.bot, handoff))
+            self.bot.dashboard_handoff = handoff
+            return
+        self.view.stop()
+        if self.api is not None:
+            await self.api.close()
+        await self.market.close()
+        tracer.stop()
+
+    def clear_render_cache(self, snapshot) -> None:
+        self.render_cache.clear()
+
+    @tasks.loop(minutes=15) # Changed in __init__
+    async def sweep_dashboards_task(self):
+        """Validate the next batch of registrations at a slow pace, dropping ones whose message is gone.
+        Deletions seen by the gateway are handled immediately by the listeners below; this catches the
+        rest (e.g. deleted while the bot was offline).
+        """
+        entries = [entry for entry in self.dashboards.entries() if entry.get("channel_id")]
+        if not entries:
+            return
+        batch = getattr(config, "DASHBOARD_SWEEP_BATCH", 20)
+        delay = getattr(config, "DASHBOARD_SWEEP_DELAY", 1.5)
+        start = self.sweep_cursor % len(entries)
+        chosen = entries[start:start + batch]
+        self.sweep_cursor = start + len(chosen)
+
+        for entry in chosen:
+            message_id = entry["message_id"]
+            if message_id not in self.dashboards:
+                continue
+            try:
+                channel = self.bot.get_channel(entry["channel_id"]) or await self.bot.fetch_channel(entry["channel_id"])
+                await channel.fetch_message(message_id)
+            except discord.NotFound:
+                print(f"Sweep: dashboard {message_id} no longer exists. Removing from config.")
+                self.dashboards.remove(message_id)
+            except Exception:
+                pass
+            await asyncio.sleep(delay)
+
+    @sweep_dashboards_task.before_loop
+    async def before_sweep_task(self):
+        await self.bot.wait_until_ready()
 
-    @tasks.loop(hours=1) # Default, will be changed in __init__
-    async def update_dashboard_task(self):
-        """Task loop to update dashboard messages"""
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload):
+        if self.dashboards.remove(payload.message_id):
+            print(f"Dashboard {payload.message_id} deleted. Removed from config.")
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload):
+        removed = self.dashboards.remove(*payload.message_ids)
+        if removed:
+            print(f"{removed} dashboard(s) bulk deleted. Removed from config.")
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        self.delivery.forget(channel.id)
+        removed = self.dashboards.remove_channel(channel.id)
+        if removed:
+            print(f"Channel {channel.id} deleted. Removed {removed} dashboard(s) from config.")
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        removed = self.dashboards.remove_guild(guild.id)
+        if removed:
+            print(f"Left guild {guild.id}. Removed {removed} dashboard(s) from config.")
+
+    @tasks.loop(hours=1)
+    async def refresh_symbols_task(self):
+        """Rebuild the /price symbol index from the CMC map once the saved copy is a day old"""
         try:
-            await self.update_all_dashboards()
+            await self.market.refresh_symbols(self.symbols)
         except Exception as e:
-            print(f"Error in update task: {e}")
+            print(f"Error refreshing symbol index: {e}")
 
-    @update_dashboard_task.before_loop
-    async def before_update_task(self):
-        """Wait until bot is ready before starting task"""
+    @tasks.loop(minutes=5) # Changed in __init__
+    async def save_state_task(self):
+        self.market.save_state()
+        self.alerts.flush()
+
+    async def start_api(self):
+        try:
+            await self.api.start()
+        except OSError as e:
+            print(f"Snapshot API not started: {e}")
+
+    def mark_startup(self, stage: str) -> None:
+        """Report a startup milestone to the bot's startup timer (main.DashboardBot), if it has one"""
+        mark = getattr(self.bot, "mark_startup", None)
+        if mark is not None:
+            mark(stage)
+
+    async def warm_up(self):
+        """Refresh in the background once connected, catching up dashboards that fell due while offline"""
         await self.bot.wait_until_ready()
+        stale = []
+        if self.market.snapshot is not None:
+            age = time.time() - self.market.snapshot.taken_at
+            stale = [entry["message_id"] for entry in self.dashboards.entries() if age >= self.interval_for(entry["message_id"])]
+        try:
+            if stale:
+                if not await self.coordinator.run_now([SNAPSHOT_KEY, *stale]):
+                    print("Startup refresh failed; dashboards update on their next cycle")
+                    return
+            else:
+                await self.market.get_all_data()
+            self.mark_startup("first snapshot")
+        except Exception as e:
+            print(f"Error in startup refresh: {e}")
 
-    async def update_all_dashboards(self):
-        """Update all stored dashboard messages and clean up invalid ones"""
-        if not self.config_data["message-ids"]:
+    async def update_all_dashboards(self, keys=None):
+        """Refresh the snapshot, check alerts and update the given dashboards (all if None) from it"""
+        entries = self.dashboards.entries() if keys is None else [self.dashboards.get(key) for key in keys if key in self.dashboards]
+        # Nothing to show or check; unless the snapshot API is serving it, the snapshot can wait
+        if not entries and not len(self.alerts) and self.api is None:
             return
 
-        all_data = await self.get_all_data()
-        
-        valid_messages = []
-        config_changed = False
+        with tracer.span("snapshot"):
+            snapshot = await self.market.get_all_data()
+        with tracer.span("alerts"):
+            await self.check_alerts(snapshot)
+        if not entries:
+            return
 
-        # Iterate over current entries
-        for entry in self.config_data["message-ids"]:
+        # One embed per distinct interval and currency, shared by every dashboard on it;
+        # every currency is converted from the same USD snapshot
+        embeds = {}
+        def update(entry):
+            key = (self.interval_for(entry["message_id"]) or self.default_interval(), entry.get("currency", "USD"))
+            if key not in embeds:
+                with tracer.span("render", currency=key[1]):
+                    embeds[key] = self.create_dashboard_embed(snapshot, *key)
+            return self.update_dashboard(entry, embeds[key])
+
+        shortest = min(self.interval_for(entry["message_id"]) or self.default_interval() for entry in entries)
+        try:
+            await self.coordinator.spread(entries, update, window=shortest / 2)
+        finally:
+            # One write for every channel/guild id learnt during the cycle
+            self.dashboards.flush()
+
+    async def update_dashboard(self, entry, embed):
+        """Edit one registered dashboard by id, dropping it if its message or channel is gone"""
+        message_id = entry["message_id"]
+        with tracer.span("edit", webhook=bool(entry.get("webhook"))) as span:
             try:
-                message_id = None
-                channel_id = None
-                
-                # Normalize entry
-                if isinstance(entry, int):
-                    message_id = entry
-                    # Legacy entry, will need conversion if found
-                else:
-                    message_id = entry.get("message_id")
-                    channel_id = entry.get("channel_id")
-
-                message = None
-                
-                # Strategy 1: Direct fetch if we have channel_id
-                if channel_id:
+                # Webhook dashboards are edited through their channel's webhook
+                if entry.get("webhook"):
                     try:
-                        channel = self.bot.get_channel(channel_id) or await self.bot.fetch_channel(channel_id)
-                        if channel:
-                            message = await channel.fetch_message(message_id)
-                    except discord.NotFound:
-                        pass # Message or channel gone
-                    except Exception:
-                        pass
-                
-                # Strategy 2: Exhaustive search if not found (legacy or moved)
-                if not message:
-                    for guild in self.bot.guilds:
-                        for channel in guild.text_channels:
-                            # Skip if already checked above
-                            if channel_id and channel.id == channel_id:
-                                continue
-                            
-                            try:
-                                message = await channel.fetch_message(message_id)
-                                if message:
-                                    # Found it! Update entry format
-                                    entry = {
-                                        "message_id": message.id,
-                                        "channel_id": channel.id
-                                    }
-                                    config_changed = True
-                                    break
-                            except:
-                                continue
-                        if message:
-                            break
-
-                if message:
-                    await self.update_dashboard_message(message, all_data)
-                    valid_messages.append(entry)
-                else:
-                    print(f"Message {message_id} not found. Removing from config.")
-                    config_changed = True
-                    
+                        await self.delivery.edit(entry, embed, self.view)
+                        self.mark_startup("first dashboard edit")
+                    except WebhookGone:
+                        span["outcome"] = "webhook_gone"
+                        async with self.coordinator.lock:
+                            if message_id not in self.dashboards:
+                                return
+                            recovered = await self.recover_webhook_dashboard(entry, embed)
+                            if recovered:
+                                self.replace_dashboard(message_id, recovered)
+                            else:
+                                self.dashboards.remove(message_id)
+                    return
+
+                # Legacy entry stored without a channel: find it once and store where it lives
+                if not entry.get("channel_id"):
+                    message = await self.find_legacy_dashboard(message_id)
+                    if message is None:
+                        print(f"Message {message_id} not found. Removing from config.")
+                        self.dashboards.remove(message_id)
+                        span["outcome"] = "gone"
+                        return
+                    entry = dict(entry, channel_id=message.channel.id, guild_id=message.guild.id if message.guild else None)
+                    # Backfills are written once at the end of the cycle
+                    self.dashboards.replace(message_id, entry, save=False)
+
+                # Edit by id without fetching first; passing the view also upgrades dashboards posted before it existed
+                channel = self.bot.get_channel(entry["channel_id"]) or await self.bot.fetch_channel(entry["channel_id"])
+                message = await channel.get_partial_message(message_id).edit(embed=embed, view=self.view)
+                self.mark_startup("first dashboard edit")
+
+                if self.webhook_mode:
+                    # Move bot-posted dashboards over to the channel webhook, once
+                    async with self.coordinator.lock:
+                        if message_id not in self.dashboards:
+                            return
+                        migrated = await self.migrate_to_webhook(message, embed)
+                        if migrated:
+                            self.replace_dashboard(message_id, migrated)
+                elif not entry.get("guild_id") and message.guild:
+                    self.dashboards.replace(message_id, dict(entry, guild_id=message.guild.id), save=False)
+
+            except discord.NotFound:
+                print(f"Dashboard {message_id} no longer exists. Removing from config.")
+                self.dashboards.remove(message_id)
+                span["outcome"] = "gone"
             except Exception as e:
-                print(f"Error processing entry {entry}: {e}")
-                # If error is severe, maybe don't keep it? 
-                # adhering to "filter out invalid", if we crash on it, likely bad data.
-                config_changed = True
-        
-        # Update config with only valid messages
-        if config_changed:
-            self.config_data["message-ids"] = valid_messages
-            self.save_config()
-
-    async def update_dashboard_message(self, message, all_data):
-        """Update a specific dashboard message with new data"""
-        embed = self.create_dashboard_embed(all_data)
-        await message.edit(embed=embed)
-
-    async def get_total_market_cap(self) -> str:
-        """Get total market cap value as string without symbols"""
+                # Transient or permission errors: keep the entry, the sweep drops it if it's really gone
+                print(f"Error updating dashboard {message_id}: {e}")
+                span["outcome"] = "error"
+                span["error"] = str(e)
+
+    async def find_legacy_dashboard(self, message_id):
+        """Exhaustive search across every text channel, only for entries saved before channel ids were stored"""
+        for guild in self.bot.guilds:
+            for channel in guild.text_channels:
+                try:
+                    return await channel.fetch_message(message_id)
+                except:
+                    continue
+        return None
+
+    async def recover_webhook_dashboard(self, entry, embed):
+        """Re-post a dashboard whose webhook was deleted through a freshly provisioned one; None if that fails"""
         try:
-            total_value = await self.get_total_market_cap_value()
-            if total_value > 0:
-                total_trillions = total_value / 1_000_000_000_000
-                return f"{total_trillions:.2f}T"
-            else:
-                return "Error"
+            channel = self.bot.get_channel(entry["channel_id"]) or await self.bot.fetch_channel(entry["channel_id"])
+            message = await self.delivery.post(channel, embed, self.view)
         except Exception as e:
-            print(f"Error fetching total market cap: {e}")
-            return "Error"
+            print(f"Could not recover webhook dashboard {entry['message_id']}: {e}")
+            return None
+        # The orphaned message can't be edited any more; remove it if we're allowed to
+        try:
+            await channel.get_partial_message(entry["message_id"]).delete()
+        except Exception:
+            pass
+        return {"message_id": message.id, "channel_id": channel.id, "guild_id": channel.guild.id, "webhook": True}
 
-    async def get_cmc_data(self) -> dict:
-        """Fetch prices and market cap data for BTC, ETH, SOL, USDT from CMC"""
+    async def migrate_to_webhook(self, message, embed):
+        """Replace a bot-posted dashboard with one posted through the channel webhook; None if not possible"""
         try:
-            if not CMC_API_KEY:
-                return {}
-
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{CMC_BASE_URL}/v1/cryptocurrency/quotes/latest",
-                    params={
-                        "symbol": "BTC,ETH,SOL,USDT",
-                        "convert": "USD",
-                        "CMC_PRO_API_KEY": CMC_API_KEY
-                    },
-                    headers={"Accept": "application/json"}
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        quotes = data.get("data", {})
-                        
-                        result = {}
-                        
-                        # Process BTC
-                        if "BTC" in quotes:
-                            btc_quote = quotes["BTC"]["quote"]["USD"]
-                            result["BTC_USD"] = btc_quote["price"]
-                            result["BTC_MCAP"] = btc_quote["market_cap"]
-                        
-                        # Process ETH
-                        if "ETH" in quotes:
-                            eth_quote = quotes["ETH"]["quote"]["USD"]
-                            result["ETH_USD"] = eth_quote["price"]
-                            result["ETH_MCAP"] = eth_quote["market_cap"]
-                            
-                        # Process SOL
-                        if "SOL" in quotes:
-                            sol_quote = quotes["SOL"]["quote"]["USD"]
-                            result["SOL_USD"] = sol_quote["price"]
-                        
-                        # Process USDT
-                        if "USDT" in quotes:
-                            usdt_quote = quotes["USDT"]["quote"]["USD"]
-                            result["USDT_MCAP"] = usdt_quote["market_cap"]
-                            
-                        return result
-                    else:
-                        print(f"CMC API Error: {response.status}")
-                        return {}
+            posted = await self.delivery.post(message.channel, embed, self.view)
         except Exception as e:
-            print(f"Error fetching CMC data: {e}")
-            return {}
+            print(f"Could not migrate dashboard {message.id} to a webhook: {e}")
+            return None
+        try:
+            await message.delete()
+        except Exception:
+            pass
+        channel = message.channel
+        return {"message_id": posted.id, "channel_id": channel.id, "guild_id": channel.guild.id if channel.guild else None, "webhook": True}
+
+    async def check_alerts(self, snapshot):
+        """Evaluate alerts against the snapshot and notify, one batched message per channel"""
+        triggered = self.alerts.evaluate(snapshot)
+        if not triggered:
+            return
 
-    async def get_all_data(self):
-        """Fetch all market data using CMC for core metrics"""
-        all_data = {}
+        by_channel = {}
+        for alert, value in triggered:
+            line = (f"<@{alert.user_id}> **{ALERT_METRICS[alert.metric]}** crossed {alert.direction} "
+                    f"{fmt.metric_value(alert.metric, alert.threshold)} (now {fmt.metric_value(alert.metric, value)}) • alert #{alert.id}")
+            by_channel.setdefault(alert.channel_id, []).append(line)
 
-        # 1. Fetch Core Data from CMC (Prices & Market Caps)
-        cmc_data = await self.get_cmc_data()
-        
-        # Prices
-        if "BTC_USD" in cmc_data:
-            all_data["BTC_USD"] = f"{cmc_data['BTC_USD']:,.0f}"
-        else:
-            all_data["BTC_USD"] = "Error"
-            
-        if "ETH_USD" in cmc_data:
-            all_data["ETH_USD"] = f"{cmc_data['ETH_USD']:,.0f}"
-        else:
-            all_data["ETH_USD"] = "Error"
-            
-        if "SOL_USD" in cmc_data:
-            all_data["SOL_USD"] = f"{cmc_data['SOL_USD']:.2f}"
-        else:
-            all_data["SOL_USD"] = "Error"
+        await asyncio.gather(*(self.send_alert_batch(channel_id, lines) for channel_id, lines in by_channel.items()))
 
-        # ETH/BTC Ratio
-        if "BTC_USD" in cmc_data and "ETH_USD" in cmc_data and cmc_data["BTC_USD"] > 0:
-            ratio = cmc_data["ETH_USD"] / cmc_data["BTC_USD"]
-            all_data["ETH_BTC_RATIO"] = f"{ratio:.3f}"
-        else:
-            all_data["ETH_BTC_RATIO"] = "Error"
+    async def send_alert_batch(self, channel_id, lines):
+        try:
+            channel = self.bot.get_channel(channel_id) or await self.bot.fetch_channel(channel_id)
+        except Exception as e:
+            print(f"Alert channel {channel_id} unavailable: {e}")
+            return
 
-        # 2. Total Market Cap (Keep CoinDesk as it works, or use fallback)
-        total_market_cap_val = await self.get_total_market_cap_value()
-        all_data["TOTAL2"] = await self.get_total_market_cap() # This returns formatted string
+        # Pack lines into as few messages as fit Discord's 2000 character limit
+        chunks = [[]]
+        size = 0
+        for line in lines:
+            if chunks[-1] and size + len(line) + 1 > 1900:
+                chunks.append([])
+                size = 0
+            chunks[-1].append(line)
+            size += len(line) + 1
+
+        mentions = discord.AllowedMentions(everyone=False, roles=False, users=True)
+        for chunk in chunks:
+            try:
+                await channel.send("\n".join(chunk), allowed_mentions=mentions)
+            except Exception as e:
+                print(f"Error sending alerts to channel {channel_id}: {e}")
+                return
+
+    def render_detail(self, key: str) -> discord.Embed:
+        """Embed for a dashboard detail view, built from cached data and reused until the next snapshot"""
+        if self.market.snapshot is None:
+            return discord.Embed(title="Loading", description="Market data is still loading, try again shortly.", color=0x5865F2)
+        embed = self.render_cache.get(key)
+        if embed is None:
+            embed = render_detail(key, self.market.snapshot, self.market.records, self.market.quotes)
+            self.render_cache[key] = embed
+        return embed
+
+    def create_dashboard_embed(self, snapshot: Snapshot, interval: int = None, currency: str = "USD"):
+        """Create a formatted dashboard embed with market data, money figures converted to ``currency``"""
+        requested = currency
+        snapshot, currency = convert(snapshot, requested)
+        symbol = currency_prefix(currency)
+
+        def value(metric, formatter=str, missing="Error"):
+            text = fmt.field(snapshot, metric, formatter, missing)
+            # Flag values that came from a fallback provider
+            if snapshot is not None and snapshot.is_fallback(metric):
+                text += " *"
+            return text
+
+        gainers_missing = "Error" if CMC_API_KEY else "CMC Key Missing"
 
-        # 3. Calculate Dominance (BTC & USDT) using CMC Mcap / Total Mcap
-        if total_market_cap_val > 0:
-            if "BTC_MCAP" in cmc_data:
-                btc_dom = (cmc_data["BTC_MCAP"] / total_market_cap_val) * 100
-                all_data["BTC_DOMINANCE"] = f"{btc_dom:.1f}"
-            else:
-                all_data["BTC_DOMINANCE"] = "Error"
-                
-            if "USDT_MCAP" in cmc_data:
-                usdt_dom = (cmc_data["USDT_MCAP"] / total_market_cap_val) * 100
-                all_data["USDT_DOMINANCE"] = f"{usdt_dom:.1f}"
-            else:
-                all_data["USDT_DOMINANCE"] = "Error"
-        else:
-             all_data["BTC_DOMINANCE"] = "Error"
-             all_data["USDT_DOMINANCE"] = "Error"
-        
-        # 4. Top Gainers (CMC)
-        all_data["GAINERS_24H"] = await self.get_top_gainers("24h")
-        all_data["GAINERS_7D"] = await self.get_top_gainers("7d")
-        all_data["GAINERS_30D"] = await self.get_top_gainers("30d")
-        
-        # 5. Open Interest & Funding (Using Coinalyze scraping as requested)
-        all_data["BTC_OI"] = await self.get_btc_open_interest_coinalyze()
-        all_data["ETH_OI"] = await self.get_eth_open_interest_coinalyze()
-        all_data["BTC_FUNDING"] = await self.get_btc_funding_rate_coinalyze()
-        all_data["ETH_FUNDING"] = await self.get_eth_funding_rate_coinalyze()
-
-        # 6. Sentiment (Fear & Greed, Altcoin Season)
-        fng_value, fng_class = await self.get_fear_and_greed()
-        all_data["FNG_VALUE"] = fng_value
-        all_data["FNG_CLASS"] = fng_class
-        all_data["ALT_SEASON_INDEX"] = await self.get_altcoin_season_index()
-
-        return all_data
-
-    def create_dashboard_embed(self, all_data):
-        # ... [Existing embed creation code] ...
-        # (We need to update the footer, so I'll include the method to be safe, 
-        # but replace_file_content needs exact match. 
-        # I'll effectively replace from __init__ down to where set_dashboard_time starts, 
-        # creating a large chunk but ensuring consistency.)
-        
-        """Create a formatted dashboard embed with market data"""
         current_ts = int(datetime.now(timezone.utc).timestamp())
+        description = f"**Last Updated:** <t:{current_ts}:R>\nHere's the latest overview of the market:"
+        if snapshot is not None and snapshot.restored:
+            description = f"**Last Updated:** <t:{int(snapshot.taken_at)}:R> (saved data, refreshing now)\nHere's the latest overview of the market:"
         embed = discord.Embed(
             title="Crypto Market Dashboard",
-            description=f"**Last Updated:** <t:{current_ts}:R>\nHere's the latest overview of the market:",
+            description=description,
             color=0x5865F2,  # Discord blurple color
             timestamp=datetime.now(timezone.utc)
         )
@@ -321,9 +543,9 @@ class Dashboard(commands.Cog):
         embed.add_field(
             name="Prices",
             value=f"```yaml\n"
-                  f"BTC/USD: ${all_data.get('BTC_USD', 'Loading...')}\n"
-                  f"ETH/USD: ${all_data.get('ETH_USD', 'Loading...')}\n"
-                  f"SOL/USD: ${all_data.get('SOL_USD', 'Loading...')}\n"
+                  f"BTC/{currency}: {symbol}{value('BTC_USD', fmt.money)}\n"
+                  f"ETH/{currency}: {symbol}{value('ETH_USD', fmt.money)}\n"
+                  f"SOL/{currency}: {symbol}{value('SOL_USD', fmt.decimals(2))}\n"
                   f"```",
             inline=False
         )
@@ -332,10 +554,10 @@ class Dashboard(commands.Cog):
         embed.add_field(
             name="Market Metrics",
             value=f"```yaml\n"
-                  f"BTC.D:   {all_data.get('BTC_DOMINANCE', 'Loading...')}%\n"
-                  f"USDT.D:  {all_data.get('USDT_DOMINANCE', 'Loading...')}%\n"
-                  f"ETH/BTC: {all_data.get('ETH_BTC_RATIO', 'Loading...')}\n"
-                  f"TOTAL2:  ${all_data.get('TOTAL2', 'Loading...')}\n"
+                  f"BTC.D:   {value('BTC_DOMINANCE', fmt.decimals(1))}%\n"
+                  f"USDT.D:  {value('USDT_DOMINANCE', fmt.decimals(1))}%\n"
+                  f"ETH/BTC: {value('ETH_BTC_RATIO', fmt.decimals(3))}\n"
+                  f"TOTAL2:  {symbol}{value('TOTAL_MCAP', fmt.trillions)}\n"
                   f"```",
             inline=False
         )
@@ -344,8 +566,8 @@ class Dashboard(commands.Cog):
         embed.add_field(
             name="Open Interest",
             value=f"```yaml\n"
-                  f"BTC: ${all_data.get('BTC_OI', 'Loading...')}\n"
-                  f"ETH: ${all_data.get('ETH_OI', 'Loading...')}\n"
+                  f"BTC: {symbol}{value('BTC_OI', fmt.billions, 'N/A')}\n"
+                  f"ETH: {symbol}{value('ETH_OI', fmt.billions, 'N/A')}\n"
                   f"```",
             inline=True
         )
@@ -354,8 +576,8 @@ class Dashboard(commands.Cog):
         embed.add_field(
             name="Funding Rates",
             value=f"```yaml\n"
-                  f"BTC: {all_data.get('BTC_FUNDING', 'Loading...')}%\n"
-                  f"ETH: {all_data.get('ETH_FUNDING', 'Loading...')}\n"
+                  f"BTC: {value('BTC_FUNDING', fmt.decimals(3), 'N/A')}%\n"
+                  f"ETH: {value('ETH_FUNDING', fmt.decimals(3), 'N/A')}\n"
                   f"```",
             inline=True
         )
@@ -364,8 +586,8 @@ class Dashboard(commands.Cog):
         embed.add_field(
             name="Sentiment",
             value=f"```yaml\n"
-                  f"Fear & Greed: {all_data.get('FNG_VALUE', 'Loading...')} ({all_data.get('FNG_CLASS', 'Loading...')})\n"
-                  f"Altseason:    {all_data.get('ALT_SEASON_INDEX', 'Loading...')}\n"
+                  f"Fear & Greed: {value('FNG_VALUE')} ({value('FNG_CLASS')})\n"
+                  f"Altseason:    {value('ALT_SEASON_INDEX')}\n"
                   f"```",
             inline=False
         )
@@ -373,29 +595,29 @@ class Dashboard(commands.Cog):
         # Best Performers
         embed.add_field(
             name="Best Performers (24h)",
-            value=f"```\n{all_data.get('GAINERS_24H', 'Loading...')}\n```",
+            value=f"```\n{value('GAINERS_24H', fmt.gainers, gainers_missing)}\n```",
             inline=True
         )
         embed.add_field(
             name="Best Performers (7d)",
-            value=f"```\n{all_data.get('GAINERS_7D', 'Loading...')}\n```",
+            value=f"```\n{value('GAINERS_7D', fmt.gainers, gainers_missing)}\n```",
             inline=True
         )
         embed.add_field(
             name="Best Performers (30d)",
-            value=f"```\n{all_data.get('GAINERS_30D', 'Loading...')}\n```",
+            value=f"```\n{value('GAINERS_30D', fmt.gainers, gainers_missing)}\n```",
             inline=False
         )
 
 
-        h = self.config_data.get("hours", 1)
-        m = self.config_data.get("minutes", 0)
-        time_str = []
-        if h > 0: time_str.append(f"{h}h")
-        if m > 0: time_str.append(f"{m}m")
-        update_str = " ".join(time_str) if time_str else "0m"
+        update_str = fmt.duration(interval or self.default_interval())
 
-        embed.set_footer(text=f"Updates every {update_str}")
+        footer = f"Updates every {update_str}"
+        if snapshot is not None and any(field.status == FALLBACK for field in snapshot.fields.values()):
+            footer += " • * = fallback source"
+        if currency != requested and snapshot is not None:
+            footer += f" • {requested} rate unavailable, showing USD"
+        embed.set_footer(text=footer)
 
         return embed
 
@@ -412,33 +634,199 @@ class Dashboard(commands.Cog):
                 except: pass
         else:
             await interaction.response.send_message("Access Denied", ephemeral=True)
-        
+
+    @app_commands.command(name="perf-stats", description="Admin command to show p50/p95/p99 timings per update stage.")
+    @app_commands.describe(section="What to show (default: timings per stage)")
+    @app_commands.choices(section=[app_commands.Choice(name=label, value=key) for key, label in PERF_SECTIONS.items()])
+    async def perf_stats(self, interaction: discord.Interaction, section: str = "stages"):
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("Access Denied", ephemeral=True)
+            return
+        lines, footer = getattr(self, f"perf_{section}")()
+        if not lines:
+            await interaction.response.send_message(footer, ephemeral=True)
+            return
+        table = "\n".join(lines)
+        if len(table) > 4000:
+            table = table[:table.rfind("\n", 0, 4000)] + "\n..."
+        embed = discord.Embed(title=f"Performance: {PERF_SECTIONS[section]}", description=f"```\n{table}\n```", color=0x5865F2)
+        embed.set_footer(text=footer)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    def perf_stages(self):
+        """/perf-stats table of span timings per stage: (lines, footer)"""
+        summary = tracer.summary()
+        if not summary:
+            return [], "No timings recorded yet."
+
+        # Whole cycle first, then its stages in the order they run
+        order = ("cycle", "snapshot", "fetch", "provider:", "http:", "parse:", "alerts", "render", "edit")
+        def rank(stage):
+            return next((index for index, prefix in enumerate(order) if stage == prefix or (prefix.endswith(":") and stage.startswith(prefix))), len(order)), stage
+
+        lines = [f"{'stage':<26}{'n':>4}{'p50':>7}{'p95':>7}{'p99':>7}{'err':>4}"]
+        for stage in sorted(summary, key=rank):
+            stats = summary[stage]
+            lines.append(f"{stage[:26]:<26}{stats['count']:>4}{perf_ms(stats['p50']):>7}{perf_ms(stats['p95']):>7}{perf_ms(stats['p99']):>7}{stats['errors']:>4}")
+        return lines, f"Milliseconds over the last {tracer.samples} samples per stage"
+
+    def perf_cycles(self):
+        """/perf-stats scheduler counters: cycles run, overruns, held keys and cycle durations"""
+        stats = self.coordinator.stats()
+        def seconds(value):
+            return f"{value:.1f}s" if value is not None else "n/a"
+        next_due = stats["next_due"]
+        rows = (
+            ("scheduled", stats["scheduled"]),
+            ("cycles", stats["cycles"]),
+            ("overruns", stats["overruns"]),
+            ("running", "yes" if stats["running"] else "no"),
+            ("held", stats["held"]),
+            ("last", seconds(stats["last_duration"])),
+            ("p95", seconds(stats["p95_duration"])),
+            ("next due in", seconds(max(0.0, next_due - time.time()) if next_due is not None else None)),
+        )
+        lines = [f"{name:<14}{value:>8}" for name, value in rows]
+        return lines, "Overruns: dashboards that fell due again while their previous update was still running"
+
+    def perf_queues(self):
+        """/perf-stats per-host rate limiter state: waits for a request slot, queue depth, blocks"""
+        fetcher = getattr(self.market, "fetcher", None)
+        if fetcher is None:
+            return [], "Upstream requests are made by the fetcher process; see wait_ms in its trace file."
+        stats = fetcher.limiter.stats()
+        if not stats:
+            return [], "No outbound requests yet."
+        lines = [f"{'host':<24}{'act':>4}{'que':>4}{'p50':>7}{'p95':>7}{'max':>7}{'blk':>5}"]
+        for host, host_stats in sorted(stats.items()):
+            lines.append(
+                f"{host[:24]:<24}{host_stats['active']:>4}{host_stats['queued']:>4}"
+                f"{perf_ms(host_stats['wait_p50'] * 1000):>7}{perf_ms(host_stats['wait_p95'] * 1000):>7}"
+                f"{perf_ms(host_stats['wait_max'] * 1000):>7}{host_stats['blocked_for']:>5.0f}"
+            )
+        return lines, "Slot waits in milliseconds over the last 500 requests per host; blk = seconds still blocked by Retry-After"
+
+    def perf_providers(self):
+        """/perf-stats provider call latencies and the delay after which each one is hedged"""
+        registry = getattr(self.market, "registry", None)
+        if registry is None:
+            return [], "Providers are called by the fetcher process; see provider:<name> spans in its trace file."
+        summary = registry.latency_summary()
+        if not any(stats["samples"] for stats in summary.values()):
+            return [], "No provider calls yet."
+        lines = [f"{'provider':<24}{'n':>5}{'p50':>7}{'p95':>7}{'hedge':>7}"]
+        for name, stats in sorted(summary.items()):
+            if not stats["samples"]:
+                continue
+            hedge = perf_ms(stats["hedge_after"] * 1000) if stats["hedge_after"] is not None else "-"
+            lines.append(f"{name[:24]:<24}{stats['samples']:>5}{perf_ms(stats['p50'] * 1000):>7}{perf_ms(stats['p95'] * 1000):>7}{hedge:>7}")
+        return lines, f"Milliseconds per call; hedge = wait before racing the next provider (- until {registry.hedge_min_samples} samples or hedging is off)"
+
+    def perf_io(self):
+        """/perf-stats bytes transferred and saved per provider, last fetch cycle and since start"""
+        fetcher = getattr(self.market, "fetcher", None)
+        if fetcher is None:
+            return [], "Upstream requests are made by the fetcher process; see its per-cycle log lines."
+        io = fetcher.io
+        if not io.totals:
+            return [], "No outbound requests yet."
+        def kib(value):
+            return f"{value / 1024:.1f}"
+        lines = [f"{'provider':<20}{'req':>4}{'KiB':>7}{'total':>7}{'KiB':>8}{'saved':>8}{'304':>5}"]
+        rows = sorted(io.totals.items())
+        rows.append(("all", {field: sum(stats[field] for stats in io.totals.values()) for field in io.FIELDS}))
+        last_all = {field: sum(stats[field] for stats in io.last_cycle.values()) for field in io.FIELDS}
+        for name, total in rows:
+            last = last_all if name == "all" else io.last_cycle.get(name, dict.fromkeys(io.FIELDS, 0))
+            saved = total["saved_compression"] + total["saved_conditional"]
+            lines.append(
+                f"{name[:20]:<20}{last['requests']:>4}{kib(last['wire_bytes']):>7}"
+                f"{total['requests']:>7}{kib(total['wire_bytes']):>8}{kib(saved):>8}{total['not_modified']:>5}"
+            )
+        return lines, "req/KiB: last fetch cycle; total/KiB/saved/304: since start. saved = compression + conditional requests"
+
+    def perf_cmc(self):
+        """/perf-stats CMC credit budget: usage this period, pressure, current slowdown and calls per endpoint"""
+        budget = getattr(self.market, "cmc_budget", None)
+        if budget is None:
+            return [], "CMC credits are tracked by the fetcher process; see data/cmc_usage.json."
+        stats = budget.summary()
+        rows = [
+            ("used", f"{stats['used']}/{stats['limit']}"),
+            ("period", stats["period"]),
+            ("pressure", f"{stats['pressure']:.2f}"),
+            ("slowdown", f"x{stats['slowdown']:.2f}"),
+        ]
+        rows += [(f"calls {endpoint}", count) for endpoint, count in sorted(stats["calls"].items())]
+        lines = [f"{name[:22]:<22}{value:>12}" for name, value in rows]
+        return lines, "Pressure: spend rate against an even spread over the period; slowdown stretches CMC refreshes to match"
+
     @app_commands.command(name="dashboard", description="Admin command to display market dashboard.")
-    async def dashboard(self, interaction: discord.Interaction):
+    @app_commands.describe(currency="Currency for prices, market caps and open interest (default USD)")
+    @app_commands.choices(currency=[app_commands.Choice(name=currency, value=currency) for currency in getattr(config, "DASHBOARD_CURRENCIES", ("USD",))])
+    async def dashboard(self, interaction: discord.Interaction, currency: str = "USD"):
         if interaction.user.guild_permissions.administrator:
             try:
                 await interaction.response.defer()
-                
-                all_data = await self.get_all_data()
-                embed = self.create_dashboard_embed(all_data)
+                request_priority.set(INTERACTIVE)
+
+                # Progressive mode: post once the core fields are in, with placeholders for the rest
+                fetch, partial = self.market.start_fetch()
+                snapshot = None
+                if self.market.snapshot is not None and self.market.snapshot.restored:
+                    # Warm start: answer from the restored snapshot (marked with its age) right away
+                    snapshot = self.market.snapshot
+                elif getattr(config, "PROGRESSIVE_DASHBOARD", True):
+                    await asyncio.wait((fetch, partial), return_when=asyncio.FIRST_COMPLETED)
+                    if not fetch.done():
+                        snapshot = partial.result()
+                complete = snapshot is None
+                if complete:
+                    snapshot = await asyncio.shield(fetch)
+                with tracer.span("render", currency=currency):
+                    embed = self.create_dashboard_embed(snapshot, currency=currency)
 
-                message = await interaction.followup.send(embed=embed)
+                message = None
+                via_webhook = False
+                if self.webhook_mode:
+                    try:
+                        message = await self.delivery.post(interaction.channel, embed, self.view)
+                        via_webhook = True
+                    except Exception as e:
+                        print(f"Webhook delivery unavailable in channel {interaction.channel_id}, posting as the bot: {e}")
+                    if via_webhook:
+                        # The deferred response is public (the bot fallback posts through it); the webhook
+                        # message is the answer, so drop it instead of leaving a reply next to the dashboard
+                        try:
+                            await interaction.delete_original_response()
+                        except Exception:
+                            pass
+                if message is None:
+                    message = await interaction.followup.send(embed=embed, view=self.view)
+
+                # Store message, channel and guild id for reliable updates
+                entry = {"message_id": message.id, "channel_id": message.channel.id, "guild_id": interaction.guild_id}
+                if via_webhook:
+                    entry["webhook"] = True
+                if currency != "USD":
+                    entry["currency"] = currency
+                if self.dashboards.add(entry):
+                    self.coordinator.schedule(message.id)
+
+                # One follow-up edit once the slower sources finish or time out
+                if not complete:
+                    try:
+                        snapshot = await asyncio.wait_for(asyncio.shield(fetch), timeout=getattr(config, "PROGRESSIVE_FILL_TIMEOUT", 20))
+                    except Exception:
+                        # Timed out or failed: show what arrived and mark the rest as errors
+                        snapshot = self.market.progress_snapshot(final=True)
+                    try:
+                        with tracer.span("render", currency=currency):
+                            embed = self.create_dashboard_embed(snapshot, currency=currency)
+                        await message.edit(embed=embed, view=self.view)
+                    except Exception as e:
+                        print(f"Error completing dashboard {message.id}: {e}")
 
-                # Store message and channel id for reliable updates
-                entry = {"message_id": message.id, "channel_id": message.channel.id}
-                
-                # Check for duplicates more robustly (handle both formats)
-                exists = False
-                for existing in self.config_data["message-ids"]:
-                    if isinstance(existing, int):
-                         if existing == message.id: exists = True
-                    elif isinstance(existing, dict):
-                         if existing.get("message_id") == message.id: exists = True
-                
-                if not exists:
-                    self.config_data["message-ids"].append(entry)
-                    self.save_config()
-                    
             except Exception as e:
                 print(f"Error in dashboard command: {e}")
                 try:
@@ -449,35 +837,129 @@ class Dashboard(commands.Cog):
         else:
              await interaction.response.send_message("Access Denied", ephemeral=True)
     
+    @app_commands.command(name="price", description="Look up the price of any coin.")
+    @app_commands.describe(symbol="Symbol or name, e.g. BTC or Bitcoin")
+    async def price(self, interaction: discord.Interaction, symbol: str):
+        if not CMC_API_KEY and isinstance(self.market, MarketData):
+            await interaction.response.send_message("Price lookups need a CMC API key.", ephemeral=True)
+            return
+        coin_id = self.symbols.resolve(symbol)
+        if coin_id is None:
+            await interaction.response.send_message(f"No coin found for `{symbol}`.", ephemeral=True)
+            return
+        try:
+            await interaction.response.defer()
+            request_priority.set(INTERACTIVE)
+            record, fetched_at = await self.market.quote(coin_id)
+            if record is None:
+                await interaction.followup.send(f"No price available for {self.symbols.label(coin_id)}.", ephemeral=True)
+                return
+
+            embed = discord.Embed(title=f"{record.name} ({record.symbol})", color=0x5865F2)
+            embed.add_field(name="Price", value=f"${fmt.price(record.price)}" if record.price is not None else "N/A", inline=True)
+            embed.add_field(name="24h", value=fmt.change(record.percent_change_24h) if record.percent_change_24h is not None else "N/A", inline=True)
+            embed.add_field(name="7d", value=fmt.change(record.percent_change_7d) if record.percent_change_7d is not None else "N/A", inline=True)
+            embed.add_field(name="Market Cap", value=f"${fmt.money(record.market_cap)}" if record.market_cap else "N/A", inline=True)
+            embed.add_field(name="Rank", value=f"#{record.rank}" if record.rank else "N/A", inline=True)
+            embed.set_footer(text=f"CoinMarketCap • as of {int(time.time() - fetched_at)}s ago")
+            await interaction.followup.send(embed=embed)
+        except Exception as e:
+            print(f"Error in price command: {e}")
+            try:
+                await interaction.followup.send("Error fetching price. Please try again.", ephemeral=True)
+            except:
+                pass
+
+    @price.autocomplete("symbol")
+    async def price_autocomplete(self, interaction: discord.Interaction, current: str):
+        return [
+            app_commands.Choice(name=self.symbols.label(coin_id), value=str(coin_id))
+            for coin_id in self.symbols.search(current)
+        ]
+
+    @app_commands.command(name="alert", description="Get pinged when a price or dominance crosses a threshold.")
+    @app_commands.describe(metric="What to watch", threshold="Value to cross", direction="Defaults to the side of the current value the threshold is on")
+    @app_commands.choices(
+        metric=[app_commands.Choice(name=label, value=metric) for metric, label in ALERT_METRICS.items()],
+        direction=[app_commands.Choice(name="Crosses above", value=ABOVE), app_commands.Choice(name="Crosses below", value=BELOW)]
+    )
+    async def alert(self, interaction: discord.Interaction, metric: str, threshold: float, direction: str = None):
+        try:
+            current = self.market.snapshot.value(metric) if self.market.snapshot is not None else None
+            alert = self.alerts.add(interaction.user.id, interaction.channel_id, metric, threshold, direction, current)
+            await interaction.response.send_message(
+                f"Alert #{alert.id} set: **{ALERT_METRICS[metric]}** crosses {alert.direction} {fmt.metric_value(metric, alert.threshold)}.",
+                ephemeral=True
+            )
+        except AlertError as e:
+            await interaction.response.send_message(str(e), ephemeral=True)
+        except Exception as e:
+            print(f"Error in alert command: {e}")
+            try:
+                await interaction.response.send_message("Error creating alert. Please try again.", ephemeral=True)
+            except:
+                pass
+
+    @app_commands.command(name="alerts", description="List your active alerts.")
+    async def list_alerts(self, interaction: discord.Interaction):
+        alerts = self.alerts.for_user(interaction.user.id)
+        if not alerts:
+            await interaction.response.send_message("You have no active alerts.", ephemeral=True)
+            return
+        lines = [f"#{alert.id}: {ALERT_METRICS[alert.metric]} {alert.direction} {fmt.metric_value(alert.metric, alert.threshold)}" for alert in alerts]
+        embed = discord.Embed(title="Your Alerts", description="\n".join(lines), color=0x5865F2)
+        embed.set_footer(text=f"{len(alerts)}/{self.alerts.per_user} used")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="alert-remove", description="Remove one of your alerts.")
+    async def alert_remove(self, interaction: discord.Interaction, alert_id: int):
+        try:
+            alert = self.alerts.remove(interaction.user.id, alert_id)
+            await interaction.response.send_message(f"Removed alert #{alert.id}.", ephemeral=True)
+        except AlertError as e:
+            await interaction.response.send_message(str(e), ephemeral=True)
+
     @app_commands.command(name="set-dashboard-time", description="Admin command to set dashboard update delay time.")
-    async def set_dashboard_time(self, interaction: discord.Interaction, hours: int = 0, minutes: int = 0):
+    @app_commands.describe(this_channel="Only change dashboards in this channel (otherwise sets the default for all)")
+    async def set_dashboard_time(self, interaction: discord.Interaction, hours: int = 0, minutes: int = 0, seconds: int = 0, this_channel: bool = False):
         if interaction.user.guild_permissions.administrator:
             try:
-                if hours < 0 or minutes < 0:
+                if hours < 0 or minutes < 0 or seconds < 0:
                      await interaction.response.send_message("Time values cannot be negative.", ephemeral=True)
                      return
-                
-                if hours == 0 and minutes == 0:
-                    await interaction.response.send_message("Update interval cannot be zero. Please specify at least 1 minute.", ephemeral=True)
+
+                interval = hours * 3600 + minutes * 60 + seconds
+                minimum = getattr(config, "MIN_DASHBOARD_INTERVAL", 30)
+                if interval < minimum:
+                    await interaction.response.send_message(f"Update interval must be at least {minimum} seconds.", ephemeral=True)
                     return
-                
-                self.config_data["hours"] = hours
-                self.config_data["minutes"] = minutes
-                self.save_config()
-                
-                # Restart the task with new timing
-                self.update_dashboard_task.cancel()
-                # await asyncio.sleep(1) # Not strictly necessary if we just restart, chance of slight race but ok
-                self.update_dashboard_task.change_interval(hours=hours, minutes=minutes)
-                self.update_dashboard_task.start()
-                
-                time_str = []
-                if hours > 0: time_str.append(f"{hours} hours")
-                if minutes > 0: time_str.append(f"{minutes} minutes")
-                
+
+                # Only the affected dashboards are rescheduled; nothing is restarted
+                if this_channel:
+                    changed = 0
+                    for message_id in list(self.dashboards.by_channel.get(interaction.channel_id, ())):
+                        self.dashboards.replace(message_id, dict(self.dashboards.get(message_id), interval=interval), save=False)
+                        self.coordinator.schedule(message_id)
+                        changed += 1
+                    self.dashboards.flush()
+                    if not changed:
+                        await interaction.response.send_message("There are no dashboards in this channel.", ephemeral=True)
+                        return
+                    description = f"{changed} dashboard(s) in this channel will now update every **{fmt.duration(interval)}**."
+                else:
+                    self.config_data["hours"], rest = divmod(interval, 3600)
+                    self.config_data["minutes"] = rest // 60
+                    self.config_data["seconds"] = rest % 60
+                    self.save_config()
+                    self.coordinator.schedule(SNAPSHOT_KEY)
+                    for entry in self.dashboards.entries():
+                        if not entry.get("interval"):
+                            self.coordinator.schedule(entry["message_id"])
+                    description = f"Dashboards will now update every **{fmt.duration(interval)}** (channels with their own interval keep it)."
+
                 embed = discord.Embed(
                     title="Dashboard Time Updated",
-                    description=f"Dashboard will now update every **{' '.join(time_str)}**.",
+                    description=description,
                     color=discord.Color.green()
                 )
                 await interaction.response.send_message(embed=embed)
@@ -490,720 +972,17 @@ class Dashboard(commands.Cog):
         else:
             await interaction.response.send_message("Access Denied", ephemeral=True)
 
-
-    async def get_btc_price(self) -> str:
-        """Get BTC price as string without symbols"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    "https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd"
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if "bitcoin" in data and "usd" in data["bitcoin"]:
-                            return f"{data['bitcoin']['usd']:,.0f}"
-                        else:
-                            return "Error"
-                    else:
-                        return "Error"
-        except Exception as e:
-            print(f"Error fetching BTC price: {e}")
-            return "Error"
-
-    async def get_eth_price(self) -> str:
-        """Get ETH price as string without symbols"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    "https://api.coingecko.com/api/v3/simple/price?ids=ethereum&vs_currencies=usd"
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if "ethereum" in data and "usd" in data["ethereum"]:
-                            return f"{data['ethereum']['usd']:,.0f}"
-                        else:
-                            return "Error"
-                    else:
-                        return "Error"
-        except Exception as e:
-            print(f"Error fetching ETH price: {e}")
-            return "Error"
-
-    async def get_sol_price(self) -> str:
-        """Get SOL price as string without symbols"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    "https://api.coingecko.com/api/v3/simple/price?ids=solana&vs_currencies=usd"
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if "solana" in data and "usd" in data["solana"]:
-                            return f"{data['solana']['usd']:.2f}"
-                        else:
-                            return "Error"
-                    else:
-                        return "Error"
-        except Exception as e:
-            print(f"Error fetching SOL price: {e}")
-            return "Error"
-
-    async def get_btc_market_cap(self) -> float:
-        """Get BTC market cap as float value"""
-        try:
-            data = await self.get_cmc_data()
-            if "BTC_MCAP" in data:
-                return data["BTC_MCAP"]
-            return 0
-        except Exception as e:
-            print(f"Error fetching BTC market cap: {e}")
-            return 0
-
-    async def get_usdt_market_cap(self) -> float:
-        """Get USDT market cap as float value"""
-        try:
-            data = await self.get_cmc_data()
-            if "USDT_MCAP" in data:
-                return data["USDT_MCAP"]
-            return 0
-        except Exception as e:
-            print(f"Error fetching USDT market cap: {e}")
-            return 0
-
-    async def get_total_market_cap_value(self) -> float:
-        """Get total market cap as float value for calculations"""
-        try:
-            if not CMC_API_KEY:
-                return 0
-
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{CMC_BASE_URL}/v1/global-metrics/quotes/latest",
-                    headers={
-                        "Accept": "application/json",
-                        "X-CMC_PRO_API_KEY": CMC_API_KEY
-                    }
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        quote = data.get("data", {}).get("quote", {}).get("USD", {})
-                        return float(quote.get("total_market_cap", 0))
-                    else:
-                        print(f"CMC Global API Error: {response.status}")
-                        return 0
-        except Exception as e:
-            print(f"Error fetching total market cap value: {e}")
-            return 0
-
-    async def get_btc_dominance(self) -> str:
-        """Get BTC dominance as string without symbols"""
-        try:
-            btc_market_cap = await self.get_btc_market_cap()
-            total_value = await self.get_total_market_cap_value()
-            
-            if btc_market_cap != 0 and total_value > 0:
-                btc_dominance = (btc_market_cap / total_value) * 100
-                return f"{btc_dominance:.1f}"
-            else:
-                return "Error"
-        except Exception as e:
-            print(f"Error calculating BTC dominance: {e}")
-            return "Error"
-
-    async def get_usdt_dominance(self) -> str:
-        """Get USDT dominance as string without symbols"""
-        try:
-            usdt_market_cap = await self.get_usdt_market_cap()
-            total_value = await self.get_total_market_cap_value()
-            
-            if usdt_market_cap != 0 and total_value > 0:
-                usdt_dominance = (usdt_market_cap / total_value) * 100
-                return f"{usdt_dominance:.1f}"
-            else:
-                return "Error"
-        except Exception as e:
-            print(f"Error calculating USDT dominance: {e}")
-            return "Error"
-
-    async def get_eth_btc_ratio(self) -> str:
-        """Get ETH/BTC ratio as string without symbols"""
-        try:
-            btc_price_str = await self.get_btc_price()
-            eth_price_str = await self.get_eth_price()
-            
-            if btc_price_str != "Error" and eth_price_str != "Error":
-                btc_price = float(btc_price_str.replace(",", ""))
-                eth_price = float(eth_price_str.replace(",", ""))
-                ratio = eth_price / btc_price
-                return f"{ratio:.3f}"
-            else:
-                return "Error"
-        except Exception as e:
-            print(f"Error calculating ETH/BTC ratio: {e}")
-            return "Error"
-
-    async def get_btc_open_interest(self) -> str:
-        """Get BTC open interest as string without symbols"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{COINDESK_BASE_URL}/futures/v1/latest/open-interest/tick",
-                    params={
-                        "market": "bitmex",
-                        "instruments": "XRP-USD-QUANTO-PERPETUAL",
-                        "apply_mapping": "true",
-                        "api_key": COINDESK_API_KEY
-                    },
-                    headers={"Content-Type": "application/json; charset=UTF-8"}
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        if "Data" in data and isinstance(data["Data"], dict):
-                            if "XRP-USD-QUANTO-PERPETUAL" in data["Data"]:
-                                xrp_data = data["Data"]["XRP-USD-QUANTO-PERPETUAL"]
-                                if "VALUE_QUOTE" in xrp_data:
-                                    btc_oi = float(xrp_data["VALUE_QUOTE"]) * 0.1  # Scale down XRP to approximate BTC
-                                    btc_oi_billions = btc_oi / 1_000_000_000
-                                    return f"{btc_oi_billions:.1f}B"
-                        
-                        return "11.2B"  # Fallback value
-                    else:
-                        return "11.2B"  # Fallback value
-        except Exception as e:
-            print(f"Error fetching BTC open interest: {e}")
-            return "11.2B"  # Fallback value
-
-    async def get_eth_open_interest(self) -> str:
-        """Get ETH open interest as string without symbols"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{COINDESK_BASE_URL}/futures/v1/latest/open-interest/tick",
-                    params={
-                        "market": "bitmex",
-                        "instruments": "ETH-USD-QUANTO-PERPETUAL",
-                        "apply_mapping": "true",
-                        "api_key": COINDESK_API_KEY
-                    },
-                    headers={"Content-Type": "application/json; charset=UTF-8"}
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        if "Data" in data and isinstance(data["Data"], dict):
-                            if "ETH-USD-QUANTO-PERPETUAL" in data["Data"]:
-                                eth_data = data["Data"]["ETH-USD-QUANTO-PERPETUAL"]
-                                if "VALUE_QUOTE" in eth_data:
-                                    eth_oi = float(eth_data["VALUE_QUOTE"])
-                                    eth_oi_billions = eth_oi / 1_000_000_000
-                                    return f"{eth_oi_billions:.1f}B"
-                        
-                        return "5.8B"  # Fallback value
-                    else:
-                        return "5.8B"  # Fallback value
-        except Exception as e:
-            print(f"Error fetching ETH open interest: {e}")
-            return "5.8B"  # Fallback value
-
-    async def get_btc_funding_rate(self) -> str:
-        """Get BTC funding rate as string without symbols"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{COINDESK_BASE_URL}/futures/v1/latest/funding-rate/tick",
-                    params={
-                        "market": "bitmex",
-                        "instruments": "BTC-USD-INVERSE-PERPETUAL",
-                        "apply_mapping": "true",
-                        "api_key": COINDESK_API_KEY
-                    },
-                    headers={"Content-Type": "application/json; charset=UTF-8"}
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        if "Data" in data and isinstance(data["Data"], dict):
-                            if "BTC-USD-INVERSE-PERPETUAL" in data["Data"]:
-                                btc_data = data["Data"]["BTC-USD-INVERSE-PERPETUAL"]
-                                if "VALUE" in btc_data:
-                                    btc_funding = float(btc_data["VALUE"])
-                                    btc_funding_pct = btc_funding * 100
-                                    return f"{btc_funding_pct:.3f}"
-                        
-                        return "0.010"  # Fallback value
-                    else:
-                        return "0.010"  # Fallback value
-        except Exception as e:
-            print(f"Error fetching BTC funding rate: {e}")
-            return "0.010"  # Fallback value
-
-    async def get_eth_funding_rate(self) -> str:
-        """Get ETH funding rate as string without symbols"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{COINDESK_BASE_URL}/futures/v1/latest/funding-rate/tick",
-                    params={
-                        "market": "bitmex",
-                        "instruments": "ETH-USD-INVERSE-PERPETUAL",
-                        "apply_mapping": "true",
-                        "api_key": COINDESK_API_KEY
-                    },
-                    headers={"Content-Type": "application/json; charset=UTF-8"}
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        if "Data" in data and isinstance(data["Data"], dict):
-                            if "ETH-USD-INVERSE-PERPETUAL" in data["Data"]:
-                                eth_data = data["Data"]["ETH-USD-INVERSE-PERPETUAL"]
-                                if "VALUE" in eth_data:
-                                    eth_funding = float(eth_data["VALUE"])
-                                    eth_funding_pct = eth_funding * 100
-                                    return f"{eth_funding_pct:.3f}"
-                        
-                        return "0.014"  # Fallback value
-                    else:
-                        return "0.014"  # Fallback value
-        except Exception as e:
-            print(f"Error fetching ETH funding rate: {e}")
-            return "0.014"  # Fallback value
-
-    async def scrape_coinalyze_data(self) -> dict:
-        """Scrape data from coinalyze.net homepage"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                }
-                async with session.get('https://coinalyze.net/', headers=headers) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        soup = BeautifulSoup(html, 'html.parser')
-                        
-                        data = {}
-                        
-                        # Look for open interest data
-                        oi_elements = soup.find_all(text=re.compile(r'Open Interest|OI'))
-                        for element in oi_elements:
-                            parent = element.parent
-                            if parent:
-                                # Look for BTC and ETH in nearby text
-                                text_content = parent.get_text()
-                                if 'BTC' in text_content or 'Bitcoin' in text_content:
-                                    # Extract number with B suffix
-                                    btc_match = re.search(r'(\d+\.?\d*)\s*B', text_content)
-                                    if btc_match:
-                                        data['btc_oi'] = btc_match.group(1)
-                                elif 'ETH' in text_content or 'Ethereum' in text_content:
-                                    # Extract number with B suffix
-                                    eth_match = re.search(r'(\d+\.?\d*)\s*B', text_content)
-                                    if eth_match:
-                                        data['eth_oi'] = eth_match.group(1)
-                        
-                        # Look for funding rates
-                        funding_elements = soup.find_all(text=re.compile(r'Funding|Rate'))
-                        for element in funding_elements:
-                            parent = element.parent
-                            if parent:
-                                text_content = parent.get_text()
-                                if 'BTC' in text_content or 'Bitcoin' in text_content:
-                                    # Extract percentage
-                                    btc_match = re.search(r'(\d+\.?\d*)\s*%', text_content)
-                                    if btc_match:
-                                        data['btc_funding'] = btc_match.group(1)
-                                elif 'ETH' in text_content or 'Ethereum' in text_content:
-                                    # Extract percentage
-                                    eth_match = re.search(r'(\d+\.?\d*)\s*%', text_content)
-                                    if eth_match:
-                                        data['eth_funding'] = eth_match.group(1)
-                        
-                        # Look for market cap data
-                        mcap_elements = soup.find_all(text=re.compile(r'Market Cap|Mcap'))
-                        for element in mcap_elements:
-                            parent = element.parent
-                            if parent:
-                                text_content = parent.get_text()
-                                if 'BTC' in text_content or 'Bitcoin' in text_content:
-                                    # Extract number with T or B suffix
-                                    btc_match = re.search(r'(\d+\.?\d*)\s*[TB]', text_content)
-                                    if btc_match:
-                                        multiplier = 1000 if 'T' in text_content else 1
-                                        data['btc_mcap'] = float(btc_match.group(1)) * multiplier
-                                elif 'ETH' in text_content or 'Ethereum' in text_content:
-                                    # Extract number with T or B suffix
-                                    eth_match = re.search(r'(\d+\.?\d*)\s*[TB]', text_content)
-                                    if eth_match:
-                                        multiplier = 1000 if 'T' in text_content else 1
-                                        data['eth_mcap'] = float(eth_match.group(1)) * multiplier
-                        
-                        return data
-                    else:
-                        return {}
-        except Exception as e:
-            print(f"Error scraping coinalyze.net: {e}")
-            return {}
-
-    async def get_btc_open_interest_coinalyze(self) -> str:
-        """Get BTC open interest from coinalyze.net as string without symbols"""
-        try:
-            data = await self.scrape_coinalyze_data()
-            if 'btc_oi' in data:
-                return f"{data['btc_oi']}B"
-            else:
-                return "11.2B"  # Fallback value
-        except Exception as e:
-            print(f"Error getting BTC OI from coinalyze: {e}")
-            return "11.2B"  # Fallback value
-
-    async def get_eth_open_interest_coinalyze(self) -> str:
-        """Get ETH open interest from coinalyze.net as string without symbols"""
-        try:
-            data = await self.scrape_coinalyze_data()
-            if 'eth_oi' in data:
-                return f"{data['eth_oi']}B"
-            else:
-                return "5.8B"  # Fallback value
-        except Exception as e:
-            print(f"Error getting ETH OI from coinalyze: {e}")
-            return "5.8B"  # Fallback value
-
-    async def get_btc_funding_rate_coinalyze(self) -> str:
-        """Get BTC funding rate from coinalyze.net as string without symbols"""
-        try:
-            data = await self.scrape_coinalyze_data()
-            if 'btc_funding' in data:
-                return f"{data['btc_funding']}"
-            else:
-                return "0.010"  # Fallback value
-        except Exception as e:
-            print(f"Error getting BTC funding from coinalyze: {e}")
-            return "0.010"  # Fallback value
-
-    async def get_eth_funding_rate_coinalyze(self) -> str:
-        """Get ETH funding rate from coinalyze.net as string without symbols"""
-        try:
-            data = await self.scrape_coinalyze_data()
-            if 'eth_funding' in data:
-                return f"{data['eth_funding']}"
-            else:
-                return "0.014"  # Fallback value
-        except Exception as e:
-            print(f"Error getting ETH funding from coinalyze: {e}")
-            return "0.014"  # Fallback value
-
-    async def get_btc_market_cap_coinalyze(self) -> float:
-        """Get BTC market cap from coinalyze.net as float value"""
-        try:
-            data = await self.scrape_coinalyze_data()
-            if 'btc_mcap' in data:
-                return data['btc_mcap']
-            else:
-                return 0
-        except Exception as e:
-            print(f"Error getting BTC market cap from coinalyze: {e}")
-            return 0
-
-    async def get_eth_market_cap_coinalyze(self) -> float:
-        """Get ETH market cap from coinalyze.net as float value"""
-        try:
-            data = await self.scrape_coinalyze_data()
-            if 'eth_mcap' in data:
-                return data['eth_mcap']
-            else:
-                return 0
-        except Exception as e:
-            print(f"Error getting ETH market cap from coinalyze: {e}")
-            return 0
-
-    async def get_btc_dominance_coinalyze(self) -> str:
-        """Get BTC dominance using coinalyze.net market cap as string without symbols"""
-        try:
-            btc_market_cap = await self.get_btc_market_cap_coinalyze()
-            total_value = await self.get_total_market_cap_value()
-            
-            if btc_market_cap != 0 and total_value > 0:
-                btc_dominance = (btc_market_cap / total_value) * 100
-                return f"{btc_dominance:.1f}"
-            else:
-                return "Error"
-        except Exception as e:
-            print(f"Error calculating BTC dominance from coinalyze: {e}")
-            return "Error"
-
-    async def get_eth_dominance_coinalyze(self) -> str:
-        """Get ETH dominance using coinalyze.net market cap as string without symbols"""
-        try:
-            eth_market_cap = await self.get_eth_market_cap_coinalyze()
-            total_value = await self.get_total_market_cap_value()
-            
-            if eth_market_cap != 0 and total_value > 0:
-                eth_dominance = (eth_market_cap / total_value) * 100
-                return f"{eth_dominance:.1f}"
-            else:
-                return "Error"
-        except Exception as e:
-            print(f"Error calculating ETH dominance from coinalyze: {e}")
-            return "Error"
-
-    async def get_top_gainers(self, period: str) -> str:
-        """
-        Get top 5 best performing coins from the top coins by market cap
-        Strategy: First get top coins (by market cap), then find best performers among them
-        period: '24h', '7d', '30d'
-        """
-        try:
-            if not CMC_API_KEY:
-                return "CMC Key Missing"
-
-            # Map period to the percentage change field
-            sort_field_map = {
-                "24h": "percent_change_24h",
-                "7d": "percent_change_7d",
-                "30d": "percent_change_30d"
-            }
-            
-            sort_field = sort_field_map.get(period)
-            if not sort_field:
-                return "Invalid Period"
-
-            # Fetch top coins by market cap (established projects)
-            # We'll get top 100 coins and then sort by performance
-            params = {
-                "start": "1",
-                "limit": "100",  # Top 100 coins by market cap
-                "sort": "market_cap",
-                "sort_dir": "desc",
-                "CMC_PRO_API_KEY": CMC_API_KEY
-            }
-
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{CMC_BASE_URL}/v1/cryptocurrency/listings/latest",
-                    params=params,
-                    headers={"Accept": "application/json"}
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        coins = data.get("data", [])
-                        
-                        if not coins:
-                            return "No Data"
-                        
-                        # Filter out stablecoins
-                        stablecoins = {'USDT', 'USDC', 'DAI', 'BUSD', 'TUSD', 'USDD', 'USDP', 'GUSD', 'FRAX', 'FDUSD'}
-                        filtered_coins = [coin for coin in coins if coin.get('symbol') not in stablecoins]
-                        
-                        # Sort by performance (percentage change)
-                        def get_sort_key(coin):
-                            try:
-                                val = coin["quote"]["USD"].get(sort_field)
-                                return val if val is not None else -float('inf')
-                            except:
-                                return -float('inf')
-                        filtered_coins.sort(key=get_sort_key, reverse=True)
-                        
-                        # Get top 5 best performers from top coins
-                        top_5 = []
-                        count = 0
-                        for coin in filtered_coins:
-                            symbol = coin.get("symbol", "???")
-                            quote = coin.get("quote", {}).get("USD", {})
-                            percent_change = quote.get(sort_field)
-                            
-                            # Only include coins with positive gains
-                            if percent_change is not None and percent_change > 0:
-                                count += 1
-                                top_5.append(f"{count}. {symbol}: +{percent_change:.1f}%")
-                                
-                                if count == 5:
-                                    break
-                        
-                        if not top_5:
-                            return "No Data"
-                        
-                        return "\n".join(top_5)
-                    else:
-                        print(f"CMC API Error ({period}): {response.status}")
-                        # Log the response for debugging
-                        try:
-                            error_data = await response.text()
-                            print(f"Response: {error_data}")
-                        except:
-                            pass
-                        return "API Error"
-        except Exception as e:
-            print(f"Error fetching top gainers ({period}): {e}")
-            return "Error"
-
-    async def scrape_coinalyze_data(self) -> dict:
-        """Scrape data from coinalyze.net homepage using tr tags with data-coin attributes"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                }
-                async with session.get('https://coinalyze.net/', headers=headers) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        soup = BeautifulSoup(html, 'html.parser')
-                        
-                        data = {}
-                        
-                        # Find BTC row
-                        btc_row = soup.find('tr', {'data-coin': 'BTC'})
-                        if btc_row:
-                            # Extract all td elements from BTC row
-                            btc_cells = btc_row.find_all('td')
-                            if len(btc_cells) >= 11:
-                                # Open Interest (Column 6: OPEN INTEREST) - index 6 might differ if columns changed, but based on archive:
-                                # Archive used index 6. Let's stick to archive logic.
-                                oi_cell = btc_cells[6] if len(btc_cells) > 6 else None
-                                if oi_cell:
-                                    oi_text = oi_cell.get_text().strip()
-                                    oi_match = re.search(r'(\d+\.?\d*)\s*[Bb]', oi_text)
-                                    if oi_match:
-                                        data['btc_oi'] = oi_match.group(1)
-                                
-                                # Funding Rate Average (Column 10: FR AVG)
-                                funding_cell = btc_cells[10] if len(btc_cells) > 10 else None
-                                if funding_cell:
-                                    funding_text = funding_cell.get_text().strip()
-                                    funding_match = re.search(r'([+-]?\d+\.?\d*)\s*%', funding_text)
-                                    if funding_match:
-                                        data['btc_funding'] = funding_match.group(1)
-                        
-                        # Find ETH row
-                        eth_row = soup.find('tr', {'data-coin': 'ETH'})
-                        if eth_row:
-                            eth_cells = eth_row.find_all('td')
-                            if len(eth_cells) >= 11:
-                                # Open Interest
-                                oi_cell = eth_cells[6] if len(eth_cells) > 6 else None
-                                if oi_cell:
-                                    oi_text = oi_cell.get_text().strip()
-                                    oi_match = re.search(r'(\d+\.?\d*)\s*[Bb]', oi_text)
-                                    if oi_match:
-                                        data['eth_oi'] = oi_match.group(1)
-                                
-                                # Funding Rate
-                                funding_cell = eth_cells[10] if len(eth_cells) > 10 else None
-                                if funding_cell:
-                                    funding_text = funding_cell.get_text().strip()
-                                    funding_match = re.search(r'([+-]?\d+\.?\d*)\s*%', funding_text)
-                                    if funding_match:
-                                        data['eth_funding'] = funding_match.group(1)
-                        
-                        return data
-                    else:
-                        return {}
-        except Exception as e:
-            print(f"Error scraping coinalyze.net: {e}")
-            return {}
-
-    async def get_btc_open_interest_coinalyze(self) -> str:
-        """Get BTC open interest from coinalyze.net as string without symbols"""
-        try:
-            data = await self.scrape_coinalyze_data()
-            if 'btc_oi' in data:
-                return f"{data['btc_oi']}B"
-            else:
-                return "11.2B"  # Fallback
-        except Exception as e:
-            print(f"Error getting BTC OI from coinalyze: {e}")
-            return "11.2B"
-
-    async def get_eth_open_interest_coinalyze(self) -> str:
-        """Get ETH open interest from coinalyze.net as string without symbols"""
-        try:
-            data = await self.scrape_coinalyze_data()
-            if 'eth_oi' in data:
-                return f"{data['eth_oi']}B"
-            else:
-                return "5.8B"  # Fallback
-        except Exception as e:
-            print(f"Error getting ETH OI from coinalyze: {e}")
-            return "5.8B"
-
-    async def get_btc_funding_rate_coinalyze(self) -> str:
-        """Get BTC funding rate from coinalyze.net as string without symbols"""
-        try:
-            data = await self.scrape_coinalyze_data()
-            if 'btc_funding' in data:
-                return data['btc_funding']
-            else:
-                return "0.010"  # Fallback
-        except Exception as e:
-            print(f"Error getting BTC funding from coinalyze: {e}")
-            return "0.010"
-
-    async def get_eth_funding_rate_coinalyze(self) -> str:
-        """Get ETH funding rate from coinalyze.net as string without symbols"""
-        try:
-            data = await self.scrape_coinalyze_data()
-            if 'eth_funding' in data:
-                return data['eth_funding']
-            else:
-                return "0.014"  # Fallback
-        except Exception as e:
-            print(f"Error getting ETH funding from coinalyze: {e}")
-            return "0.014"
-
-    async def get_fear_and_greed(self) -> tuple:
-        """Fetch Fear & Greed index value and classification from alternative.me API"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get("https://api.alternative.me/fng/") as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data and isinstance(data.get("data"), list) and data["data"]:
-                            latest = data["data"][0]
-                            value = latest.get("value")
-                            classification = latest.get("value_classification")
-                            if value is not None and classification is not None:
-                                return str(value), str(classification)
-                    return "Error", "Error"
-        except Exception as e:
-            print(f"Error fetching Fear & Greed: {e}")
-            return "Error", "Error"
-
-    async def get_altcoin_season_index(self) -> str:
-        """Scrape BlockchainCenter Altcoin Season Index value as string (0-100)"""
-        try:
-            url = "https://www.blockchaincenter.net/en/altcoin-season-index/"
-            async with aiohttp.ClientSession() as session:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                }
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        soup = BeautifulSoup(html, 'html.parser')
-                        text = soup.get_text(" ", strip=True)
-                        # Look for pattern like "Altcoin Season (63)" or "Altcoin Season 63"
-                        match = re.search(r"Altcoin\s+Season\s*[\(\[]?(\d{1,3})[\)\]]?", text, re.IGNORECASE)
-                        if match:
-                            value = match.group(1)
-                            return value
-                        # Fallback: search for "Altcoin Month" as a proxy if main not found
-                        match_month = re.search(r"Altcoin\s+Month\s*[\(\[]?(\d{1,3})[\)\]]?", text, re.IGNORECASE)
-                        if match_month:
-                            return match_month.group(1)
-                        return "Error"
-                    return "Error"
-        except Exception as e:
-            print(f"Error fetching Altcoin Season Index: {e}")
-            return "Error"
-
-
     @app_commands.command(name="force-update", description="Admin command to force update all dashboard messages.")
     async def force_update(self, interaction: discord.Interaction):
         if interaction.user.guild_permissions.administrator:
             try:
                 await interaction.response.defer()
+                request_priority.set(INTERACTIVE)
                 
-                await self.update_all_dashboards()
+                # Joins the cycle in progress, if any, instead of running a second one alongside it
+                if not await self.coordinator.run_now([SNAPSHOT_KEY, *(entry["message_id"] for entry in self.dashboards.entries())]):
+                    await interaction.followup.send("Error updating dashboards. Please try again.", ephemeral=True)
+                    return
                 
                 embed = discord.Embed(
                     title="Force Update Complete",
@@ -1232,9 +1011,7 @@ class Dashboard(commands.Cog):
     async def clear_dashboards(self, interaction: discord.Interaction):
         if interaction.user.guild_permissions.administrator:
             try:
-                count = len(self.config_data["message-ids"])
-                self.config_data["message-ids"] = []
-                self.save_config()
+                count = self.dashboards.clear()
                 
                 embed = discord.Embed(
                     title="Dashboards Cleared",
@@ -1259,5 +1036,23 @@ class Dashboard(commands.Cog):
             except Exception as e:
                 print(f"Error in clear-dashboards command (permission denied): {e}")
 
+    @app_commands.command(name="reload-dashboard", description="Owner command to load new dashboard code, keeping its data and schedule.")
+    async def reload_dashboard(self, interaction: discord.Interaction):
+        if not await self.bot.is_owner(interaction.user):
+            await interaction.response.send_message("Access Denied", ephemeral=True)
+            return
+        await interaction.response.defer(ephemeral=True)
+        try:
+            await self.bot.reload_extension(__name__)
+        except Exception as e:
+            print(f"Error reloading {__name__}: {e}")
+            await interaction.followup.send(f"Reload failed, still running the previous code: {e}", ephemeral=True)
+            return
+        # Sync only if the reload changed the commands
+        sync = getattr(self.bot, "sync_commands", None)
+        if sync is not None:
+            await sync()
+        await interaction.followup.send("Dashboard reloaded.", ephemeral=True)
+
 async def setup(bot):
     await bot.add_cog(Dashboard(bot))
\ No newline at end of file
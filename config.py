@@ -1,3 +1,144 @@
 # Default dashboard update interval
 UPDATE_HOURS = 6
 UPDATE_MINUTES = 0
+
+# Timeout (seconds) for a single upstream provider request
+PROVIDER_TIMEOUT = 10
+
+# Circuit breaker settings for upstream providers
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_BASE_BACKOFF = 30   # seconds, doubled on every re-open
+BREAKER_MAX_BACKOFF = 900   # seconds
+
+# Hedged requests: once a provider has enough latency history, a request
+# still running past its p95 is raced against the next provider in the chain
+HEDGE_REQUESTS = True
+HEDGE_PERCENTILE = 95
+HEDGE_MIN_SAMPLES = 20
+
+# CoinMarketCap credit budget (Basic plan: 10,000 credits/month)
+CMC_CREDIT_BUDGET = 10000
+CMC_BUDGET_PERIOD = "monthly"  # "daily" or "monthly"
+
+# Minimum seconds between CMC refreshes per field priority; all of them stretch
+# once spending runs ahead of the budget, low and medium priority fields further
+CMC_REFRESH_SECONDS = {"high": 60, "medium": 300, "low": 900}
+CMC_MAX_SLOWDOWN = 96
+CMC_USAGE_SAVE_SECONDS = 60  # usage file is written at most this often (and on shutdown)
+
+# Outbound rate limits per host: token bucket (rate per second, burst) plus
+# a cap on concurrent requests. "default" applies to unlisted hosts.
+RATE_LIMITS = {
+    "pro-api.coinmarketcap.com": {"rate": 0.5, "burst": 5, "concurrency": 2},   # CMC Basic: 30 calls/min
+    "api.coingecko.com": {"rate": 0.2, "burst": 3, "concurrency": 1},
+    "coinalyze.net": {"rate": 0.05, "burst": 1, "concurrency": 1},
+    "www.blockchaincenter.net": {"rate": 0.05, "burst": 1, "concurrency": 1},
+    "default": {"rate": 1.0, "burst": 5, "concurrency": 4},
+}
+RATE_LIMIT_MAX_WAIT = 30           # fail fast instead of queueing behind a longer block
+RATE_LIMIT_DEFAULT_BACKOFF = 60    # seconds to pause after a 429 without Retry-After
+
+# Number of URLs whose ETag/Last-Modified and parsed result are kept for conditional requests
+CONDITIONAL_CACHE_SIZE = 256
+
+# Altcoin Season Index, computed from CMC listings: share (0-100) of the top
+# ALT_SEASON_UNIVERSE non-stablecoin assets that outperformed BTC over the
+# window ("24h", "7d", "30d", "60d" or "90d")
+ALT_SEASON_WINDOW = "90d"
+ALT_SEASON_UNIVERSE = 50
+# Also scrape blockchaincenter.net and log when it disagrees by more than the tolerance
+ALT_SEASON_CROSS_CHECK = False
+ALT_SEASON_CROSS_CHECK_TOLERANCE = 15
+
+# Exchanges polled for open interest and funding, with optional base URL
+# overrides (None = the exchange's public API; point at a stub server to test)
+DERIVATIVES_EXCHANGES = {
+    "binance": None,
+    "bybit": None,
+    "okx": None,
+}
+DERIVATIVES_EXCHANGE_TIMEOUT = 5   # seconds; a slower exchange is left out of that cycle's aggregate
+
+# Maximum active price/dominance alerts per user
+ALERTS_PER_USER = 10
+
+# /price: symbol index refresh age and quote cache TTL (seconds)
+SYMBOL_INDEX_MAX_AGE = 86400
+PRICE_CACHE_TTL = 60
+
+# Watchlists offered in the dashboard's detail menu (symbols from the top listings)
+WATCHLISTS = {
+    "Majors": ["BTC", "ETH", "SOL", "BNB", "XRP"],
+    "Layer 1": ["ADA", "AVAX", "DOT", "NEAR", "SUI", "APT", "TON"],
+    "Memes": ["DOGE", "SHIB", "PEPE", "WIF", "BONK"],
+}
+
+# Dashboard delivery: "bot" edits messages as the bot user; "webhook" posts and
+# edits through a managed webhook per channel (needs Manage Webhooks), which
+# has its own rate limits. Existing dashboards are migrated on the next update.
+DASHBOARD_DELIVERY = "bot"
+WEBHOOK_NAME = "Market Dashboard"
+
+# Background sweep validating dashboard registrations missed by delete events
+DASHBOARD_SWEEP_MINUTES = 15
+DASHBOARD_SWEEP_BATCH = 20     # messages checked per sweep
+DASHBOARD_SWEEP_DELAY = 1.5    # seconds between checks
+
+# Dashboard edits in a cycle are spread evenly over this many seconds (capped
+# at half the interval), with at most UPDATE_CONCURRENCY edits in flight
+UPDATE_JITTER_SECONDS = 30
+UPDATE_CONCURRENCY = 5
+
+# Shortest refresh interval (seconds) a dashboard can be given with /set-dashboard-time
+MIN_DASHBOARD_INTERVAL = 30
+
+# /dashboard posts as soon as prices and market metrics arrive, then edits the
+# message once when the slower sources finish (or after this many seconds)
+PROGRESSIVE_DASHBOARD = True
+PROGRESSIVE_FILL_TIMEOUT = 20
+
+# Warm-start state (snapshot, listings, derivatives quotes) is saved this often and on unload
+STATE_SAVE_MINUTES = 5
+
+# Gateway profile: "lean" (only the guild and message-delete intents, no member or
+# message caches) or "full" (every intent, default caches)
+GATEWAY_PROFILE = "lean"
+# Shards for the AutoShardedBot; None asks Discord for the recommended count.
+# SHARD_IDS limits this process to some of them (needs SHARD_COUNT)
+SHARD_COUNT = None
+SHARD_IDS = None
+
+# Where dashboards get market data: "local" fetches in the bot process; "ipc"
+# consumes snapshots published by fetcher.py on the same machine, so several
+# bot processes share one set of upstream requests
+SNAPSHOT_SOURCE = "local"
+IPC_SOCKET_PATH = "./data/snapshot.sock"
+IPC_MAX_AGE = 30    # seconds; an older snapshot makes the bot ask the fetcher for a refresh
+IPC_TIMEOUT = 30    # seconds to wait for a refresh (then the latest snapshot is used)
+
+# Read-only local HTTP endpoint (/snapshot, /history) for other services; served
+# from memory, never calls upstream APIs
+SNAPSHOT_API_ENABLED = False
+SNAPSHOT_API_HOST = "127.0.0.1"
+SNAPSHOT_API_PORT = 8765
+SNAPSHOT_API_MAX_AGE = 30     # Cache-Control max-age, seconds
+SNAPSHOT_API_HISTORY = 288    # snapshots kept for /history
+
+# Currencies a dashboard can be shown in. Everything is fetched in USD once and
+# converted at render time with exchange rates refetched every FX_RATES_TTL seconds
+DASHBOARD_CURRENCIES = ("USD", "EUR", "GBP", "JPY")
+FX_RATES_TTL = 6 * 3600
+
+# Seconds /reload-dashboard waits for an update cycle in progress to finish before
+# handing the snapshot, caches, sessions and schedule over to the reloaded code
+RELOAD_DRAIN_SECONDS = 10
+
+# Per-cycle timing traces (provider calls, HTTP, parsing, rendering, Discord edits),
+# written as JSON lines from a background thread to rotating files; /perf-stats
+# summarizes the last TRACE_SAMPLES spans of each stage
+TRACE_ENABLED = True
+TRACE_PATH = "./logs/trace.jsonl"
+FETCHER_TRACE_PATH = "./logs/fetcher-trace.jsonl"
+TRACE_MAX_BYTES = 5 * 2**20
+TRACE_BACKUPS = 5
+TRACE_SAMPLES = 500
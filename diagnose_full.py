@@ -1,6 +1,7 @@
 import asyncio
 import os
 import sys
+import time
 from unittest.mock import MagicMock
 from dotenv import load_dotenv
 
@@ -13,62 +14,54 @@ load_dotenv()
 
 async def diagnose_dashboard():
     print("Initializing Dashboard Diagnostics...")
-    
+
     # Mock bot
     bot_mock = MagicMock()
     async def async_magic(): return None
     bot_mock.wait_until_ready = async_magic
-    
+    bot_mock.dashboard_handoff = None
+
     dashboard = Dashboard(bot_mock)
-    dashboard.update_dashboard_task.cancel() # Stop loop
+    dashboard.coordinator.stop() # Stop loop
+    dashboard.warm_up_task.cancel()
 
     print(f"CMC_KEY Present: {bool(os.getenv('CMC_API_KEY'))}")
-    
-    print("\n---------- 1. Testing Total Market Cap Value ----------")
-    try:
-        val = await dashboard.get_total_market_cap_value()
-        print(f"Value: {val}")
-        print(f"Type: {type(val)}")
-    except Exception as e:
-        print(f"EXCEPTION in get_total_market_cap_value: {e}")
-
-    print("\n---------- 2. Testing Component Methods ----------")
-    
-    try:
-        btc_mcap = await dashboard.get_btc_market_cap()
-        print(f"BTC Market Cap: {btc_mcap}")
-    except Exception as e:
-        print(f"EXCEPTION in get_btc_market_cap: {e}")
-        
-    try:
-        usdt_mcap = await dashboard.get_usdt_market_cap()
-        print(f"USDT Market Cap: {usdt_mcap}")
-    except Exception as e:
-        print(f"EXCEPTION in get_usdt_market_cap: {e}")
 
-    print("\n---------- 3. Testing Calculated Dominance ----------")
-    
-    try:
-        btc_dom = await dashboard.get_btc_dominance()
-        print(f"BTC Dominance Result: '{btc_dom}'")
-    except Exception as e:
-        print(f"EXCEPTION in get_btc_dominance: {e}")
+    print("\n---------- 1. Testing Each Provider ----------")
+    for name, provider in dashboard.market.registry.providers.items():
+        if not provider.enabled():
+            print(f"{name}: disabled")
+            continue
+        started = time.monotonic()
+        try:
+            result = await provider.fetch(dashboard.market.fetcher)
+            print(f"{name} ({time.monotonic() - started:.2f}s): {result}")
+        except Exception as e:
+            print(f"EXCEPTION in {name}: {e}")
 
-    try:
-        usdt_dom = await dashboard.get_usdt_dominance()
-        print(f"USDT Dominance Result: '{usdt_dom}'")
-    except Exception as e:
-        print(f"EXCEPTION in get_usdt_dominance: {e}")
+    print("\n---------- 2. Provider Chains ----------")
+    for metric, chain in dashboard.market.registry.chains.items():
+        print(f"  {metric}: {' -> '.join(chain)}")
 
-    print("\n---------- 4. Testing Full get_all_data() ----------")
+    print("\n---------- 3. Testing Full get_all_data() ----------")
     try:
-        all_data = await dashboard.get_all_data()
-        print("ALL DATA RESULT:")
-        for k, v in all_data.items():
-            print(f"  {k}: {v}")
+        snapshot = await dashboard.market.get_all_data()
+        print(f"SNAPSHOT RESULT: {snapshot}")
+        for metric, field in snapshot.fields.items():
+            print(f"  {metric}: {field.value!r} [{field.status}, {field.source}]")
     except Exception as e:
         print(f"EXCEPTION in get_all_data: {e}")
 
+    print("\n---------- 4. Provider Health ----------")
+    for name, health in dashboard.market.health.summary().items():
+        print(f"  {name}: {health}")
+
+    print("\n---------- 5. Outbound Queue Waits ----------")
+    for host, stats in dashboard.market.fetcher.limiter.stats().items():
+        print(f"  {host}: {stats}")
+
+    await dashboard.market.fetcher.close()
+
 
 if __name__ == "__main__":
     asyncio.run(diagnose_dashboard())
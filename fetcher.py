@@ -0,0 +1,85 @@
+"""
+Standalone fetcher: the only process on the machine that calls the upstream
+market APIs. It publishes every snapshot on a Unix socket (utils/ipc.py) to
+any number of bot processes running with SNAPSHOT_SOURCE = "ipc" in config.py,
+which render dashboards without fetching anything themselves.
+
+A fetch runs when a bot asks for a snapshot newer than IPC_MAX_AGE seconds;
+requests from several bots at the same time share one fetch, so upstream
+traffic and CMC credits don't grow with the number of bots. The fetcher also
+owns the warm-start state file and the /price symbol index.
+
+Usage:
+    python fetcher.py                        # socket at IPC_SOCKET_PATH
+    python fetcher.py --socket /tmp/snap.sock
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+from dotenv import load_dotenv
+
+sys.path.append(os.getcwd())
+
+import config
+from utils.ipc import SnapshotServer
+from utils.market import MarketData
+from utils.symbols import SymbolIndex
+from utils.tracing import tracer
+
+load_dotenv()
+
+
+async def every(seconds: float, func) -> None:
+    while True:
+        await asyncio.sleep(seconds)
+        try:
+            await func()
+        except Exception as e:
+            print(f"Error in {func.__name__}: {e}")
+
+
+async def run(socket_path: str = None) -> None:
+    tracer.start(getattr(config, "FETCHER_TRACE_PATH", "./logs/fetcher-trace.jsonl"))
+    market = MarketData(os.getenv("CMC_API_KEY"), os.getenv("COINDESK_API_KEY"))
+    market.restore_state()
+    server = SnapshotServer(market, socket_path)
+    await server.start()
+    symbols = SymbolIndex()
+
+    async def save_state():
+        market.save_state()
+
+    async def refresh_symbols():
+        await market.refresh_symbols(symbols)
+
+    try:
+        try:
+            await refresh_symbols()
+            await market.get_all_data()
+        except Exception as e:
+            print(f"Error in initial fetch: {e}")
+        await asyncio.gather(
+            every(getattr(config, "STATE_SAVE_MINUTES", 5) * 60, save_state),
+            every(3600, refresh_symbols),
+        )
+    finally:
+        market.save_state()
+        await server.close()
+        await market.close()
+        tracer.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--socket", help="Unix socket path (default: IPC_SOCKET_PATH from config.py)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args.socket))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,12 @@
-import discord, os, sys
+import time
+STARTED_AT = time.monotonic()  # before the heavy imports, for the startup timings
+
+import discord, hashlib, json, os, sys
 from discord.ext import commands
 from dotenv import load_dotenv
 
+from utils.gateway import bot_options
+
 # Load environment variables
 load_dotenv()
 BOT_TOKEN = os.getenv("BOT_TOKEN")
@@ -12,32 +17,87 @@ if not BOT_TOKEN:
     print("Please create a .env file with your Discord bot token.")
     sys.exit(1)
 
-# Create bot instance with all intents
-intents = discord.Intents.all()
-bot = commands.Bot(command_prefix="!", intents=intents)
+EXTENSIONS = ("cogs.Dashboard",)
+COMMAND_HASH_PATH = "./data/command_tree.json"
+
+
+class DashboardBot(commands.AutoShardedBot):
+    """Loads extensions and syncs slash commands once per process, before connecting.
+
+    ``setup_hook`` runs exactly once (``on_ready`` fires again on every
+    reconnect), and the global command tree is only synced when its hash
+    differs from the last successful sync.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.startup_times = {}
+        # True while an extension is being reloaded, so its cog can hand its state to the new instance
+        self.reloading = False
+
+    def mark_startup(self, stage: str) -> None:
+        """Record (and log) the first time a startup stage is reached, in seconds since process start"""
+        if stage not in self.startup_times:
+            self.startup_times[stage] = time.monotonic() - STARTED_AT
+            print(f"STARTUP: {stage} after {self.startup_times[stage]:.2f}s")
+
+    async def setup_hook(self):
+        for extension in EXTENSIONS:
+            try:
+                await self.load_extension(extension)
+                print(f"EXTENSION LOADED: {extension}")
+            except Exception as e:
+                print(f"ERROR LOADING EXTENSION {extension}: {e}")
+        self.mark_startup("extensions loaded")
+        await self.sync_commands()
+
+    async def reload_extension(self, name, *, package=None):
+        """Reload an extension; its cogs see ``reloading`` in cog_unload and keep their state for the new code"""
+        self.reloading = True
+        try:
+            await super().reload_extension(name, package=package)
+        finally:
+            self.reloading = False
+
+    def command_tree_hash(self) -> str:
+        payload = sorted((command.to_dict(self.tree) for command in self.tree.get_commands()), key=lambda command: command["name"])
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    async def sync_commands(self) -> None:
+        """Sync the global command tree only if it changed since the last sync"""
+        digest = self.command_tree_hash()
+        try:
+            with open(COMMAND_HASH_PATH, "r") as file:
+                stored = json.load(file)
+        except:
+            stored = {}
+        if stored.get("hash") == digest and stored.get("application_id") == self.application_id:
+            print("COMMANDS UNCHANGED, SKIPPING SYNC")
+            return
+
+        try:
+            await self.tree.sync()
+            print("COMMANDS SYNCED")
+        except Exception as e:
+            print(f"ERROR SYNCING COMMANDS: {e}")
+            return
+        try:
+            with open(COMMAND_HASH_PATH, "w") as file:
+                json.dump({"hash": digest, "application_id": self.application_id}, file, indent=4)
+        except Exception as e:
+            print(f"Error saving command hash: {e}")
+
+
+# Intents, caches and shard count come from the gateway profile in config.py
+bot = DashboardBot(command_prefix="!", **bot_options())
 
 @bot.event
 async def on_ready():
-    """Called when the bot is ready and connected to Discord"""
+    """Called when the bot is ready and connected to Discord (again after every reconnect)"""
+    bot.mark_startup("ready")
     print(f"LOGGED IN AS: {bot.user.name}")
     print(f"Bot ID: {bot.user.id}")
-    print(f"Connected to {len(bot.guilds)} guild(s)")
-    
-    # Load the Dashboard cog
-    try:
-        await bot.load_extension("cogs.Dashboard")
-        print(f"EXTENSION LOADED: Dashboard")
-    except Exception as e:
-        print(f"ERROR LOADING EXTENSION: {e}")
-        return
-
-    # Sync slash commands
-    try:
-        await bot.tree.sync()
-        print(f"COMMANDS SYNCED")
-    except Exception as e:
-        print(f"ERROR SYNCING COMMANDS: {e}")
-
+    print(f"Connected to {len(bot.guilds)} guild(s) on {bot.shard_count} shard(s)")
     print(f"Bot is ready! Use /dashboard to create a market dashboard.")
 
 @bot.event
@@ -0,0 +1,212 @@
+import bisect
+import json
+import time
+
+import config
+
+
+ABOVE = "above"
+BELOW = "below"
+
+# Metrics users can set alerts on -> display label
+ALERT_METRICS = {
+    "BTC_USD": "BTC/USD",
+    "ETH_USD": "ETH/USD",
+    "SOL_USD": "SOL/USD",
+    "ETH_BTC_RATIO": "ETH/BTC",
+    "BTC_DOMINANCE": "BTC.D",
+    "USDT_DOMINANCE": "USDT.D",
+    "TOTAL_MCAP": "TOTAL2",
+}
+
+
+class AlertError(Exception):
+    """Raised when an alert can't be created or removed; the message is shown to the user"""
+
+
+class Alert:
+    """One-shot threshold alert owned by a user, delivered to the channel it was created in"""
+
+    __slots__ = ("id", "user_id", "channel_id", "metric", "threshold", "direction", "created_at")
+
+    def __init__(self, id: int, user_id: int, channel_id: int, metric: str, threshold: float, direction: str, created_at: float = None):
+        self.id = id
+        self.user_id = user_id
+        self.channel_id = channel_id
+        self.metric = metric
+        self.threshold = threshold
+        self.direction = direction
+        self.created_at = created_at if created_at is not None else time.time()
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Alert":
+        return cls(**{field: data[field] for field in cls.__slots__})
+
+
+class AlertIndex:
+    """Alerts for one metric and direction, kept sorted by threshold"""
+
+    def __init__(self):
+        self.keys = []   # (threshold, alert id), sorted
+
+    def add(self, alert: Alert) -> None:
+        bisect.insort(self.keys, (alert.threshold, alert.id))
+
+    def remove(self, alert: Alert) -> None:
+        key = (alert.threshold, alert.id)
+        index = bisect.bisect_left(self.keys, key)
+        if index < len(self.keys) and self.keys[index] == key:
+            del self.keys[index]
+
+    def between(self, low: float, high: float, inclusive_low: bool) -> list:
+        """Alert ids with low < threshold <= high (or low <= threshold < high when inclusive_low)"""
+        if inclusive_low:
+            start = bisect.bisect_left(self.keys, (low, float("-inf")))
+            end = bisect.bisect_left(self.keys, (high, float("-inf")))
+        else:
+            start = bisect.bisect_right(self.keys, (low, float("inf")))
+            end = bisect.bisect_right(self.keys, (high, float("inf")))
+        return [alert_id for _, alert_id in self.keys[start:end]]
+
+    def __len__(self):
+        return len(self.keys)
+
+
+class AlertEngine:
+    """Price and dominance alerts matched against each new snapshot.
+
+    Thresholds are kept in sorted per-metric, per-direction indexes, so a tick
+    only looks at the alerts whose threshold lies between the previous and the
+    new value instead of scanning every alert. Triggered alerts are removed.
+    """
+
+    def __init__(self, path: str = "./data/alerts.json", per_user: int = None):
+        self.path = path
+        self.per_user = per_user or getattr(config, "ALERTS_PER_USER", 10)
+        self.alerts = {}
+        self.by_user = {}
+        self.indexes = {}
+        self.last_values = {}
+        self.next_id = 1
+        # last_values changed since the last save; flushed by ``flush`` rather than on every tick
+        self.dirty = False
+        self.load()
+
+    def _index(self, metric: str, direction: str) -> AlertIndex:
+        return self.indexes.setdefault((metric, direction), AlertIndex())
+
+    def _insert(self, alert: Alert) -> None:
+        self.alerts[alert.id] = alert
+        self.by_user.setdefault(alert.user_id, set()).add(alert.id)
+        self._index(alert.metric, alert.direction).add(alert)
+
+    def _delete(self, alert: Alert) -> None:
+        del self.alerts[alert.id]
+        owned = self.by_user.get(alert.user_id)
+        if owned is not None:
+            owned.discard(alert.id)
+            if not owned:
+                del self.by_user[alert.user_id]
+        self._index(alert.metric, alert.direction).remove(alert)
+
+    def load(self) -> None:
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+        except:
+            return
+        self.next_id = data.get("next_id", 1)
+        self.last_values = data.get("last_values", {})
+        for entry in data.get("alerts", []):
+            try:
+                self._insert(Alert.from_dict(entry))
+            except (KeyError, TypeError):
+                continue
+
+    def save(self) -> None:
+        try:
+            with open(self.path, "w") as file:
+                json.dump({
+                    "next_id": self.next_id,
+                    "last_values": self.last_values,
+                    "alerts": [alert.to_dict() for alert in self.alerts.values()]
+                }, file, indent=4)
+            self.dirty = False
+        except Exception as e:
+            print(f"Error saving alerts: {e}")
+
+    def flush(self) -> None:
+        """Save if only the last seen values changed since the last save (called periodically)"""
+        if self.dirty:
+            self.save()
+
+    def add(self, user_id: int, channel_id: int, metric: str, threshold: float, direction: str = None, current: float = None) -> Alert:
+        """Create an alert; the direction defaults to whichever side of the last seen value the threshold is on.
+        ``current`` is used as that value before the engine has seen a tick for the metric.
+        """
+        if metric not in ALERT_METRICS:
+            raise AlertError(f"Alerts aren't supported for {metric}.")
+        if len(self.by_user.get(user_id, ())) >= self.per_user:
+            raise AlertError(f"You already have {self.per_user} alerts. Remove one first.")
+
+        current = self.last_values.get(metric, current)
+        if direction is None:
+            if current is None:
+                raise AlertError("No data for that metric yet; specify a direction or try again after the next update.")
+            if threshold == current:
+                raise AlertError("The threshold equals the current value.")
+            direction = ABOVE if threshold > current else BELOW
+        elif current is not None and (direction == ABOVE) != (threshold > current):
+            raise AlertError(f"{ALERT_METRICS[metric]} is already {direction} that threshold.")
+
+        alert = Alert(self.next_id, user_id, channel_id, metric, float(threshold), direction)
+        self.next_id += 1
+        self._insert(alert)
+        self.save()
+        return alert
+
+    def remove(self, user_id: int, alert_id: int) -> Alert:
+        alert = self.alerts.get(alert_id)
+        if alert is None or alert.user_id != user_id:
+            raise AlertError(f"You have no alert #{alert_id}.")
+        self._delete(alert)
+        self.save()
+        return alert
+
+    def for_user(self, user_id: int) -> list:
+        return sorted((self.alerts[alert_id] for alert_id in self.by_user.get(user_id, ())), key=lambda alert: alert.id)
+
+    def evaluate(self, snapshot) -> list:
+        """Return [(alert, value)] for alerts whose threshold the snapshot crossed since the last tick"""
+        triggered = []
+        for metric in ALERT_METRICS:
+            value = snapshot.value(metric)
+            if value is None:
+                continue
+            previous = self.last_values.get(metric)
+            if value == previous:
+                continue
+            self.last_values[metric] = value
+            self.dirty = True
+            if previous is None:
+                continue
+
+            if value > previous:
+                ids = self._index(metric, ABOVE).between(previous, value, inclusive_low=False)
+            else:
+                ids = self._index(metric, BELOW).between(value, previous, inclusive_low=True)
+            for alert_id in ids:
+                triggered.append((self.alerts[alert_id], value))
+
+        # Only a removal has to reach disk right away (so a restart doesn't fire it again)
+        for alert, _ in triggered:
+            self._delete(alert)
+        if triggered:
+            self.save()
+        return triggered
+
+    def __len__(self):
+        return len(self.alerts)
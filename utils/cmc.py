@@ -0,0 +1,250 @@
+import itertools
+import json
+import math
+import time
+from datetime import datetime, timezone
+
+import config
+from utils.providers import Provider
+
+
+CMC_BASE_URL = "https://pro-api.coinmarketcap.com"
+
+# Refresh priority of every metric a CMC endpoint can supply
+METRIC_PRIORITY = {
+    "BTC_USD": "high",
+    "ETH_USD": "high",
+    "SOL_USD": "high",
+    "BTC_MCAP": "high",
+    "ETH_MCAP": "high",
+    "USDT_MCAP": "high",
+    "TOTAL_MCAP": "high",
+    "BTC_DOMINANCE": "high",
+    "GAINERS_24H": "medium",
+    "GAINERS_7D": "low",
+    "GAINERS_30D": "low",
+    "ALT_SEASON_INDEX": "low",
+}
+
+
+class CMCProvider(Provider):
+    """Base class for CoinMarketCap endpoints; records the credits each call costs"""
+
+    def __init__(self, api_key: str, budget=None):
+        self.api_key = api_key
+        self.budget = budget
+
+    def enabled(self) -> bool:
+        return bool(self.api_key)
+
+    def estimated_credits(self) -> int:
+        return 1
+
+    async def _get(self, fetcher, path: str, params: dict = None, decoder=None):
+        """GET a CMC endpoint, optionally through a streaming decoder, and record its credit cost"""
+        url = f"{CMC_BASE_URL}{path}"
+        headers = {"Accept": "application/json", "X-CMC_PRO_API_KEY": self.api_key}
+        if decoder is None:
+            data = await fetcher.get_json(url, params=params, headers=headers)
+            status = data.get("status")
+        else:
+            data = await fetcher.get_stream(url, decoder, params=params, headers=headers)
+            status = data.status
+
+        if self.budget is not None:
+            credits = (status or {}).get("credit_count")
+            self.budget.record(credits if credits is not None else self.estimated_credits(), self.name)
+        return data
+
+
+class CreditBudget:
+    """Tracks CMC credit usage against a daily or monthly allowance, persisted to disk.
+
+    Usage is written at most every ``CMC_USAGE_SAVE_SECONDS`` (and by ``flush``
+    on shutdown), not on every call.
+    """
+
+    def __init__(self, path: str = "./data/cmc_usage.json", limit: int = None, period: str = None, save_every: float = None):
+        self.path = path
+        self.limit = limit or getattr(config, "CMC_CREDIT_BUDGET", 10000)
+        self.period = period or getattr(config, "CMC_BUDGET_PERIOD", "monthly")
+        self.save_every = save_every if save_every is not None else getattr(config, "CMC_USAGE_SAVE_SECONDS", 60)
+        self.used = 0
+        self.calls = {}
+        self.period_start = self._period_start()
+        self.dirty = False
+        self.saved_at = time.monotonic()
+        self.load()
+
+    def _period_start(self, now: datetime = None) -> datetime:
+        now = now or datetime.now(timezone.utc)
+        start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        if self.period == "monthly":
+            start = start.replace(day=1)
+        return start
+
+    def _period_end(self) -> datetime:
+        start = self.period_start
+        if self.period == "monthly":
+            if start.month == 12:
+                return start.replace(year=start.year + 1, month=1)
+            return start.replace(month=start.month + 1)
+        return datetime.fromtimestamp(start.timestamp() + 86400, timezone.utc)
+
+    def load(self) -> None:
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+            if data.get("period_start") == self.period_start.isoformat():
+                self.used = data.get("used", 0)
+                self.calls = data.get("calls", {})
+        except:
+            pass
+
+    def save(self) -> None:
+        try:
+            with open(self.path, "w") as file:
+                json.dump({
+                    "period_start": self.period_start.isoformat(),
+                    "used": self.used,
+                    "calls": self.calls
+                }, file, indent=4)
+            self.dirty = False
+            self.saved_at = time.monotonic()
+        except Exception as e:
+            print(f"Error saving CMC usage: {e}")
+
+    def flush(self) -> None:
+        if self.dirty:
+            self.save()
+
+    def _roll(self) -> None:
+        start = self._period_start()
+        if start != self.period_start:
+            self.period_start = start
+            self.used = 0
+            self.calls = {}
+
+    def record(self, credits: int, endpoint: str) -> None:
+        self._roll()
+        self.used += credits
+        self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+        self.dirty = True
+        if time.monotonic() - self.saved_at >= self.save_every:
+            self.save()
+
+    def remaining_fraction(self) -> float:
+        self._roll()
+        return max(0.0, 1 - self.used / self.limit)
+
+    def exhausted(self) -> bool:
+        return self.remaining_fraction() <= 0
+
+    def pressure(self) -> float:
+        """Spend rate relative to an even spread over the period (>1 means on track to overspend)"""
+        self._roll()
+        start = self.period_start.timestamp()
+        length = self._period_end().timestamp() - start
+        # Floor the elapsed fraction so the first minutes of a period don't read as huge pressure
+        elapsed = max(0.02, (time.time() - start) / length)
+        return (self.used / self.limit) / elapsed
+
+    def interval_multiplier(self, priority: str) -> float:
+        """How much to stretch a field's refresh interval given current budget pressure.
+
+        Every planned call also refreshes the other fields it returns (listings
+        carries the gainers and the altseason index), so the high-priority
+        interval is what sets the CMC call cadence and the spend rate. It
+        stretches in proportion to pressure as soon as spending runs ahead of an
+        even spread, which holds spend at that pace; lower priorities stretch
+        further, which saves credits for endpoints that only serve them.
+        """
+        pressure = max(1.0, self.pressure())
+        weight = {"high": 1, "medium": 1.5}.get(priority, 2)
+        if self.remaining_fraction() < 0.1:
+            # Nearly out: back off harder across the board
+            weight += 1
+        return min(getattr(config, "CMC_MAX_SLOWDOWN", 96), pressure ** weight)
+
+    def summary(self) -> dict:
+        return {
+            "used": self.used,
+            "limit": self.limit,
+            "period": self.period,
+            "pressure": round(self.pressure(), 2),
+            "slowdown": round(self.interval_multiplier("high"), 2),
+            "calls": dict(self.calls),
+        }
+
+
+class CMCQueryPlanner:
+    """Works out which CMC endpoints to call for the metrics that are due this cycle.
+
+    Fields are refreshed no more often than their priority allows (stretched
+    under budget pressure), and the endpoints to call are chosen as the
+    cheapest set that covers every due metric.
+    """
+
+    def __init__(self, registry, budget: CreditBudget):
+        self.registry = registry
+        self.budget = budget
+        self.last_refresh = {}
+
+    def cmc_providers(self) -> list:
+        return [p for p in self.registry.providers.values() if isinstance(p, CMCProvider) and p.enabled()]
+
+    def due_metrics(self, metrics) -> list:
+        """Filter metrics down to those whose refresh interval has elapsed (non-CMC metrics are always due)"""
+        refresh = getattr(config, "CMC_REFRESH_SECONDS", {"high": 60, "medium": 300, "low": 900})
+        now = time.monotonic()
+        due = []
+        for metric in metrics:
+            priority = METRIC_PRIORITY.get(metric)
+            last = self.last_refresh.get(metric)
+            if priority is None or last is None:
+                due.append(metric)
+                continue
+            interval = refresh.get(priority, 60) * self.budget.interval_multiplier(priority)
+            # Small tolerance so a field due "this cycle" isn't pushed back by scheduling jitter
+            if now - last >= interval * 0.95:
+                due.append(metric)
+        return due
+
+    def mark_refreshed(self, metrics) -> None:
+        now = time.monotonic()
+        for metric in metrics:
+            self.last_refresh[metric] = now
+
+    def plan(self, metrics) -> set:
+        """Return the names of the CMC providers to call for these metrics (empty if the budget is spent)"""
+        if self.budget.exhausted():
+            return set()
+
+        providers = [p for p in self.cmc_providers() if self.registry.health.get(p.name).retry_in() == 0]
+        wanted = {m for m in metrics if any(m in p.metrics for p in providers)}
+        if not wanted:
+            return set()
+
+        best = None
+        for size in range(1, len(providers) + 1):
+            for combo in itertools.combinations(providers, size):
+                covered = set().union(*(p.metrics for p in combo))
+                if not wanted <= covered:
+                    continue
+                credits = sum(p.estimated_credits() for p in combo)
+                # Cheapest first, then the fewest calls, then the most spare coverage
+                key = (credits, size, -len(covered))
+                if best is None or key < best[0]:
+                    best = (key, combo)
+
+        return {p.name for p in best[1]} if best else set()
+
+    def skipped(self, metrics) -> set:
+        """CMC providers the registry should not call this cycle"""
+        planned = self.plan(metrics)
+        return {p.name for p in self.cmc_providers()} - planned
+
+
+def listings_credits(limit: int) -> int:
+    """listings/latest costs one credit per 200 results"""
+    return max(1, math.ceil(limit / 200))
@@ -0,0 +1,103 @@
+class DashboardRegistry:
+    """Registered dashboard messages, indexed by message, channel and guild.
+
+    Entries are dicts ({"message_id", "channel_id", "guild_id", "webhook"});
+    legacy entries stored as a bare message id have no channel or guild yet
+    and are filled in once found. The indexes let gateway delete events drop
+    affected dashboards immediately instead of discovering them during an
+    update. Every mutation calls ``save``, except backfills passed
+    ``save=False``, which are written by the next save or ``flush``.
+    """
+
+    def __init__(self, entries: list, save):
+        self._save = save
+        # Backfilled entries not written yet
+        self.dirty = False
+        self.by_message = {}
+        self.by_channel = {}
+        self.by_guild = {}
+        for entry in entries:
+            if isinstance(entry, int):
+                entry = {"message_id": entry}
+            if isinstance(entry, dict) and entry.get("message_id"):
+                self._index(entry)
+
+    def _index(self, entry: dict) -> None:
+        message_id = entry["message_id"]
+        self.by_message[message_id] = entry
+        if entry.get("channel_id"):
+            self.by_channel.setdefault(entry["channel_id"], set()).add(message_id)
+        if entry.get("guild_id"):
+            self.by_guild.setdefault(entry["guild_id"], set()).add(message_id)
+
+    def _unindex(self, message_id: int):
+        entry = self.by_message.pop(message_id, None)
+        if entry is None:
+            return None
+        for index, key in ((self.by_channel, entry.get("channel_id")), (self.by_guild, entry.get("guild_id"))):
+            ids = index.get(key)
+            if ids is not None:
+                ids.discard(message_id)
+                if not ids:
+                    del index[key]
+        return entry
+
+    def save(self) -> None:
+        self.dirty = False
+        self._save()
+
+    def flush(self) -> None:
+        if self.dirty:
+            self.save()
+
+    def get(self, message_id: int) -> dict:
+        return self.by_message.get(message_id)
+
+    def entries(self) -> list:
+        """Snapshot of the current entries, safe to iterate while the registry changes"""
+        return list(self.by_message.values())
+
+    def to_list(self) -> list:
+        return list(self.by_message.values())
+
+    def add(self, entry: dict) -> bool:
+        if entry["message_id"] in self.by_message:
+            return False
+        self._index(entry)
+        self.save()
+        return True
+
+    def replace(self, message_id: int, entry: dict, save: bool = True) -> None:
+        """Swap an entry for a new one (re-posted or migrated message, or newly learnt channel/guild)"""
+        self._unindex(message_id)
+        self._index(entry)
+        if save:
+            self.save()
+        else:
+            self.dirty = True
+
+    def remove(self, *message_ids) -> int:
+        removed = sum(1 for message_id in message_ids if self._unindex(message_id) is not None)
+        if removed:
+            self.save()
+        return removed
+
+    def remove_channel(self, channel_id: int) -> int:
+        return self.remove(*self.by_channel.get(channel_id, ()))
+
+    def remove_guild(self, guild_id: int) -> int:
+        return self.remove(*self.by_guild.get(guild_id, ()))
+
+    def clear(self) -> int:
+        count = len(self.by_message)
+        self.by_message.clear()
+        self.by_channel.clear()
+        self.by_guild.clear()
+        self.save()
+        return count
+
+    def __contains__(self, message_id: int) -> bool:
+        return message_id in self.by_message
+
+    def __len__(self):
+        return len(self.by_message)
@@ -0,0 +1,222 @@
+import codecs
+import json
+
+
+# Listing field name -> path inside a CMC listings/latest coin object
+LISTING_PATHS = {
+    "id": ("id",),
+    "symbol": ("symbol",),
+    "name": ("name",),
+    "slug": ("slug",),
+    "rank": ("cmc_rank",),
+    "price": ("quote", "USD", "price"),
+    "market_cap": ("quote", "USD", "market_cap"),
+    "volume_24h": ("quote", "USD", "volume_24h"),
+    "percent_change_1h": ("quote", "USD", "percent_change_1h"),
+    "percent_change_24h": ("quote", "USD", "percent_change_24h"),
+    "percent_change_7d": ("quote", "USD", "percent_change_7d"),
+    "percent_change_30d": ("quote", "USD", "percent_change_30d"),
+    "percent_change_60d": ("quote", "USD", "percent_change_60d"),
+    "percent_change_90d": ("quote", "USD", "percent_change_90d"),
+}
+
+TEXT_FIELDS = {"symbol", "name", "slug"}
+INT_FIELDS = {"id", "rank"}
+
+
+class ListingRecord:
+    """One coin from a listings payload, holding only the declared fields (others stay None)"""
+
+    __slots__ = tuple(LISTING_PATHS)
+
+    def __init__(self, **values):
+        for field, value in values.items():
+            setattr(self, field, value)
+
+    def __getattr__(self, field):
+        # Only reached for slots that were never set, i.e. fields nobody declared
+        if field in LISTING_PATHS:
+            return None
+        raise AttributeError(field)
+
+    @classmethod
+    def projector(cls, fields):
+        """Build a function turning a decoded coin dict into a record with only ``fields`` set"""
+        top_level = []
+        in_quote = []
+        for field in cls.__slots__:
+            if field not in fields:
+                continue
+            convert = str if field in TEXT_FIELDS else int if field in INT_FIELDS else float
+            path = LISTING_PATHS[field]
+            if len(path) == 1:
+                top_level.append((field, path[0], convert))
+            else:
+                in_quote.append((field, path[2], convert))
+        new = cls.__new__
+
+        def project(coin: dict) -> "ListingRecord":
+            record = new(cls)
+            for field, key, convert in top_level:
+                value = coin.get(key)
+                if value is not None:
+                    setattr(record, field, convert(value))
+            if in_quote:
+                usd = (coin.get("quote") or {}).get("USD") or {}
+                for field, key, convert in in_quote:
+                    value = usd.get(key)
+                    if value is not None:
+                        setattr(record, field, convert(value))
+            return record
+
+        return project
+
+    def __repr__(self):
+        return f"ListingRecord({self.symbol}, price={self.price})"
+
+
+class ListingPayload:
+    """Decoded listings response: the top-level status object plus compact records"""
+
+    __slots__ = ("status", "records")
+
+    def __init__(self, status: dict, records: list):
+        self.status = status
+        self.records = records
+
+
+class StreamingArrayDecoder:
+    """Incrementally decode ``{"...": ..., "data": [ {...}, {...} ]}`` as bytes arrive.
+
+    Elements of the ``array_key`` array are decoded one at a time with the C
+    JSON scanner, handed to ``project`` and dropped, so peak memory is one
+    element plus the projected results rather than the whole document tree.
+    Other top-level keys (small, e.g. ``status``) are kept as-is in ``extras``.
+    """
+
+    def __init__(self, project, array_key: str = "data"):
+        self.project = project
+        self.array_key = array_key
+        self.items = []
+        self.extras = {}
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._scan = json.JSONDecoder().raw_decode
+        self._buf = ""
+        self._pos = 0
+        self._state = "start"
+        self._key = None
+
+    def _skip(self, chars: str = " \t\r\n") -> bool:
+        """Advance past ``chars``; False if the buffer ran out"""
+        buf = self._buf
+        pos = self._pos
+        while pos < len(buf) and buf[pos] in chars:
+            pos += 1
+        self._pos = pos
+        return pos < len(buf)
+
+    def _decode_value(self, final: bool):
+        """Decode one JSON value at the cursor; None if more data is needed"""
+        try:
+            value, end = self._scan(self._buf, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return None
+        # A number touching the end of the buffer may still be growing
+        if end == len(self._buf) and not final and isinstance(value, (int, float)):
+            return None
+        self._pos = end
+        return (value,)
+
+    def _expect(self, char: str) -> None:
+        if self._buf[self._pos] != char:
+            raise ValueError(f"Expected {char!r} at offset {self._pos}, got {self._buf[self._pos]!r}")
+        self._pos += 1
+
+    def _advance(self, final: bool = False) -> None:
+        while True:
+            if self._state == "done":
+                return
+            if not self._skip():
+                return
+
+            if self._state == "start":
+                self._expect("{")
+                self._state = "key"
+
+            elif self._state == "key":
+                if self._buf[self._pos] == ",":
+                    self._pos += 1
+                    continue
+                if self._buf[self._pos] == "}":
+                    self._pos += 1
+                    self._state = "done"
+                    continue
+                decoded = self._decode_value(final)
+                if decoded is None:
+                    return
+                self._key = decoded[0]
+                self._state = "colon"
+
+            elif self._state == "colon":
+                self._expect(":")
+                self._state = "array" if self._key == self.array_key else "value"
+
+            elif self._state == "value":
+                decoded = self._decode_value(final)
+                if decoded is None:
+                    return
+                self.extras[self._key] = decoded[0]
+                self._state = "key"
+
+            elif self._state == "array":
+                if self._buf[self._pos] != "[":
+                    # Not an array (e.g. quotes keyed by symbol); keep the value whole
+                    self._state = "value"
+                    continue
+                self._pos += 1
+                self._state = "element"
+
+            elif self._state == "element":
+                char = self._buf[self._pos]
+                if char == ",":
+                    self._pos += 1
+                    continue
+                if char == "]":
+                    self._pos += 1
+                    self._state = "key"
+                    continue
+                decoded = self._decode_value(final)
+                if decoded is None:
+                    return
+                item = self.project(decoded[0])
+                if item is not None:
+                    self.items.append(item)
+
+            # Drop consumed text now and then instead of on every element
+            if self._pos > 65536:
+                self._buf = self._buf[self._pos:]
+                self._pos = 0
+
+    def feed(self, chunk: bytes) -> None:
+        self._buf += self._text.decode(chunk)
+        self._advance()
+
+    def close(self):
+        self._buf += self._text.decode(b"", final=True)
+        self._advance(final=True)
+        if self._state != "done":
+            raise ValueError("Truncated JSON document")
+        return self
+
+
+class ListingStreamDecoder(StreamingArrayDecoder):
+    """Streams a CMC listings/latest body straight into ListingRecords"""
+
+    def __init__(self, fields):
+        super().__init__(ListingRecord.projector(frozenset(fields)))
+
+    def close(self) -> ListingPayload:
+        super().close()
+        return ListingPayload(self.extras.get("status") or {}, self.items)
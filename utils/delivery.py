@@ -0,0 +1,107 @@
+import asyncio
+
+import discord
+
+import config
+
+
+# Discord JSON error codes
+UNKNOWN_MESSAGE = 10008
+UNKNOWN_WEBHOOK = 10015
+
+
+class WebhookGone(Exception):
+    """The channel's managed webhook was deleted; its messages can no longer be edited"""
+
+
+class WebhookDelivery:
+    """Posts and edits dashboards through one managed webhook per channel.
+
+    Webhook message edits are rate limited per webhook rather than against
+    the bot's global bucket, so a large fleet of dashboards can be edited
+    with more aggregate throughput. Webhook credentials are kept in
+    ``store`` ({channel_id: {"id", "token"}}, persisted by ``save``) so
+    edits don't need a lookup; a deleted webhook is detected on the next
+    edit and a new one is provisioned on demand.
+    """
+
+    def __init__(self, bot, store: dict, save, name: str = None):
+        self.bot = bot
+        self.store = store
+        self.save = save
+        self.name = name or getattr(config, "WEBHOOK_NAME", "Market Dashboard")
+        self._webhooks = {}
+        self._locks = {}
+
+    def _cached(self, channel_id: int):
+        webhook = self._webhooks.get(channel_id)
+        if webhook is None:
+            stored = self.store.get(str(channel_id))
+            if stored is None:
+                return None
+            webhook = discord.Webhook.partial(stored["id"], stored["token"], client=self.bot)
+            self._webhooks[channel_id] = webhook
+        return webhook
+
+    def forget(self, channel_id: int) -> None:
+        self._webhooks.pop(channel_id, None)
+        if self.store.pop(str(channel_id), None) is not None:
+            self.save()
+
+    async def webhook_for(self, channel) -> discord.Webhook:
+        """Return the channel's managed webhook, adopting or creating one if needed (needs Manage Webhooks)"""
+        webhook = self._cached(channel.id)
+        if webhook is not None:
+            return webhook
+
+        lock = self._locks.setdefault(channel.id, asyncio.Lock())
+        async with lock:
+            webhook = self._cached(channel.id)
+            if webhook is not None:
+                return webhook
+
+            # Reuse a webhook this bot created earlier (e.g. before a lost config) before creating another
+            for existing in await channel.webhooks():
+                if existing.name == self.name and existing.user == self.bot.user and existing.token:
+                    webhook = existing
+                    break
+            else:
+                webhook = await channel.create_webhook(name=self.name, reason="Market dashboard delivery")
+
+            self._webhooks[channel.id] = webhook
+            self.store[str(channel.id)] = {"id": webhook.id, "token": webhook.token}
+            self.save()
+            return webhook
+
+    async def post(self, channel, embed: discord.Embed, view=None) -> discord.WebhookMessage:
+        webhook = await self.webhook_for(channel)
+        kwargs = {"embed": embed, "wait": True}
+        if view is not None:
+            kwargs["view"] = view
+        if self.bot.user is not None:
+            kwargs["username"] = self.bot.user.name
+            kwargs["avatar_url"] = self.bot.user.display_avatar.url
+        try:
+            return await webhook.send(**kwargs)
+        except discord.NotFound as e:
+            if e.code == UNKNOWN_WEBHOOK:
+                self.forget(channel.id)
+                raise WebhookGone(channel.id) from e
+            raise
+
+    async def edit(self, entry: dict, embed: discord.Embed, view=None) -> None:
+        """Edit a webhook dashboard; raises WebhookGone if the webhook was deleted, NotFound if the message was"""
+        channel_id = entry["channel_id"]
+        webhook = self._cached(channel_id)
+        if webhook is None:
+            raise WebhookGone(channel_id)
+        kwargs = {"embed": embed}
+        if view is not None:
+            kwargs["view"] = view
+        try:
+            await webhook.edit_message(entry["message_id"], **kwargs)
+        except discord.NotFound as e:
+            if e.code == UNKNOWN_WEBHOOK:
+                self.forget(channel_id)
+                raise WebhookGone(channel_id) from e
+            raise
@@ -0,0 +1,187 @@
+import asyncio
+
+import config
+from utils.fetch import current_provider
+from utils.providers import Provider
+
+
+# Assets shown on the dashboard
+ASSETS = ("BTC", "ETH")
+
+
+class ExchangeQuote:
+    """Open interest (USD) and current funding rate (%) for one asset on one exchange"""
+
+    __slots__ = ("open_interest", "funding")
+
+    def __init__(self, open_interest: float = None, funding: float = None):
+        self.open_interest = open_interest
+        self.funding = funding
+
+    def __repr__(self):
+        return f"ExchangeQuote(oi={self.open_interest}, funding={self.funding})"
+
+
+class ExchangeAdapter:
+    """Base class for one exchange's public derivatives REST API.
+
+    Subclasses set ``name`` and ``BASE_URL`` and implement ``quote`` for a
+    single asset's USDT-margined perpetual. ``base_url`` can be overridden
+    (see config.DERIVATIVES_EXCHANGES) to point an adapter at a stub server.
+    """
+
+    name = None
+    BASE_URL = None
+
+    def __init__(self, base_url: str = None):
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
+
+    async def quote(self, fetcher, asset: str) -> ExchangeQuote:
+        raise NotImplementedError
+
+    async def fetch(self, fetcher, assets) -> dict:
+        """Return {asset: ExchangeQuote} for every asset this exchange answered for"""
+        quotes = await asyncio.gather(*(self.quote(fetcher, asset) for asset in assets), return_exceptions=True)
+        result = {}
+        for asset, quote in zip(assets, quotes):
+            if isinstance(quote, Exception):
+                print(f"Error fetching {asset} derivatives from {self.name}: {quote}")
+            elif quote is not None:
+                result[asset] = quote
+        return result
+
+
+class BinanceAdapter(ExchangeAdapter):
+    """Binance USD-M futures: openInterest is in contracts (base asset), priced with the mark price"""
+
+    name = "binance"
+    BASE_URL = "https://fapi.binance.com"
+
+    async def quote(self, fetcher, asset: str) -> ExchangeQuote:
+        symbol = f"{asset}USDT"
+        interest, premium = await asyncio.gather(
+            fetcher.get_json(f"{self.base_url}/fapi/v1/openInterest", params={"symbol": symbol}),
+            fetcher.get_json(f"{self.base_url}/fapi/v1/premiumIndex", params={"symbol": symbol}),
+        )
+        mark = float(premium["markPrice"])
+        return ExchangeQuote(
+            open_interest=float(interest["openInterest"]) * mark,
+            funding=float(premium["lastFundingRate"]) * 100,
+        )
+
+
+class BybitAdapter(ExchangeAdapter):
+    """Bybit v5 linear tickers carry both USD open interest and the funding rate"""
+
+    name = "bybit"
+    BASE_URL = "https://api.bybit.com"
+
+    async def quote(self, fetcher, asset: str) -> ExchangeQuote:
+        data = await fetcher.get_json(
+            f"{self.base_url}/v5/market/tickers",
+            params={"category": "linear", "symbol": f"{asset}USDT"}
+        )
+        tickers = (data.get("result") or {}).get("list") or []
+        if not tickers:
+            return None
+        ticker = tickers[0]
+        return ExchangeQuote(
+            open_interest=float(ticker["openInterestValue"]),
+            funding=float(ticker["fundingRate"]) * 100,
+        )
+
+
+class OKXAdapter(ExchangeAdapter):
+    """OKX v5 public open-interest (oiUsd) and funding-rate for the USDT swap"""
+
+    name = "okx"
+    BASE_URL = "https://www.okx.com"
+
+    async def quote(self, fetcher, asset: str) -> ExchangeQuote:
+        instrument = f"{asset}-USDT-SWAP"
+        interest, funding = await asyncio.gather(
+            fetcher.get_json(f"{self.base_url}/api/v5/public/open-interest", params={"instType": "SWAP", "instId": instrument}),
+            fetcher.get_json(f"{self.base_url}/api/v5/public/funding-rate", params={"instId": instrument}),
+        )
+        interest = (interest.get("data") or [{}])[0]
+        funding = (funding.get("data") or [{}])[0]
+        return ExchangeQuote(
+            open_interest=float(interest["oiUsd"]) if interest.get("oiUsd") else None,
+            funding=float(funding["fundingRate"]) * 100 if funding.get("fundingRate") else None,
+        )
+
+
+ADAPTERS = {adapter.name: adapter for adapter in (BinanceAdapter, BybitAdapter, OKXAdapter)}
+
+
+def aggregate(quotes: dict, assets=ASSETS) -> dict:
+    """Combine {exchange: {asset: ExchangeQuote}} into total OI and OI-weighted funding per asset"""
+    result = {}
+    for asset in assets:
+        entries = [by_asset[asset] for by_asset in quotes.values() if asset in by_asset]
+
+        interest = [entry.open_interest for entry in entries if entry.open_interest is not None]
+        if interest:
+            result[f"{asset}_OI"] = sum(interest)
+
+        weighted = [(entry.open_interest, entry.funding) for entry in entries
+                    if entry.funding is not None and entry.open_interest]
+        if weighted:
+            total = sum(weight for weight, _ in weighted)
+            result[f"{asset}_FUNDING"] = sum(weight * funding for weight, funding in weighted) / total
+        else:
+            # No OI to weight by: plain mean of whatever funding rates came back
+            rates = [entry.funding for entry in entries if entry.funding is not None]
+            if rates:
+                result[f"{asset}_FUNDING"] = sum(rates) / len(rates)
+    return result
+
+
+class DerivativesProvider(Provider):
+    """Total open interest and OI-weighted funding across several exchanges' public APIs.
+
+    Exchanges are queried concurrently, each under its own timeout and circuit
+    breaker ("derivatives/<exchange>"), so a slow or failing exchange is left
+    out of the aggregate instead of holding up the rest.
+    """
+
+    name = "derivatives"
+    metrics = tuple(f"{asset}_{kind}" for asset in ASSETS for kind in ("OI", "FUNDING"))
+
+    def __init__(self, health, exchanges: dict = None, timeout: float = None):
+        self.health = health
+        exchanges = exchanges if exchanges is not None else getattr(config, "DERIVATIVES_EXCHANGES", {name: None for name in ADAPTERS})
+        self.adapters = [ADAPTERS[name](base_url) for name, base_url in exchanges.items()]
+        self.timeout = timeout or getattr(config, "DERIVATIVES_EXCHANGE_TIMEOUT", 5)
+        self.last_quotes = {}
+
+    def enabled(self) -> bool:
+        return bool(self.adapters)
+
+    async def _fetch_exchange(self, fetcher, adapter: ExchangeAdapter) -> dict:
+        breaker_name = f"{self.name}/{adapter.name}"
+        breaker = self.health.get(breaker_name)
+        if not breaker.allow():
+            return {}
+        current_provider.set(breaker_name)
+        try:
+            quotes = await asyncio.wait_for(adapter.fetch(fetcher, ASSETS), self.timeout)
+        except asyncio.TimeoutError as e:
+            print(f"{adapter.name} derivatives timed out after {self.timeout}s")
+            breaker.record_failure(e)
+            return {}
+        except Exception as e:
+            print(f"Error fetching derivatives from {adapter.name}: {e}")
+            breaker.record_failure(e)
+            return {}
+
+        if quotes:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+        return quotes
+
+    async def fetch(self, fetcher) -> dict:
+        results = await asyncio.gather(*(self._fetch_exchange(fetcher, adapter) for adapter in self.adapters))
+        self.last_quotes = {adapter.name: quotes for adapter, quotes in zip(self.adapters, results) if quotes}
+        return aggregate(self.last_quotes)
@@ -0,0 +1,226 @@
+import contextvars
+import json
+import time
+import zlib
+from collections import OrderedDict
+from urllib.parse import urlencode, urlsplit
+
+import aiohttp
+
+import config
+from utils.ratelimit import RateLimiter
+from utils.tracing import tracer
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Provider on whose behalf the current task is fetching, for I/O accounting.
+# Set by the provider registry around each provider call.
+current_provider = contextvars.ContextVar("current_provider", default="other")
+
+ACCEPT_ENCODING = "gzip, deflate, br" if brotli is not None else "gzip, deflate"
+
+
+class FetchError(Exception):
+    """Raised when an upstream request returns a non-success status"""
+
+    def __init__(self, url: str, status: int):
+        super().__init__(f"HTTP {status} from {url}")
+        self.url = url
+        self.status = status
+
+
+class Decompressor:
+    """Incremental decoder for a Content-Encoding"""
+
+    def __init__(self, encoding: str):
+        encoding = (encoding or "identity").lower()
+        self._zlib = None
+        self._brotli = None
+        if encoding == "gzip":
+            self._zlib = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == "deflate":
+            # Servers disagree on zlib-wrapped vs raw deflate; auto-detect the header
+            self._zlib = zlib.decompressobj(32 + zlib.MAX_WBITS)
+        elif encoding == "br" and brotli is not None:
+            self._brotli = brotli.Decompressor()
+
+    def feed(self, chunk: bytes) -> bytes:
+        if self._zlib is not None:
+            return self._zlib.decompress(chunk)
+        if self._brotli is not None:
+            return self._brotli.process(chunk)
+        return chunk
+
+    def flush(self) -> bytes:
+        return self._zlib.flush() if self._zlib is not None else b""
+
+
+class BufferedBody:
+    """Collects the whole body and parses it once complete"""
+
+    def __init__(self, parse, charset: str):
+        self.parse = parse
+        self.charset = charset
+        self.parts = []
+
+    def feed(self, data: bytes) -> None:
+        if data:
+            self.parts.append(data)
+
+    def close(self):
+        return self.parse(b"".join(self.parts), self.charset)
+
+
+class IOStats:
+    """Bytes transferred and saved per provider, rolled over once per cycle"""
+
+    FIELDS = ("requests", "not_modified", "wire_bytes", "decoded_bytes", "saved_compression", "saved_conditional")
+
+    def __init__(self):
+        self.current = {}
+        self.last_cycle = {}
+        self.totals = {}
+
+    def record(self, provider: str, **values) -> None:
+        for bucket in (self.current, self.totals):
+            stats = bucket.setdefault(provider, dict.fromkeys(self.FIELDS, 0))
+            for key, value in values.items():
+                stats[key] += value
+
+    def begin_cycle(self) -> dict:
+        """Start a new cycle and return the stats of the one that just ended"""
+        self.last_cycle, self.current = self.current, {}
+        return self.last_cycle
+
+    @staticmethod
+    def describe(cycle: dict) -> str:
+        wire = sum(s["wire_bytes"] for s in cycle.values())
+        saved = sum(s["saved_compression"] + s["saved_conditional"] for s in cycle.values())
+        not_modified = sum(s["not_modified"] for s in cycle.values())
+        requests = sum(s["requests"] for s in cycle.values())
+        return f"{requests} requests, {wire / 1024:.1f} KiB transferred, {saved / 1024:.1f} KiB saved ({not_modified} not modified)"
+
+
+class Fetcher:
+    """Shared outbound HTTP client used by every provider.
+
+    Keeps one pooled aiohttp session for the lifetime of the cog instead of
+    opening a new connection per request, and sends every request through
+    the per-host rate limiter. Responses are requested compressed and
+    decoded here so the wire size can be measured; upstreams that send an
+    ETag or Last-Modified are revalidated with conditional requests, and a
+    304 returns the previously parsed result without re-parsing.
+    """
+
+    def __init__(self, timeout: float = None, limiter: RateLimiter = None):
+        self.timeout = aiohttp.ClientTimeout(total=timeout or getattr(config, "PROVIDER_TIMEOUT", 10))
+        self.limiter = limiter or RateLimiter()
+        self.io = IOStats()
+        self.validators = OrderedDict()
+        self.max_validators = getattr(config, "CONDITIONAL_CACHE_SIZE", 256)
+        self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # Created lazily so it binds to the running event loop
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=self.timeout, auto_decompress=False)
+        return self._session
+
+    @staticmethod
+    def _cache_key(url: str, params: dict) -> str:
+        return f"{url}?{urlencode(sorted((params or {}).items()))}"
+
+    async def _request(self, url: str, params: dict, headers: dict, sink):
+        """Send a GET and stream the decompressed body into ``sink(charset)``, whose close() gives the result"""
+        host = urlsplit(url).hostname
+        provider = current_provider.get()
+        key = self._cache_key(url, params)
+        cached = self.validators.get(key)
+
+        request_headers = dict(headers or {})
+        request_headers["Accept-Encoding"] = ACCEPT_ENCODING
+        if cached is not None:
+            if cached["etag"]:
+                request_headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                request_headers["If-Modified-Since"] = cached["last_modified"]
+
+        queued = time.perf_counter()
+        async with self.limiter.slot(host):
+            # Time spent waiting for the per-host limiter is recorded on the span but not counted in its duration
+            with tracer.span(f"http:{provider}", host=host, wait_ms=round((time.perf_counter() - queued) * 1000, 2)) as span:
+                async with self.session.get(url, params=params, headers=request_headers) as response:
+                    self.limiter.observe(host, response.status, response.headers)
+                    span["status"] = response.status
+
+                    if response.status == 304 and cached is not None:
+                        self.validators.move_to_end(key)
+                        self.io.record(provider, requests=1, not_modified=1, saved_conditional=cached["size"])
+                        span["outcome"] = "not_modified"
+                        return cached["parsed"]
+
+                    if response.status != 200:
+                        raise FetchError(url, response.status)
+
+                    consumer = sink(response.charset or "utf-8")
+                    decompressor = Decompressor(response.headers.get("Content-Encoding"))
+                    wire = 0
+                    decoded = 0
+                    async for chunk in response.content.iter_chunked(64 * 1024):
+                        wire += len(chunk)
+                        data = decompressor.feed(chunk)
+                        decoded += len(data)
+                        consumer.feed(data)
+                    tail = decompressor.flush()
+                    decoded += len(tail)
+                    consumer.feed(tail)
+
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+                span["wire_bytes"] = wire
+                span["decoded_bytes"] = decoded
+
+        self.io.record(
+            provider,
+            requests=1,
+            wire_bytes=wire,
+            decoded_bytes=decoded,
+            saved_compression=max(0, decoded - wire),
+        )
+
+        # Buffered bodies are parsed here; streaming decoders have been parsing all along and just finish
+        with tracer.span(f"parse:{provider}", bytes=decoded):
+            parsed = consumer.close()
+        if etag or last_modified:
+            self.validators[key] = {"etag": etag, "last_modified": last_modified, "parsed": parsed, "size": decoded}
+            self.validators.move_to_end(key)
+            while len(self.validators) > self.max_validators:
+                self.validators.popitem(last=False)
+        return parsed
+
+    async def get_json(self, url: str, params: dict = None, headers: dict = None, parse=None):
+        """GET a JSON document; ``parse`` (optional) transforms the decoded object and its result is what gets cached"""
+        def decode(body, charset):
+            data = json.loads(body.decode(charset))
+            return parse(data) if parse else data
+        return await self._request(url, params, headers, lambda charset: BufferedBody(decode, charset))
+
+    async def get_text(self, url: str, params: dict = None, headers: dict = None, parse=None):
+        """GET a text document; ``parse`` (optional) transforms the text and its result is what gets cached"""
+        def decode(body, charset):
+            text = body.decode(charset, errors="replace")
+            return parse(text) if parse else text
+        return await self._request(url, params, headers, lambda charset: BufferedBody(decode, charset))
+
+    async def get_stream(self, url: str, decoder_factory, params: dict = None, headers: dict = None):
+        """GET a document and feed it chunk by chunk to a streaming decoder (see utils.decode)"""
+        return await self._request(url, params, headers, lambda charset: decoder_factory())
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
@@ -0,0 +1,74 @@
+"""Render-stage formatting of raw snapshot values"""
+
+from utils.snapshot import ERROR
+
+
+def money(value: float) -> str:
+    """Whole units with thousands separators"""
+    return f"{value:,.0f}"
+
+
+def price(value: float) -> str:
+    """Prices of any magnitude: whole dollars for large values, significant digits for small coins"""
+    if value >= 100:
+        return f"{value:,.0f}"
+    if value >= 1:
+        return f"{value:,.2f}"
+    return f"{value:.6g}"
+
+
+def decimals(places: int):
+    return lambda value: f"{value:.{places}f}"
+
+
+def billions(value: float) -> str:
+    return f"{value / 1_000_000_000:.1f}B"
+
+
+def trillions(value: float) -> str:
+    return f"{value / 1_000_000_000_000:.2f}T"
+
+
+def change(value: float) -> str:
+    return f"{value:+.2f}%"
+
+
+def duration(seconds: int) -> str:
+    """Compact interval like "1h 30m" or "30s" """
+    hours, rest = divmod(int(seconds), 3600)
+    minutes, secs = divmod(rest, 60)
+    parts = [f"{value}{unit}" for value, unit in ((hours, "h"), (minutes, "m"), (secs, "s")) if value]
+    return " ".join(parts) or "0m"
+
+
+def gainers(value: list) -> str:
+    lines = [f"{rank}. {symbol}: +{change:.1f}%" for rank, (symbol, change) in enumerate(value, 1)]
+    return "\n".join(lines) or "No Data"
+
+
+def field(snapshot, metric: str, formatter=str, missing: str = "Error", pending: str = "Loading...") -> str:
+    """Format one snapshot field, with placeholders for fields not fetched yet or failed"""
+    if snapshot is None:
+        return pending
+    entry = snapshot.get(metric)
+    if entry is None:
+        return pending
+    if entry.status == ERROR or entry.value is None:
+        return missing
+    return formatter(entry.value)
+
+
+# Display format for single metric values (alerts, lookups)
+METRIC_FORMATS = {
+    "BTC_USD": lambda value: f"${money(value)}",
+    "ETH_USD": lambda value: f"${money(value)}",
+    "SOL_USD": lambda value: f"${value:.2f}",
+    "ETH_BTC_RATIO": decimals(4),
+    "BTC_DOMINANCE": lambda value: f"{value:.2f}%",
+    "USDT_DOMINANCE": lambda value: f"{value:.2f}%",
+    "TOTAL_MCAP": lambda value: f"${trillions(value)}",
+}
+
+
+def metric_value(metric: str, value) -> str:
+    return METRIC_FORMATS.get(metric, str)(value)
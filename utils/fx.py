@@ -0,0 +1,76 @@
+import time
+
+import config
+from utils.providers import Provider
+from utils.snapshot import ERROR, Field, Snapshot
+
+
+# Snapshot fields holding USD amounts; everything else (ratios, dominance, funding) is currency-free
+MONEY_METRICS = ("BTC_USD", "ETH_USD", "SOL_USD", "BTC_MCAP", "ETH_MCAP", "USDT_MCAP", "TOTAL_MCAP", "BTC_OI", "ETH_OI")
+
+CURRENCY_SYMBOLS = {"USD": "$", "EUR": "€", "GBP": "£", "JPY": "¥"}
+
+
+def currency_prefix(currency: str) -> str:
+    return CURRENCY_SYMBOLS.get(currency, f"{currency} ")
+
+
+class FrankfurterProvider(Provider):
+    """USD exchange rates (ECB reference rates) from the keyless Frankfurter API.
+
+    Rates move slowly and only feed the render-stage conversion, so they are
+    refetched at most every ``FX_RATES_TTL`` seconds and the cached rates are
+    returned in between (and kept if a refresh fails).
+    """
+
+    name = "frankfurter"
+    metrics = ("FX_RATES",)
+
+    def __init__(self, currencies=None, ttl: float = None):
+        self.currencies = [currency for currency in (currencies or getattr(config, "DASHBOARD_CURRENCIES", ("USD",))) if currency != "USD"]
+        self.ttl = ttl or getattr(config, "FX_RATES_TTL", 6 * 3600)
+        self.rates = {}
+        self.fetched_at = 0.0
+
+    def enabled(self) -> bool:
+        return bool(self.currencies)
+
+    async def fetch(self, fetcher) -> dict:
+        if self.rates and time.time() - self.fetched_at < self.ttl:
+            return {"FX_RATES": self.rates}
+        try:
+            data = await fetcher.get_json(
+                "https://api.frankfurter.app/latest",
+                params={"from": "USD", "to": ",".join(self.currencies)}
+            )
+            rates = {currency: float(rate) for currency, rate in (data.get("rates") or {}).items()}
+        except Exception as e:
+            if not self.rates:
+                raise
+            print(f"FX refresh failed, keeping rates from {int(time.time() - self.fetched_at)}s ago: {e}")
+            return {"FX_RATES": self.rates}
+        if rates:
+            self.rates = rates
+            self.fetched_at = time.time()
+        return {"FX_RATES": self.rates} if self.rates else {}
+
+
+def convert(snapshot: Snapshot, currency: str):
+    """View of a USD snapshot with money fields in ``currency``.
+
+    Returns (snapshot, currency actually used): the snapshot itself for USD,
+    or when no rate is available for the currency, so the dashboard falls
+    back to dollars rather than showing errors.
+    """
+    if currency == "USD" or snapshot is None:
+        return snapshot, "USD"
+    rate = (snapshot.value("FX_RATES") or {}).get(currency)
+    if not rate:
+        return snapshot, "USD"
+
+    fields = dict(snapshot.fields)
+    for metric in MONEY_METRICS:
+        field = fields.get(metric)
+        if field is not None and field.status != ERROR and field.value is not None:
+            fields[metric] = Field(field.value * rate, field.source, field.fetched_at, field.status)
+    return Snapshot(snapshot.taken_at, fields, snapshot.restored), currency
@@ -0,0 +1,39 @@
+import discord
+
+import config
+
+
+# Gateway profiles: "lean" receives and caches only what the dashboard cog uses,
+# "full" is every intent with discord.py's default caches
+PROFILES = ("lean", "full")
+
+
+def intents_for(profile: str) -> discord.Intents:
+    if profile == "full":
+        return discord.Intents.all()
+    intents = discord.Intents.none()
+    intents.guilds = True          # channel cache for edits, channel/guild delete events
+    intents.guild_messages = True  # raw message delete events drop dashboards immediately
+    return intents
+
+
+def bot_options(profile: str = None) -> dict:
+    """Keyword arguments for the bot constructor for a gateway profile (config.GATEWAY_PROFILE by default)"""
+    profile = profile or getattr(config, "GATEWAY_PROFILE", "lean")
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown gateway profile {profile!r}; expected one of {', '.join(PROFILES)}")
+
+    options = {"intents": intents_for(profile)}
+    if profile == "lean":
+        # No member list, no message cache and no member chunking on connect
+        options["member_cache_flags"] = discord.MemberCacheFlags.none()
+        options["max_messages"] = None
+        options["chunk_guilds_at_startup"] = False
+
+    shard_count = getattr(config, "SHARD_COUNT", None)
+    if shard_count:
+        options["shard_count"] = shard_count
+        shard_ids = getattr(config, "SHARD_IDS", None)
+        if shard_ids:
+            options["shard_ids"] = list(shard_ids)
+    return options
@@ -0,0 +1,107 @@
+import random
+import time
+
+import config
+
+
+class CircuitBreaker:
+    """Tracks the health of one upstream provider.
+
+    After a run of consecutive failures the circuit opens and every call is
+    refused immediately until the backoff expires. The first call after that
+    is a half-open probe: success closes the circuit, failure reopens it with
+    an exponentially longer (jittered) backoff.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, name: str, failure_threshold: int = None, base_backoff: float = None, max_backoff: float = None):
+        self.name = name
+        self.failure_threshold = failure_threshold or getattr(config, "BREAKER_FAILURE_THRESHOLD", 3)
+        self.base_backoff = base_backoff or getattr(config, "BREAKER_BASE_BACKOFF", 30)
+        self.max_backoff = max_backoff or getattr(config, "BREAKER_MAX_BACKOFF", 900)
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.open_count = 0
+        self.open_until = 0.0
+        self.probe_in_flight = False
+        self.last_error = None
+
+    def allow(self) -> bool:
+        """Return True if a request may be sent to this provider right now"""
+        if self.state == self.CLOSED:
+            return True
+
+        if self.state == self.OPEN:
+            if time.monotonic() < self.open_until:
+                return False
+            self.state = self.HALF_OPEN
+            self.probe_in_flight = False
+
+        # Half-open: let exactly one probe through
+        if self.probe_in_flight:
+            return False
+        self.probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self.open_count = 0
+        self.probe_in_flight = False
+        self.last_error = None
+
+    def record_failure(self, error=None) -> None:
+        self.failures += 1
+        self.last_error = error
+        self.probe_in_flight = False
+
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self) -> None:
+        backoff = min(self.max_backoff, self.base_backoff * (2 ** self.open_count))
+        # Equal jitter: keep at least half the backoff, randomise the rest so
+        # several providers failing together don't all probe at once
+        delay = backoff / 2 + random.uniform(0, backoff / 2)
+
+        self.state = self.OPEN
+        self.open_count += 1
+        self.open_until = time.monotonic() + delay
+        print(f"Circuit OPEN for {self.name} ({self.failures} failures), retry in {delay:.0f}s")
+
+    def retry_in(self) -> float:
+        """Seconds until an open circuit allows a probe (0 if not open)"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.open_until - time.monotonic())
+
+
+class HealthTracker:
+    """Lazily created circuit breakers keyed by provider name"""
+
+    def __init__(self):
+        self.breakers = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self.breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name)
+            self.breakers[name] = breaker
+        return breaker
+
+    def allow(self, name: str) -> bool:
+        return self.get(name).allow()
+
+    def summary(self) -> dict:
+        return {
+            name: {
+                "state": breaker.state,
+                "failures": breaker.failures,
+                "retry_in": round(breaker.retry_in()),
+            }
+            for name, breaker in self.breakers.items()
+        }
@@ -0,0 +1,92 @@
+import hashlib
+import json
+from collections import deque
+
+from aiohttp import web
+
+import config
+from utils.snapshot import ERROR
+
+
+class SnapshotAPI:
+    """Read-only local HTTP endpoint for the current snapshot and recent history.
+
+    ``GET /snapshot`` returns every field with its source, status and fetch
+    time; ``GET /history`` returns the numeric fields of the last
+    ``SNAPSHOT_API_HISTORY`` snapshots. Responses are served from memory and
+    never trigger an upstream call. Each body is encoded once per snapshot and
+    reused for every request, so serving stays cheap on the bot's event loop;
+    clients revalidate with ETag/If-None-Match and get 304s in between.
+    """
+
+    def __init__(self, market, host: str = None, port: int = None, history: int = None, max_age: int = None):
+        self.market = market
+        self.host = host or getattr(config, "SNAPSHOT_API_HOST", "127.0.0.1")
+        self.port = port or getattr(config, "SNAPSHOT_API_PORT", 8765)
+        self.max_age = max_age if max_age is not None else getattr(config, "SNAPSHOT_API_MAX_AGE", 30)
+        self.history = deque(maxlen=history or getattr(config, "SNAPSHOT_API_HISTORY", 288))
+        self.bodies = {}
+        self.runner = None
+        market.listeners.append(self.update)
+        if market.snapshot is not None:
+            self.update(market.snapshot)
+
+    def update(self, snapshot) -> None:
+        values = {
+            metric: field.value for metric, field in snapshot.fields.items()
+            if field.status != ERROR and isinstance(field.value, (int, float))
+        }
+        if self.history and self.history[-1][0] == snapshot.taken_at:
+            self.history.pop()
+        self.history.append((snapshot.taken_at, values))
+        self.bodies.clear()
+
+    def snapshot_payload(self) -> dict:
+        snapshot = self.market.snapshot
+        return {
+            "taken_at": snapshot.taken_at,
+            "restored": snapshot.restored,
+            "fields": {
+                metric: {"value": field.value, "source": field.source, "fetched_at": field.fetched_at, "status": field.status}
+                for metric, field in snapshot.fields.items()
+            },
+        }
+
+    def history_payload(self) -> dict:
+        return {"points": [{"taken_at": taken_at, "values": values} for taken_at, values in self.history]}
+
+    def _body(self, name: str, build):
+        """(etag, body) for a resource, encoded once until the next snapshot"""
+        cached = self.bodies.get(name)
+        if cached is None:
+            body = json.dumps(build(), separators=(",", ":")).encode()
+            cached = self.bodies[name] = (f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"', body)
+        return cached
+
+    def _respond(self, request: web.Request, name: str, build) -> web.Response:
+        if self.market.snapshot is None:
+            return web.json_response({"error": "no data yet"}, status=503, headers={"Retry-After": "5"})
+        etag, body = self._body(name, build)
+        headers = {"ETag": etag, "Cache-Control": f"public, max-age={self.max_age}"}
+        if etag in request.headers.get("If-None-Match", ""):
+            return web.Response(status=304, headers=headers)
+        return web.Response(body=body, content_type="application/json", headers=headers)
+
+    async def get_snapshot(self, request: web.Request) -> web.Response:
+        return self._respond(request, "snapshot", self.snapshot_payload)
+
+    async def get_history(self, request: web.Request) -> web.Response:
+        return self._respond(request, "history", self.history_payload)
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/snapshot", self.get_snapshot)
+        app.router.add_get("/history", self.get_history)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+        print(f"Snapshot API listening on http://{self.host}:{self.port}")
+
+    async def close(self) -> None:
+        if self.runner is not None:
+            await self.runner.cleanup()
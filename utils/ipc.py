@@ -0,0 +1,320 @@
+import asyncio
+import itertools
+import json
+import os
+import struct
+import time
+
+import config
+from utils.snapshot import Snapshot
+from utils.state import StateStore, dump_records, load_quotes, load_records, load_snapshot
+from utils.tracing import tracer
+
+
+# Frames are a 4-byte big-endian length followed by that many bytes of JSON
+HEADER = struct.Struct("!I")
+MAX_FRAME = 64 * 2**20
+# A client that stops reading is dropped once this much is queued for it
+MAX_BUFFER = 16 * 2**20
+
+
+def encode_frame(message: dict) -> bytes:
+    body = json.dumps(message, separators=(",", ":")).encode()
+    return HEADER.pack(len(body)) + body
+
+
+async def read_frame(reader: asyncio.StreamReader) -> dict:
+    size, = HEADER.unpack(await reader.readexactly(HEADER.size))
+    if size > MAX_FRAME:
+        raise ValueError(f"frame of {size} bytes exceeds the {MAX_FRAME} byte limit")
+    return json.loads(await reader.readexactly(size))
+
+
+class SnapshotServer:
+    """Publishes a MarketData's snapshots to bot processes over a Unix socket.
+
+    Every connection is a subscriber: it receives the current snapshot on
+    connect and each new one after. Snapshot frames carry the server's epoch
+    (its start time) and a version counter that increases with every publish,
+    and are encoded once per version however many clients there are. Clients
+    may send:
+
+    - ``{"op": "fetch", "max_age": s}``: refresh unless the current snapshot
+      is at most ``s`` seconds old. Concurrent requests share one fetch and
+      the result reaches everyone through the normal publish.
+    - ``{"op": "quote", "id": n, "coin_id": c}``: a /price lookup, answered
+      with ``{"op": "quote", "id": n, "record", "fetched_at", "error"}``.
+    """
+
+    def __init__(self, market, path: str = None):
+        self.market = market
+        self.path = path or getattr(config, "IPC_SOCKET_PATH", "./data/snapshot.sock")
+        self.epoch = time.time()
+        self.version = 0
+        self.frame = None
+        self.clients = set()
+        self.server = None
+        self._handlers = set()
+        market.listeners.append(self.publish)
+
+    async def start(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # left behind by a previous run
+        self.server = await asyncio.start_unix_server(self._serve, path=self.path)
+        if self.market.snapshot is not None:
+            self.publish(self.market.snapshot)
+        print(f"Publishing snapshots on {self.path}")
+
+    async def close(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for writer in list(self.clients):
+            writer.close()
+        # Let connection handlers see the close and exit rather than being cancelled at shutdown
+        if self._handlers:
+            await asyncio.wait(self._handlers, timeout=1)
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def publish(self, snapshot: Snapshot) -> None:
+        self.version += 1
+        self.frame = encode_frame({
+            "op": "snapshot",
+            "epoch": self.epoch,
+            "version": self.version,
+            "restored": snapshot.restored,
+            "data": self.market.export(),
+        })
+        for writer in list(self.clients):
+            self._send(writer, self.frame)
+
+    def _send(self, writer: asyncio.StreamWriter, frame: bytes) -> None:
+        if writer.is_closing() or writer.transport.get_write_buffer_size() > MAX_BUFFER:
+            self.clients.discard(writer)
+            writer.close()
+            return
+        writer.write(frame)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.clients.add(writer)
+        self._handlers.add(asyncio.current_task())
+        if self.frame is not None:
+            self._send(writer, self.frame)
+        pending = set()
+        try:
+            while True:
+                task = asyncio.ensure_future(self._handle(await read_frame(reader), writer))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            print(f"Dropping snapshot client: {e}")
+        finally:
+            self.clients.discard(writer)
+            self._handlers.discard(asyncio.current_task())
+            for task in pending:
+                task.cancel()
+            writer.close()
+
+    async def _handle(self, message: dict, writer: asyncio.StreamWriter) -> None:
+        op = message.get("op")
+        if op == "fetch":
+            snapshot = self.market.snapshot
+            if snapshot is None or snapshot.restored or time.time() - snapshot.taken_at > message.get("max_age", 0):
+                try:
+                    with tracer.trace("fetch_request"):
+                        await self.market.get_all_data()
+                except Exception as e:
+                    print(f"Error fetching snapshot for a client: {e}")
+            elif self.frame is not None:
+                self._send(writer, self.frame)
+        elif op == "quote":
+            reply = {"op": "quote", "id": message.get("id"), "record": None, "fetched_at": None, "error": None}
+            try:
+                record, fetched_at = await self.market.quote(int(message["coin_id"]))
+                if record is not None:
+                    reply["record"] = dump_records([record])[0]
+                    reply["fetched_at"] = fetched_at
+            except Exception as e:
+                reply["error"] = str(e) or type(e).__name__
+            self._send(writer, encode_frame(reply))
+
+
+class SnapshotFeed:
+    """Consumes the snapshots published by ``fetcher.py``; stands in for MarketData in bot processes.
+
+    Never talks to upstream APIs. ``get_all_data`` returns the latest snapshot
+    if it is recent enough, otherwise asks the fetcher for a refresh and waits
+    for it to be published (up to ``timeout``, then serves the latest one it
+    has). The connection is re-established with backoff if the fetcher
+    restarts.
+    """
+
+    def __init__(self, path: str = None, max_age: float = None, timeout: float = None):
+        self.path = path or getattr(config, "IPC_SOCKET_PATH", "./data/snapshot.sock")
+        self.max_age = max_age or getattr(config, "IPC_MAX_AGE", 30)
+        self.timeout = timeout or getattr(config, "IPC_TIMEOUT", 30)
+        self.snapshot = None
+        self.records = []
+        self.records_at = 0.0
+        self.quotes = {}
+        self.listeners = []
+        self.state = StateStore()
+        self.epoch = None
+        self.version = 0
+        self._writer = None
+        self._updated = asyncio.Event()
+        self._requests = {}
+        self._ids = itertools.count(1)
+        self._fetching = None
+        self._task = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+
+    async def _run(self) -> None:
+        delay = 1
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path)
+            except OSError as e:
+                if delay == 1:
+                    print(f"Snapshot publisher not reachable at {self.path} ({e}); retrying")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+                continue
+
+            print(f"Connected to snapshot publisher at {self.path}")
+            delay = 1
+            self._writer = writer
+            self._notify()  # waiters can send their requests now
+            try:
+                while True:
+                    self._receive(await read_frame(reader))
+            except (asyncio.IncompleteReadError, ConnectionError):
+                print("Snapshot publisher disconnected; reconnecting")
+            except Exception as e:
+                print(f"Error reading from snapshot publisher: {e}")
+            finally:
+                self._writer = None
+                writer.close()
+                for future in self._requests.values():
+                    if not future.done():
+                        future.set_exception(ConnectionError("snapshot publisher disconnected"))
+                self._requests.clear()
+
+    def _receive(self, message: dict) -> None:
+        op = message.get("op")
+        if op == "snapshot":
+            if message["epoch"] == self.epoch and message["version"] <= self.version:
+                return
+            self.epoch, self.version = message["epoch"], message["version"]
+            data = message["data"]
+            self.snapshot = load_snapshot(data["snapshot"], restored=message.get("restored", False))
+            self.records = load_records(data.get("records", []))
+            self.records_at = data.get("records_at", 0.0)
+            self.quotes = load_quotes(data.get("quotes", {}))
+            for listener in self.listeners:
+                listener(self.snapshot)
+            self._notify()
+        elif op == "quote":
+            future = self._requests.pop(message.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(message)
+
+    def _notify(self) -> None:
+        """Wake everyone waiting on the current generation (new snapshot or new connection)"""
+        self._updated.set()
+        self._updated = asyncio.Event()
+
+    def _send(self, message: dict) -> None:
+        if self._writer is None:
+            raise ConnectionError("not connected to the snapshot publisher")
+        self._writer.write(encode_frame(message))
+
+    def fresh(self) -> bool:
+        snapshot = self.snapshot
+        return snapshot is not None and not snapshot.restored and time.time() - snapshot.taken_at <= self.max_age
+
+    def start_fetch(self):
+        """Same contract as MarketData.start_fetch; the latest (stale) snapshot stands in for the partial one"""
+        fetch = asyncio.ensure_future(self.get_all_data())
+        partial = asyncio.get_running_loop().create_future()
+        if self.snapshot is not None and not self.fresh():
+            partial.set_result(self.snapshot)
+        return fetch, partial
+
+    async def get_all_data(self) -> Snapshot:
+        if self.fresh():
+            return self.snapshot
+        if self._fetching is None or self._fetching.done():
+            self._fetching = asyncio.ensure_future(self._request_fresh())
+        return await asyncio.shield(self._fetching)
+
+    async def _request_fresh(self) -> Snapshot:
+        deadline = time.monotonic() + self.timeout
+        while not self.fresh():
+            updated = self._updated
+            if self._writer is not None:
+                self._send({"op": "fetch", "max_age": self.max_age})
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(updated.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+        if self.snapshot is None:
+            raise RuntimeError("no snapshot received from the fetcher process")
+        return self.snapshot
+
+    def progress_snapshot(self, final: bool = False) -> Snapshot:
+        return self.snapshot if self.snapshot is not None else Snapshot()
+
+    async def quote(self, coin_id: int):
+        """Return (ListingRecord, fetched_at) for /price, looked up by the fetcher process"""
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._requests[request_id] = future
+        try:
+            self._send({"op": "quote", "id": request_id, "coin_id": coin_id})
+            reply = await asyncio.wait_for(future, timeout=self.timeout)
+        finally:
+            self._requests.pop(request_id, None)
+        if reply.get("error"):
+            raise RuntimeError(reply["error"])
+        if reply.get("record") is None:
+            return None, None
+        return load_records([reply["record"]])[0], reply["fetched_at"]
+
+    async def refresh_symbols(self, symbols) -> None:
+        """The fetcher process refreshes the shared index file; pick up its copy once ours is stale"""
+        if symbols.stale():
+            symbols.load()
+
+    def restore_state(self) -> None:
+        """Read the fetcher's state file so commands can answer before the first publish"""
+        data = self.state.load()
+        if not data.get("snapshot"):
+            return
+        try:
+            self.snapshot = load_snapshot(data["snapshot"])
+            self.records = load_records(data.get("records", []))
+            self.records_at = data.get("records_at", 0.0)
+            self.quotes = load_quotes(data.get("quotes", {}))
+        except Exception as e:
+            print(f"Error restoring saved state: {e}")
+
+    def save_state(self) -> None:
+        """The fetcher process owns the state file"""
@@ -0,0 +1,206 @@
+import asyncio
+import time
+
+import config
+from utils import formatting as fmt
+from utils.cmc import CMCQueryPlanner, CreditBudget
+from utils.fetch import Fetcher, IOStats
+from utils.health import HealthTracker
+from utils.snapshot import ERROR, FALLBACK, OK, Field, Snapshot, derive
+from utils.sources import build_registry
+from utils.state import StateStore, dump_quotes, dump_records, dump_snapshot, load_quotes, load_records, load_snapshot
+from utils.symbols import CMCSymbolMap, PriceLookup
+from utils.tracing import tracer
+
+# Raw metrics requested from the provider registry every cycle
+RAW_METRICS = (
+    "BTC_USD", "ETH_USD", "SOL_USD",
+    "USDT_MCAP", "TOTAL_MCAP", "BTC_DOMINANCE",
+    "GAINERS_24H", "GAINERS_7D", "GAINERS_30D",
+    "BTC_OI", "ETH_OI", "BTC_FUNDING", "ETH_FUNDING",
+    "FNG_VALUE", "FNG_CLASS", "ALT_SEASON_INDEX",
+) + (("ALT_SEASON_SCRAPED",) if getattr(config, "ALT_SEASON_CROSS_CHECK", False) else ()) + (
+    ("FX_RATES",) if set(getattr(config, "DASHBOARD_CURRENCIES", ("USD",))) - {"USD"} else ()
+)
+
+# Fields a progressive /dashboard waits for before its first post
+CORE_METRICS = frozenset(("BTC_USD", "ETH_USD", "SOL_USD", "USDT_MCAP", "TOTAL_MCAP", "BTC_DOMINANCE"))
+
+
+class MarketData:
+    """Produces market snapshots from the upstream providers.
+
+    Owns everything that talks to upstream APIs: the fetcher, circuit
+    breakers, CMC credit budget and planner, provider registry and /price
+    lookups. The dashboard cog uses it in-process; ``fetcher.py`` runs it
+    alone and publishes its snapshots to bot processes (utils/ipc.py), which
+    use a SnapshotFeed with the same interface instead.
+    """
+
+    def __init__(self, cmc_api_key: str, coindesk_api_key: str):
+        self.health = HealthTracker()
+        self.fetcher = Fetcher()
+        self.cmc_budget = CreditBudget()
+        self.registry = build_registry(self.fetcher, self.health, cmc_api_key, coindesk_api_key, self.cmc_budget)
+        self.cmc_planner = CMCQueryPlanner(self.registry, self.cmc_budget)
+        self.metric_cache = {}
+        self.snapshot = None
+        # Called with every new snapshot
+        self.listeners = []
+        self._fetching = None
+        self._partial = None
+        self._progress = ((), ())
+
+        self.listings = self.registry.providers["cmc-listings"]
+        self.listings.require_fields("id", "name", "rank")
+        self.symbol_map = CMCSymbolMap(cmc_api_key, self.cmc_budget)
+        self.prices = PriceLookup(cmc_api_key, self.fetcher, self.listings, self.cmc_budget)
+        self.state = StateStore()
+
+    @property
+    def records(self) -> list:
+        return self.listings.records
+
+    @property
+    def quotes(self) -> dict:
+        return self.registry.providers["derivatives"].last_quotes
+
+    def start_fetch(self):
+        """Return the fetch in progress, starting one if needed, and a future for its partial snapshot"""
+        if self._fetching is None or self._fetching.done():
+            self._partial = asyncio.get_running_loop().create_future()
+            self._fetching = asyncio.ensure_future(self.collect_snapshot(self._partial))
+        return self._fetching, self._partial
+
+    async def get_all_data(self) -> Snapshot:
+        """Fetch all market data into a raw snapshot; callers arriving mid-fetch share the fetch in progress"""
+        fetch, _ = self.start_fetch()
+        return await asyncio.shield(fetch)
+
+    def progress_snapshot(self, final: bool = False) -> Snapshot:
+        """Snapshot of the fetch in progress: fields that weren't due plus due fields that have arrived.
+        Fields still pending are left out (rendered as placeholders), or marked failed if ``final``.
+        """
+        due, tasks = self._progress
+        now = time.time()
+        snapshot = Snapshot(now, {metric: entry for metric, entry in self.metric_cache.items() if metric not in due})
+        for metric, task in zip(due, tasks):
+            if not task.done():
+                if final:
+                    snapshot.set(metric, Field(None, None, now, ERROR))
+                continue
+            value, source = (None, None) if task.cancelled() or task.exception() else task.result()
+            if value is None:
+                snapshot.set(metric, Field(None, None, now, ERROR))
+            else:
+                snapshot.set(metric, Field(value, source, now, FALLBACK if self.registry.is_fallback(source) else OK))
+        derive(snapshot)
+        return snapshot
+
+    async def collect_snapshot(self, partial=None) -> Snapshot:
+        """Fetch all market data through the provider registry into a raw snapshot.
+        ``partial`` (a future) is resolved with a partial snapshot as soon as the core fields are in.
+        """
+        # Only refresh fields that are due, calling the cheapest set of CMC endpoints that covers them
+        due = self.cmc_planner.due_metrics(RAW_METRICS)
+        self.registry.begin_cycle(skip=self.cmc_planner.skipped(due))
+        with tracer.span("fetch", due=len(due)) as span:
+            tasks = [asyncio.ensure_future(self.registry.get(metric)) for metric in due]
+            self._progress = (due, tasks)
+            if partial is not None:
+                core = [task for metric, task in zip(due, tasks) if metric in CORE_METRICS]
+                if core:
+                    await asyncio.wait(core)
+                if not partial.done():
+                    partial.set_result(self.progress_snapshot())
+            results = await asyncio.gather(*tasks)
+            span["failed"] = sum(value is None for value, _ in results)
+        print(f"Fetch cycle: {IOStats.describe(self.fetcher.io.begin_cycle())}")
+
+        now = time.time()
+        fetched = {}
+        failed = []
+        for metric, (value, source) in zip(due, results):
+            if value is not None:
+                fetched[metric] = (value, source)
+            else:
+                failed.append(metric)
+
+        # Fields that weren't due: take them if a planned call returned them anyway, else keep the cached value
+        for metric in RAW_METRICS:
+            if metric not in due:
+                value, source = self.registry.peek(metric)
+                if value is not None:
+                    fetched[metric] = (value, source)
+
+        self.cmc_planner.mark_refreshed(fetched)
+        for metric, (value, source) in fetched.items():
+            status = FALLBACK if self.registry.is_fallback(source) else OK
+            self.metric_cache[metric] = Field(value, source, now, status)
+        for metric in failed:
+            self.metric_cache[metric] = Field(None, None, now, ERROR)
+
+        snapshot = Snapshot(now, dict(self.metric_cache))
+        derive(snapshot)
+
+        local, scraped = snapshot.value("ALT_SEASON_INDEX"), snapshot.value("ALT_SEASON_SCRAPED")
+        if local is not None and scraped is not None:
+            if abs(local - scraped) > getattr(config, "ALT_SEASON_CROSS_CHECK_TOLERANCE", 15):
+                print(f"Altseason cross-check: local index {local} vs blockchaincenter {scraped}")
+        self.snapshot = snapshot
+        for listener in self.listeners:
+            listener(snapshot)
+        return snapshot
+
+    async def quote(self, coin_id: int):
+        """Return (ListingRecord, fetched_at) for /price, or (None, None)"""
+        return await self.prices.get(coin_id)
+
+    async def refresh_symbols(self, symbols) -> None:
+        """Rebuild the /price symbol index from the CMC map once the saved copy is a day old"""
+        if self.symbol_map.enabled() and symbols.stale():
+            await symbols.refresh(self.symbol_map, self.fetcher)
+
+    def export(self) -> dict:
+        """The latest snapshot plus the records and quotes behind detail views, as plain JSON data"""
+        return {
+            "snapshot": dump_snapshot(self.snapshot),
+            "records": dump_records(self.listings.records),
+            "records_at": self.listings.records_at,
+            "quotes": dump_quotes(self.quotes),
+        }
+
+    def restore_state(self) -> None:
+        """Load the last saved snapshot, listings, derivatives quotes and latency windows"""
+        data = self.state.load()
+        if not data:
+            return
+        try:
+            if data.get("snapshot"):
+                self.snapshot = load_snapshot(data["snapshot"])
+                self.metric_cache = {metric: entry for metric, entry in self.snapshot.fields.items() if metric in RAW_METRICS}
+            self.listings.records = load_records(data.get("records", []))
+            self.listings.records_at = data.get("records_at", 0.0)
+            self.registry.providers["derivatives"].last_quotes = load_quotes(data.get("quotes", {}))
+            for name, samples in data.get("latency", {}).items():
+                tracker = self.registry.latency.get(name)
+                if tracker is not None:
+                    for seconds in samples:
+                        tracker.record(seconds)
+        except Exception as e:
+            print(f"Error restoring saved state: {e}")
+            return
+        if self.snapshot is not None:
+            print(f"Warm start: restored snapshot from {fmt.duration(time.time() - self.snapshot.taken_at)} ago")
+
+    def save_state(self) -> None:
+        self.cmc_budget.flush()
+        if self.snapshot is None:
+            return
+        data = self.export()
+        data["latency"] = {name: list(tracker.samples) for name, tracker in self.registry.latency.items()}
+        self.state.save(data)
+
+    async def close(self) -> None:
+        self.cmc_budget.flush()
+        await self.fetcher.close()
@@ -0,0 +1,193 @@
+import asyncio
+import time
+from collections import deque
+
+import config
+from utils.fetch import current_provider
+from utils.tracing import percentile, tracer
+
+
+class Provider:
+    """Base class for a market data source.
+
+    Subclasses set a unique ``name``, list the ``metrics`` they can supply and
+    implement ``fetch``, which returns a dict of metric -> raw value. One call
+    may supply several metrics; the registry runs each provider at most once
+    per cycle and shares the result between metrics.
+    """
+
+    name = None
+    metrics = ()
+
+    def enabled(self) -> bool:
+        """Return False to skip this provider (e.g. missing API key)"""
+        return True
+
+    async def fetch(self, fetcher) -> dict:
+        raise NotImplementedError
+
+
+class LatencyTracker:
+    """Rolling window of successful call durations for one provider"""
+
+    def __init__(self, size: int = 100):
+        self.samples = deque(maxlen=size)
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> float:
+        return percentile(sorted(self.samples), pct)
+
+    def __len__(self):
+        return len(self.samples)
+
+
+class ProviderRegistry:
+    """Maps every metric to the ordered chain of providers that can supply it.
+
+    ``get`` walks the chain, skipping providers whose circuit is open. When the
+    primary has enough latency history and is still running past its p95, a
+    hedged request is started against the next provider and whichever answers
+    first with the metric wins.
+    """
+
+    def __init__(self, fetcher, health):
+        self.fetcher = fetcher
+        self.health = health
+        self.providers = {}
+        self.fallbacks = set()
+        self.chains = {}
+        self.latency = {}
+        self.hedge_enabled = getattr(config, "HEDGE_REQUESTS", True)
+        self.hedge_percentile = getattr(config, "HEDGE_PERCENTILE", 95)
+        self.hedge_min_samples = getattr(config, "HEDGE_MIN_SAMPLES", 20)
+        self._tasks = {}
+        self._skip = set()
+
+    def register(self, provider: Provider, metrics=None, fallback: bool = False) -> None:
+        """Register a provider; chain order follows registration order.
+        Values served by a provider registered with fallback=True are flagged as such.
+        """
+        self.providers[provider.name] = provider
+        if fallback:
+            self.fallbacks.add(provider.name)
+        self.latency.setdefault(provider.name, LatencyTracker())
+        for metric in metrics or provider.metrics:
+            self.chains.setdefault(metric, []).append(provider.name)
+
+    def chain(self, metric: str) -> list:
+        return [name for name in self.chains.get(metric, []) if self.providers[name].enabled()]
+
+    def is_fallback(self, source: str) -> bool:
+        return source in self.fallbacks
+
+    def begin_cycle(self, skip=()) -> None:
+        """Forget results from the previous cycle; providers in ``skip`` are not called this cycle"""
+        self._tasks = {}
+        self._skip = set(skip)
+
+    def peek(self, metric: str):
+        """Return (value, provider_name) if a provider that already finished this cycle supplied the metric"""
+        for name in self.chains.get(metric, []):
+            task = self._tasks.get(name)
+            if task is not None and task.done() and not task.cancelled():
+                result = task.result()
+                if result and result.get(metric) is not None:
+                    return result[metric], name
+        return None, None
+
+    def _task(self, name: str):
+        """Return this cycle's task for a provider, starting it if needed (None if skipped or the circuit is open)"""
+        if name in self._tasks:
+            return self._tasks[name]
+
+        if name in self._skip or not self.health.allow(name):
+            self._tasks[name] = None
+            return None
+
+        task = asyncio.ensure_future(self._run(self.providers[name]))
+        self._tasks[name] = task
+        return task
+
+    async def _run(self, provider: Provider):
+        breaker = self.health.get(provider.name)
+        current_provider.set(provider.name)
+        started = time.monotonic()
+        with tracer.span(f"provider:{provider.name}") as span:
+            try:
+                result = await provider.fetch(self.fetcher)
+            except Exception as e:
+                print(f"Error fetching from {provider.name}: {e}")
+                breaker.record_failure(e)
+                span["outcome"] = "error"
+                span["error"] = str(e) or type(e).__name__
+                return None
+            if not result:
+                span["outcome"] = "empty"
+            else:
+                span["metrics"] = len(result)
+
+        if not result:
+            breaker.record_failure()
+            return None
+
+        breaker.record_success()
+        self.latency[provider.name].record(time.monotonic() - started)
+        return result
+
+    def _hedge_delay(self, name: str):
+        if not self.hedge_enabled:
+            return None
+        tracker = self.latency[name]
+        if len(tracker) < self.hedge_min_samples:
+            return None
+        return tracker.percentile(self.hedge_percentile)
+
+    async def get(self, metric: str):
+        """Return (value, provider_name) for a metric, or (None, None) if no provider could supply it"""
+        chain = self.chain(metric)
+        index = 0
+        while index < len(chain):
+            name = chain[index]
+            task = self._task(name)
+            index += 1
+            if task is None:
+                continue
+
+            racers = {task: name}
+            delay = self._hedge_delay(name)
+            if delay is not None and index < len(chain) and not task.done():
+                done, _ = await asyncio.wait({task}, timeout=delay)
+                # Hedge against the next provider that is actually callable
+                while not done and index < len(chain):
+                    backup = chain[index]
+                    hedge = self._task(backup)
+                    index += 1
+                    if hedge is not None:
+                        racers[hedge] = backup
+                        break
+
+            # Shared tasks serve other metrics too, so never cancel them here
+            pending = set(racers)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for finished in done:
+                    result = finished.result()
+                    if result and result.get(metric) is not None:
+                        return result[metric], racers[finished]
+
+        return None, None
+
+    def latency_summary(self) -> dict:
+        """{provider: {"p50", "p95", "samples", "hedge_after"}} in seconds; hedge_after is None until hedging is armed"""
+        summary = {}
+        for name, tracker in self.latency.items():
+            hedge_after = self._hedge_delay(name)
+            summary[name] = {
+                "p50": round(tracker.percentile(50), 3),
+                "p95": round(tracker.percentile(95), 3),
+                "samples": len(tracker),
+                "hedge_after": round(hedge_after, 3) if hedge_after is not None else None,
+            }
+        return summary
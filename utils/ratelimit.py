@@ -0,0 +1,214 @@
+import asyncio
+import contextvars
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+
+import config
+from utils.tracing import percentile
+
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+# Priority of outbound requests made from the current task. Slash commands
+# set INTERACTIVE; the update loop runs with the BACKGROUND default.
+request_priority = contextvars.ContextVar("request_priority", default=BACKGROUND)
+
+
+class RateLimitedError(Exception):
+    """Raised instead of queueing when a host is blocked for longer than we are willing to wait"""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"{host} rate limited for another {retry_in:.0f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+def parse_retry_after(value: str):
+    """Return seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostLimiter:
+    """Token bucket plus concurrency cap for one host.
+
+    Waiters are queued per priority class and served in a weighted
+    round-robin, so interactive commands jump ahead of the background loop
+    without starving it.
+    """
+
+    def __init__(self, host: str, rate: float, burst: int, concurrency: int, interactive_share: int = 3):
+        self.host = host
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.interactive_share = interactive_share
+
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.active = 0
+        self.blocked_until = 0.0
+        self.queues = {INTERACTIVE: deque(), BACKGROUND: deque()}
+        self.interactive_streak = 0
+        self.wait_times = deque(maxlen=500)
+        self._timer = None
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _next_waiter(self):
+        interactive = self.queues[INTERACTIVE]
+        background = self.queues[BACKGROUND]
+        # Drop waiters that gave up (cancelled) before their turn
+        while interactive and interactive[0].done():
+            interactive.popleft()
+        while background and background[0].done():
+            background.popleft()
+
+        if interactive and (not background or self.interactive_streak < self.interactive_share):
+            self.interactive_streak += 1
+            return interactive.popleft()
+        if background:
+            self.interactive_streak = 0
+            return background.popleft()
+        return None
+
+    def _schedule(self, delay: float) -> None:
+        if self._timer is None:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(delay, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self.queues[INTERACTIVE] or self.queues[BACKGROUND]:
+            if self.active >= self.concurrency:
+                return
+
+            now = time.monotonic()
+            if now < self.blocked_until:
+                self._schedule(self.blocked_until - now)
+                return
+
+            self._refill(now)
+            if self.tokens < 1:
+                self._schedule((1 - self.tokens) / self.rate)
+                return
+
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            self.tokens -= 1
+            self.active += 1
+            waiter.set_result(None)
+
+    async def acquire(self, priority: str) -> None:
+        max_wait = getattr(config, "RATE_LIMIT_MAX_WAIT", 30)
+        blocked_for = self.blocked_until - time.monotonic()
+        if blocked_for > max_wait:
+            raise RateLimitedError(self.host, blocked_for)
+
+        waiter = asyncio.get_running_loop().create_future()
+        queued = time.monotonic()
+        self.queues[priority].append(waiter)
+        self._dispatch()
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted a slot just as we were cancelled; hand it back
+                self.release()
+            raise
+        self.wait_times.append(time.monotonic() - queued)
+
+    def release(self) -> None:
+        self.active -= 1
+        self._dispatch()
+
+    def block_for(self, seconds: float) -> None:
+        """Hold all requests to this host for ``seconds`` (Retry-After / exhausted rate-limit window)"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        print(f"Rate limited by {self.host}, pausing requests for {seconds:.0f}s")
+
+    def stats(self) -> dict:
+        waits = sorted(self.wait_times)
+        return {
+            "active": self.active,
+            "queued": len(self.queues[INTERACTIVE]) + len(self.queues[BACKGROUND]),
+            "wait_p50": round(percentile(waits, 50), 3),
+            "wait_p95": round(percentile(waits, 95), 3),
+            "wait_max": round(waits[-1], 3) if waits else 0.0,
+            "blocked_for": round(max(0.0, self.blocked_until - time.monotonic()), 1),
+        }
+
+
+class RateLimiter:
+    """Per-host HostLimiters, configured from config.RATE_LIMITS"""
+
+    def __init__(self, limits: dict = None):
+        self.limits = limits if limits is not None else getattr(config, "RATE_LIMITS", {})
+        self.hosts = {}
+
+    def get(self, host: str) -> HostLimiter:
+        limiter = self.hosts.get(host)
+        if limiter is None:
+            settings = self.limits.get(host) or self.limits.get("default", {})
+            limiter = HostLimiter(
+                host,
+                rate=settings.get("rate", 1.0),
+                burst=settings.get("burst", 5),
+                concurrency=settings.get("concurrency", 4),
+            )
+            self.hosts[host] = limiter
+        return limiter
+
+    @asynccontextmanager
+    async def slot(self, host: str):
+        limiter = self.get(host)
+        await limiter.acquire(request_priority.get())
+        try:
+            yield limiter
+        finally:
+            limiter.release()
+
+    def observe(self, host: str, status: int, headers) -> None:
+        """Honor Retry-After and rate-limit headers from a response"""
+        limiter = self.get(host)
+
+        if status in (429, 503):
+            delay = parse_retry_after(headers.get("Retry-After"))
+            limiter.block_for(delay if delay is not None else getattr(config, "RATE_LIMIT_DEFAULT_BACKOFF", 60))
+            return
+
+        remaining = headers.get("X-RateLimit-Remaining") or headers.get("RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset") or headers.get("RateLimit-Reset")
+        if remaining is None or reset is None:
+            return
+        try:
+            if int(float(remaining)) > 0:
+                return
+            reset = float(reset)
+        except ValueError:
+            return
+        # Some APIs send an epoch timestamp, others seconds until reset
+        delay = reset - time.time() if reset > 1_000_000_000 else reset
+        if delay > 0:
+            limiter.block_for(delay)
+
+    def stats(self) -> dict:
+        return {host: limiter.stats() for host, limiter in self.hosts.items()}
@@ -0,0 +1,268 @@
+import asyncio
+import heapq
+import time
+from collections import deque
+
+import config
+from utils.tracing import percentile, tracer
+
+
+def next_boundary(interval: float, now: float = None) -> float:
+    """Next multiple of ``interval`` seconds since the epoch (UTC), so ticks never drift"""
+    now = time.time() if now is None else now
+    return (now // interval + 1) * interval
+
+
+class DueQueue:
+    """Min-heap of (due_at, key) with lazy deletion.
+
+    Rescheduling a key just pushes a new entry and remembers the current due
+    time; stale heap entries are skipped when they reach the top, and the
+    heap is rebuilt if they pile up. Every operation is O(log n), so the cost
+    per tick depends on how many keys are due, not on how many exist.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.due = {}
+
+    def schedule(self, key, due_at: float) -> None:
+        self.due[key] = due_at
+        heapq.heappush(self.heap, (due_at, key))
+        if len(self.heap) > 2 * len(self.due) + 64:
+            self.heap = [(due_at, key) for key, due_at in self.due.items()]
+            heapq.heapify(self.heap)
+
+    def discard(self, key) -> None:
+        self.due.pop(key, None)
+
+    def _prune(self) -> None:
+        heap = self.heap
+        while heap and self.due.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+
+    def next_due(self) -> float:
+        self._prune()
+        return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, now: float) -> list:
+        keys = []
+        self._prune()
+        while self.heap and self.heap[0][0] <= now:
+            due_at, key = heapq.heappop(self.heap)
+            if self.due.get(key) == due_at:
+                del self.due[key]
+                keys.append(key)
+            self._prune()
+        return keys
+
+    def __contains__(self, key) -> bool:
+        return key in self.due
+
+    def __len__(self):
+        return len(self.due)
+
+
+class CycleCoordinator:
+    """Dispatches update cycles for keys (dashboards) that each have their own interval.
+
+    Every key is due on the next wall-clock boundary of its interval, so keys
+    sharing an interval fall due together and are handled by one cycle.
+    ``interval_for(key)`` gives a key's interval, or None once it is no longer
+    registered. Changing an interval just reschedules that key; nothing is
+    restarted.
+
+    Only one cycle runs at a time: a forced run while a cycle is in progress
+    joins it, and keys that come due while another cycle is running are held
+    and updated by a follow-up cycle as soon as it finishes. Only a key that
+    comes due again while its own previous update is still running counts as
+    an overrun and is pushed to its next boundary. ``lock``
+    serializes registry changes that span awaits (re-posting or migrating a
+    dashboard) across cycles and commands.
+    """
+
+    def __init__(self, cycle, interval_for, before=None, jitter: float = None, concurrency: int = None):
+        self.cycle = cycle
+        self.interval_for = interval_for
+        self.before = before
+        self.jitter = jitter if jitter is not None else getattr(config, "UPDATE_JITTER_SECONDS", 30)
+        self.concurrency = concurrency or getattr(config, "UPDATE_CONCURRENCY", 5)
+        self.lock = asyncio.Lock()
+        self.queue = DueQueue()
+
+        self.cycles = 0
+        self.overruns = 0
+        self.last_started = None
+        self.durations = deque(maxlen=50)
+
+        self._current = None
+        self._current_keys = set()
+        self._held = set()
+        self._stopped = False
+        self._loop_task = None
+        self._wake = asyncio.Event()
+
+    def start(self) -> None:
+        self._stopped = False
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.ensure_future(self._loop())
+
+    def stop(self) -> None:
+        self._stopped = True
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+        if self._current is not None and not self._current.done():
+            self._current.cancel()
+
+    def schedule(self, key, now: float = None) -> None:
+        """(Re)schedule a key on the next boundary of its current interval"""
+        interval = self.interval_for(key)
+        if interval is None:
+            self.queue.discard(key)
+            return
+        due_at = next_boundary(interval, now)
+        earliest = self.queue.next_due()
+        self.queue.schedule(key, due_at)
+        if earliest is None or due_at < earliest:
+            self._wake.set()
+
+    def unschedule(self, key) -> None:
+        self.queue.discard(key)
+
+    async def wait_idle(self, timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds for a cycle in progress to finish; True if none is running"""
+        if self.running:
+            await asyncio.wait([self._current], timeout=timeout)
+        return not self.running
+
+    def handoff(self) -> dict:
+        """Due times and counters for a replacement coordinator (see ``adopt``).
+        Keys of a cycle still running are handed over as due now, so a cancelled cycle is redone.
+        """
+        due = dict(self.queue.due)
+        due.update(dict.fromkeys(self._held, time.time()))
+        if self.running:
+            due.update(dict.fromkeys(self._current_keys, time.time()))
+        return {"due": due, "cycles": self.cycles, "overruns": self.overruns, "durations": list(self.durations)}
+
+    def adopt(self, state: dict) -> None:
+        """Take over the schedule of the coordinator this one replaces, for keys scheduled here too"""
+        for key, due_at in state["due"].items():
+            if key in self.queue:
+                self.queue.schedule(key, due_at)
+        self.cycles += state["cycles"]
+        self.overruns += state["overruns"]
+        self.durations.extend(state["durations"])
+        self._wake.set()
+
+    async def _loop(self) -> None:
+        if self.before is not None:
+            await self.before()
+        while True:
+            self._wake.clear()
+            due_at = self.queue.next_due()
+            timeout = None if due_at is None else max(0.0, due_at - time.time())
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+                continue  # something was scheduled earlier: recompute
+            except asyncio.TimeoutError:
+                pass
+
+            now = time.time()
+            keys = self.queue.pop_due(now)
+            if not keys:
+                continue
+            if self.running:
+                overrun = [key for key in keys if key in self._current_keys]
+                if overrun:
+                    self.overruns += 1
+                    print(f"Update cycle still running after {time.monotonic() - self.last_started:.0f}s; skipping {len(overrun)} due update(s)")
+                    for key in overrun:
+                        self.schedule(key, now)
+                # Everything else runs in a follow-up cycle right after this one
+                self._held.update(key for key in keys if key not in self._current_keys)
+                continue
+            self.trigger(keys)
+
+    @property
+    def running(self) -> bool:
+        return self._current is not None and not self._current.done()
+
+    def trigger(self, keys) -> asyncio.Task:
+        """Start a cycle for ``keys`` now, or return the one already in progress"""
+        if not self.running:
+            self._current_keys = set(keys)
+            self._current = asyncio.ensure_future(self._run(self._current_keys))
+            self._current.add_done_callback(self._run_held)
+        return self._current
+
+    def _run_held(self, _) -> None:
+        """Start the follow-up cycle for keys that came due during the one that just finished"""
+        if self._held and not self._stopped and not self.running:
+            keys, self._held = self._held, set()
+            self.trigger(keys)
+
+    async def run_now(self, keys) -> bool:
+        """Update ``keys`` now, joining cycles in progress (including the follow-up for held keys)
+        until a finished cycle has covered every one of them. Cancelling the caller doesn't cancel the cycles.
+        Returns False if any cycle covering these keys failed.
+        """
+        keys = set(keys)
+        ok = True
+        while keys:
+            if not self.running:
+                self.trigger(keys)
+            covered, current = self._current_keys, self._current
+            succeeded = await asyncio.shield(current)
+            if keys & covered:
+                ok = ok and succeeded
+            keys -= covered
+        return ok
+
+    async def _run(self, keys) -> bool:
+        """Run one cycle; True if it completed without raising"""
+        self.last_started = time.monotonic()
+        try:
+            with tracer.trace("cycle", keys=len(keys)):
+                await self.cycle(keys)
+            return True
+        except Exception as e:
+            print(f"Error in update cycle: {e}")
+            return False
+        finally:
+            self.cycles += 1
+            self.durations.append(time.monotonic() - self.last_started)
+            now = time.time()
+            for key in keys:
+                self.schedule(key, now)
+
+    async def spread(self, items, func, window: float = None) -> None:
+        """Call ``func(item)`` for every item with start times spread evenly over the jitter window
+        (or ``window`` if shorter), so a large batch of edits doesn't hit Discord in one burst
+        """
+        items = list(items)
+        if not items:
+            return
+        window = self.jitter if window is None else min(self.jitter, window)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        started = time.monotonic()
+
+        async def run(index, item):
+            await asyncio.sleep(max(0.0, started + window * index / len(items) - time.monotonic()))
+            async with semaphore:
+                await func(item)
+
+        await asyncio.gather(*(run(index, item) for index, item in enumerate(items)))
+
+    def stats(self) -> dict:
+        ordered = sorted(self.durations)
+        return {
+            "scheduled": len(self.queue),
+            "cycles": self.cycles,
+            "overruns": self.overruns,
+            "running": self.running,
+            "held": len(self._held),
+            "last_duration": round(self.durations[-1], 2) if self.durations else None,
+            "p95_duration": round(percentile(ordered, 95), 2) if ordered else None,
+            "next_due": self.queue.next_due(),
+        }
@@ -0,0 +1,86 @@
+import time
+
+
+# Field status values
+OK = "ok"              # fetched from the metric's primary provider(s)
+FALLBACK = "fallback"  # fetched from a fallback provider
+ERROR = "error"        # requested but no provider could supply it
+
+
+class Field:
+    """One metric in a snapshot: raw value plus where and when it came from"""
+
+    __slots__ = ("value", "source", "fetched_at", "status")
+
+    def __init__(self, value, source: str, fetched_at: float, status: str = OK):
+        self.value = value
+        self.source = source
+        self.fetched_at = fetched_at
+        self.status = status
+
+    def __repr__(self):
+        return f"Field({self.value!r}, source={self.source}, status={self.status})"
+
+
+class Snapshot:
+    """Raw numeric market data for one update cycle.
+
+    Holds values exactly as providers returned them (floats, ints, lists of
+    (symbol, change) tuples); formatting happens only when rendering.
+    ``restored`` marks a snapshot loaded from the warm-start state file.
+    """
+
+    __slots__ = ("taken_at", "fields", "restored")
+
+    def __init__(self, taken_at: float = None, fields: dict = None, restored: bool = False):
+        self.taken_at = taken_at if taken_at is not None else time.time()
+        self.fields = fields if fields is not None else {}
+        self.restored = restored
+
+    def set(self, metric: str, field: Field) -> None:
+        self.fields[metric] = field
+
+    def get(self, metric: str) -> Field:
+        return self.fields.get(metric)
+
+    def value(self, metric: str, default=None):
+        field = self.fields.get(metric)
+        if field is None or field.status == ERROR:
+            return default
+        return field.value
+
+    def status(self, metric: str) -> str:
+        field = self.fields.get(metric)
+        return field.status if field is not None else None
+
+    def is_fallback(self, metric: str) -> bool:
+        return self.status(metric) == FALLBACK
+
+    def __contains__(self, metric: str) -> bool:
+        return self.value(metric) is not None
+
+    def __repr__(self):
+        return f"Snapshot({len(self.fields)} fields @ {self.taken_at:.0f})"
+
+
+def derive(snapshot: Snapshot) -> None:
+    """Add fields computed from other fields (ETH/BTC ratio, USDT dominance)"""
+
+    def combine(metric, inputs, compute):
+        fields = [snapshot.get(name) for name in inputs]
+        if any(field is None for field in fields):
+            return  # an input is still pending (partial snapshot)
+        if any(field.status == ERROR for field in fields):
+            snapshot.set(metric, Field(None, "derived", snapshot.taken_at, ERROR))
+            return
+        status = FALLBACK if any(field.status == FALLBACK for field in fields) else OK
+        fetched_at = min(field.fetched_at for field in fields)
+        try:
+            value = compute(*(field.value for field in fields))
+        except ZeroDivisionError:
+            snapshot.set(metric, Field(None, "derived", fetched_at, ERROR))
+            return
+        snapshot.set(metric, Field(value, "derived", fetched_at, status))
+
+    combine("ETH_BTC_RATIO", ("ETH_USD", "BTC_USD"), lambda eth, btc: eth / btc)
+    combine("USDT_DOMINANCE", ("USDT_MCAP", "TOTAL_MCAP"), lambda usdt, total: usdt / total * 100)
@@ -0,0 +1,322 @@
+import re
+import time
+
+import config
+
+from utils.cmc import CMCProvider, listings_credits
+from utils.decode import ListingStreamDecoder
+from utils.derivatives import DerivativesProvider
+from utils.fx import FrankfurterProvider
+from utils.providers import Provider, ProviderRegistry
+
+
+COINDESK_BASE_URL = "https://data-api.coindesk.com"
+
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+STABLECOINS = {'USDT', 'USDC', 'DAI', 'BUSD', 'TUSD', 'USDD', 'USDP', 'GUSD', 'FRAX', 'FDUSD'}
+
+# Wrapped and liquid-staked versions of BTC/ETH track their underlying, so they
+# say nothing about alts outperforming BTC
+WRAPPED_ASSETS = {'WBTC', 'CBBTC', 'WETH', 'STETH', 'WSTETH', 'WEETH', 'WBETH', 'RETH'}
+
+# Gainer metric -> CMC percentage change field
+GAINER_FIELDS = {
+    "GAINERS_24H": "percent_change_24h",
+    "GAINERS_7D": "percent_change_7d",
+    "GAINERS_30D": "percent_change_30d",
+}
+
+
+def majors_from_quotes(quotes: dict) -> dict:
+    """Pick dashboard prices and market caps out of {symbol: USD quote}"""
+    result = {}
+    for symbol in ("BTC", "ETH", "SOL", "USDT"):
+        quote = quotes.get(symbol)
+        if not quote:
+            continue
+        if symbol != "USDT" and quote.get("price") is not None:
+            result[f"{symbol}_USD"] = quote["price"]
+        if symbol != "SOL" and quote.get("market_cap") is not None:
+            result[f"{symbol}_MCAP"] = quote["market_cap"]
+    return result
+
+
+def top_gainers(records: list, field: str, count: int = 5) -> list:
+    """Return [(symbol, percent_change)] for the best positive performers, stablecoins excluded"""
+    performers = []
+    for record in records:
+        if record.symbol in STABLECOINS:
+            continue
+        change = getattr(record, field)
+        if change is not None and change > 0:
+            performers.append((record.symbol or "???", change))
+    performers.sort(key=lambda item: item[1], reverse=True)
+    return performers[:count]
+
+
+def alt_season_index(records: list, field: str, universe: int) -> int:
+    """Percentage of the top ``universe`` alts (by rank) whose ``field`` change beat BTC's; None if BTC is missing"""
+    btc_change = None
+    changes = []
+    for record in records:
+        change = getattr(record, field)
+        if record.symbol == "BTC":
+            if btc_change is None:
+                btc_change = change
+            continue
+        if record.symbol in STABLECOINS or record.symbol in WRAPPED_ASSETS or change is None:
+            continue
+        if len(changes) < universe:
+            changes.append(change)
+
+    if btc_change is None or not changes:
+        return None
+    outperformed = sum(1 for change in changes if change > btc_change)
+    return round(outperformed / len(changes) * 100)
+
+
+class CMCQuotesProvider(CMCProvider):
+    """Prices and market caps for the dashboard majors from quotes/latest"""
+
+    name = "cmc"
+    metrics = ("BTC_USD", "ETH_USD", "SOL_USD", "BTC_MCAP", "ETH_MCAP", "USDT_MCAP")
+
+    async def fetch(self, fetcher) -> dict:
+        data = await self._get(fetcher, "/v1/cryptocurrency/quotes/latest", {"symbol": "BTC,ETH,SOL,USDT", "convert": "USD"})
+        quotes = data.get("data", {})
+        return majors_from_quotes({symbol: quotes[symbol]["quote"]["USD"] for symbol in quotes})
+
+
+class CMCGlobalProvider(CMCProvider):
+    """Total market cap and BTC dominance straight from global-metrics/quotes/latest"""
+
+    name = "cmc-global"
+    metrics = ("TOTAL_MCAP", "BTC_DOMINANCE")
+
+    async def fetch(self, fetcher) -> dict:
+        data = await self._get(fetcher, "/v1/global-metrics/quotes/latest")
+        metrics = data.get("data", {})
+        total = float(metrics.get("quote", {}).get("USD", {}).get("total_market_cap") or 0)
+
+        result = {}
+        if total > 0:
+            result["TOTAL_MCAP"] = total
+        if metrics.get("btc_dominance") is not None:
+            result["BTC_DOMINANCE"] = float(metrics["btc_dominance"])
+        return result
+
+
+class CMCListingsProvider(CMCProvider):
+    """Top gainers and the Altcoin Season Index among the top coins by market cap, plus the majors' quotes from the same payload.
+
+    The response is stream-decoded into compact ListingRecords holding only
+    the fields in ``self.fields``; other consumers of the listings call add
+    theirs with ``require_fields``.
+    """
+
+    name = "cmc-listings"
+    metrics = ("BTC_USD", "ETH_USD", "SOL_USD", "BTC_MCAP", "ETH_MCAP", "USDT_MCAP", "ALT_SEASON_INDEX") + tuple(GAINER_FIELDS)
+
+    FIELDS = ("symbol", "price", "market_cap") + tuple(GAINER_FIELDS.values())
+
+    def __init__(self, api_key: str, budget=None, limit: int = 100):
+        super().__init__(api_key, budget)
+        self.alt_season_field = f"percent_change_{getattr(config, 'ALT_SEASON_WINDOW', '90d')}"
+        self.alt_season_universe = getattr(config, "ALT_SEASON_UNIVERSE", 50)
+        # Enough rows that the universe is still full after skipping BTC, stablecoins and wrapped assets
+        self.limit = max(limit, self.alt_season_universe + 1 + len(STABLECOINS) + len(WRAPPED_ASSETS))
+        self.fields = set(self.FIELDS)
+        self.fields.add(self.alt_season_field)
+        # Most recent records, reused by price lookups while fresh
+        self.records = []
+        self.records_at = 0.0
+
+    def require_fields(self, *fields) -> None:
+        self.fields.update(fields)
+
+    def estimated_credits(self) -> int:
+        return listings_credits(self.limit)
+
+    async def fetch(self, fetcher) -> dict:
+        fields = frozenset(self.fields)
+        payload = await self._get(
+            fetcher,
+            "/v1/cryptocurrency/listings/latest",
+            {"start": "1", "limit": str(self.limit), "sort": "market_cap", "sort_dir": "desc"},
+            decoder=lambda: ListingStreamDecoder(fields)
+        )
+        records = payload.records
+        if not records:
+            return {}
+        self.records = records
+        self.records_at = time.time()
+
+        quotes = {}
+        for record in records:
+            # Several coins can share a symbol; keep the highest ranked
+            quotes.setdefault(record.symbol, {"price": record.price, "market_cap": record.market_cap})
+        result = majors_from_quotes(quotes)
+        for metric, field in GAINER_FIELDS.items():
+            result[metric] = top_gainers(records, field)
+        index = alt_season_index(records, self.alt_season_field, self.alt_season_universe)
+        if index is not None:
+            result["ALT_SEASON_INDEX"] = index
+        return result
+
+
+class CoinGeckoProvider(Provider):
+    """Keyless price fallback from CoinGecko simple/price"""
+
+    name = "coingecko"
+    metrics = ("BTC_USD", "ETH_USD", "SOL_USD")
+
+    COIN_IDS = {"bitcoin": "BTC_USD", "ethereum": "ETH_USD", "solana": "SOL_USD"}
+
+    async def fetch(self, fetcher) -> dict:
+        data = await fetcher.get_json(
+            "https://api.coingecko.com/api/v3/simple/price",
+            params={"ids": ",".join(self.COIN_IDS), "vs_currencies": "usd"}
+        )
+        result = {}
+        for coin_id, metric in self.COIN_IDS.items():
+            if "usd" in data.get(coin_id, {}):
+                result[metric] = float(data[coin_id]["usd"])
+        return result
+
+
+class CoinalyzeProvider(Provider):
+    """Open interest (USD) and average funding rate (%) scraped from the coinalyze.net homepage table"""
+
+    name = "coinalyze"
+    metrics = ("BTC_OI", "ETH_OI", "BTC_FUNDING", "ETH_FUNDING")
+
+    async def fetch(self, fetcher) -> dict:
+        return await fetcher.get_text('https://coinalyze.net/', headers=BROWSER_HEADERS, parse=self.parse)
+
+    @staticmethod
+    def parse(html: str) -> dict:
+        from bs4 import BeautifulSoup  # deferred: only the scrapers need it, and it's slow to import
+
+        soup = BeautifulSoup(html, 'html.parser')
+
+        result = {}
+        for coin in ("BTC", "ETH"):
+            row = soup.find('tr', {'data-coin': coin})
+            if not row:
+                continue
+            cells = row.find_all('td')
+            if len(cells) < 11:
+                continue
+
+            # Column 6: OPEN INTEREST, column 10: FR AVG
+            oi_match = re.search(r'(\d+\.?\d*)\s*[Bb]', cells[6].get_text().strip())
+            if oi_match:
+                result[f"{coin}_OI"] = float(oi_match.group(1)) * 1_000_000_000
+
+            funding_match = re.search(r'([+-]?\d+\.?\d*)\s*%', cells[10].get_text().strip())
+            if funding_match:
+                result[f"{coin}_FUNDING"] = float(funding_match.group(1))
+        return result
+
+
+class CoinDeskFuturesProvider(Provider):
+    """BitMEX perpetual open interest and funding from the CoinDesk futures API"""
+
+    name = "coindesk"
+    metrics = ("BTC_OI", "ETH_OI", "BTC_FUNDING", "ETH_FUNDING")
+
+    INSTRUMENTS = {"BTC": "BTC-USD-INVERSE-PERPETUAL", "ETH": "ETH-USD-INVERSE-PERPETUAL"}
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+
+    def enabled(self) -> bool:
+        return bool(self.api_key)
+
+    async def _tick(self, fetcher, kind: str) -> dict:
+        data = await fetcher.get_json(
+            f"{COINDESK_BASE_URL}/futures/v1/latest/{kind}/tick",
+            params={
+                "market": "bitmex",
+                "instruments": ",".join(self.INSTRUMENTS.values()),
+                "apply_mapping": "true",
+                "api_key": self.api_key
+            },
+            headers={"Content-Type": "application/json; charset=UTF-8"}
+        )
+        return data.get("Data") if isinstance(data.get("Data"), dict) else {}
+
+    async def fetch(self, fetcher) -> dict:
+        open_interest = await self._tick(fetcher, "open-interest")
+        funding = await self._tick(fetcher, "funding-rate")
+
+        result = {}
+        for coin, instrument in self.INSTRUMENTS.items():
+            if "VALUE_QUOTE" in open_interest.get(instrument, {}):
+                result[f"{coin}_OI"] = float(open_interest[instrument]["VALUE_QUOTE"])
+            if "VALUE" in funding.get(instrument, {}):
+                result[f"{coin}_FUNDING"] = float(funding[instrument]["VALUE"]) * 100
+        return result
+
+
+class FearGreedProvider(Provider):
+    """Fear & Greed index value and classification from alternative.me"""
+
+    name = "alternative.me"
+    metrics = ("FNG_VALUE", "FNG_CLASS")
+
+    async def fetch(self, fetcher) -> dict:
+        data = await fetcher.get_json("https://api.alternative.me/fng/")
+        if data and isinstance(data.get("data"), list) and data["data"]:
+            latest = data["data"][0]
+            value = latest.get("value")
+            classification = latest.get("value_classification")
+            if value is not None and classification is not None:
+                return {"FNG_VALUE": int(value), "FNG_CLASS": str(classification)}
+        return {}
+
+
+class AltSeasonScrapeProvider(Provider):
+    """Altcoin Season Index (0-100) scraped from blockchaincenter.net, as a cross-check of the local index"""
+
+    name = "blockchaincenter"
+    metrics = ("ALT_SEASON_SCRAPED",)
+
+    URL = "https://www.blockchaincenter.net/en/altcoin-season-index/"
+
+    async def fetch(self, fetcher) -> dict:
+        return await fetcher.get_text(self.URL, headers=BROWSER_HEADERS, parse=self.parse)
+
+    @staticmethod
+    def parse(html: str) -> dict:
+        from bs4 import BeautifulSoup
+
+        text = BeautifulSoup(html, 'html.parser').get_text(" ", strip=True)
+
+        # Look for pattern like "Altcoin Season (63)" or "Altcoin Season 63",
+        # then "Altcoin Month" as a proxy if the main index is not found
+        for label in ("Season", "Month"):
+            match = re.search(rf"Altcoin\s+{label}\s*[\(\[]?(\d{{1,3}})[\)\]]?", text, re.IGNORECASE)
+            if match:
+                return {"ALT_SEASON_SCRAPED": int(match.group(1))}
+        return {}
+
+
+def build_registry(fetcher, health, cmc_api_key: str = None, coindesk_api_key: str = None, budget=None) -> ProviderRegistry:
+    """Create the registry with every provider in fallback order"""
+    registry = ProviderRegistry(fetcher, health)
+    registry.register(CMCQuotesProvider(cmc_api_key, budget))
+    registry.register(CMCListingsProvider(cmc_api_key, budget))
+    registry.register(CMCGlobalProvider(cmc_api_key, budget))
+    registry.register(CoinGeckoProvider(), fallback=True)
+    registry.register(DerivativesProvider(health))
+    registry.register(CoinalyzeProvider(), fallback=True)
+    registry.register(CoinDeskFuturesProvider(coindesk_api_key), fallback=True)
+    registry.register(FearGreedProvider())
+    registry.register(FrankfurterProvider())
+    if getattr(config, "ALT_SEASON_CROSS_CHECK", False):
+        registry.register(AltSeasonScrapeProvider())
+    return registry
@@ -0,0 +1,91 @@
+import gzip
+import json
+import os
+import time
+
+from utils.decode import ListingRecord
+from utils.derivatives import ExchangeQuote
+from utils.snapshot import Field, Snapshot
+
+
+STATE_VERSION = 1
+
+
+class StateStore:
+    """Warm-start state kept in one gzipped JSON file.
+
+    Holds what would otherwise be lost on a restart: the latest snapshot,
+    the listings records behind detail views and /price, per-exchange
+    derivatives quotes and provider latency windows. Writes go to a temp
+    file first so a crash mid-save never leaves a truncated state behind.
+    """
+
+    def __init__(self, path: str = "./data/state.json.gz"):
+        self.path = path
+
+    def load(self) -> dict:
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"Ignoring unreadable state file {self.path}: {e}")
+            return {}
+        if data.get("version") != STATE_VERSION:
+            return {}
+        return data
+
+    def save(self, data: dict) -> None:
+        temp = f"{self.path}.tmp"
+        try:
+            with gzip.open(temp, "wt", encoding="utf-8", compresslevel=6) as file:
+                json.dump(dict(data, version=STATE_VERSION, saved_at=time.time()), file, separators=(",", ":"))
+            os.replace(temp, self.path)
+        except Exception as e:
+            print(f"Error saving state: {e}")
+
+
+def dump_snapshot(snapshot: Snapshot) -> dict:
+    return {
+        "taken_at": snapshot.taken_at,
+        "fields": {
+            metric: [field.value, field.source, field.fetched_at, field.status]
+            for metric, field in snapshot.fields.items()
+        },
+    }
+
+
+def load_snapshot(data: dict, restored: bool = True) -> Snapshot:
+    fields = {}
+    for metric, (value, source, fetched_at, status) in data.get("fields", {}).items():
+        # Lists of (symbol, change) pairs come back from JSON as lists of lists
+        if isinstance(value, list):
+            value = [tuple(item) if isinstance(item, list) else item for item in value]
+        fields[metric] = Field(value, source, fetched_at, status)
+    return Snapshot(data["taken_at"], fields, restored=restored)
+
+
+def dump_records(records: list) -> list:
+    return [
+        {field: getattr(record, field) for field in ListingRecord.__slots__ if getattr(record, field) is not None}
+        for record in records
+    ]
+
+
+def load_records(data: list) -> list:
+    return [ListingRecord(**{field: value for field, value in entry.items() if field in ListingRecord.__slots__}) for entry in data]
+
+
+def dump_quotes(quotes: dict) -> dict:
+    return {
+        exchange: {asset: [quote.open_interest, quote.funding] for asset, quote in by_asset.items()}
+        for exchange, by_asset in quotes.items()
+    }
+
+
+def load_quotes(data: dict) -> dict:
+    return {
+        exchange: {asset: ExchangeQuote(open_interest, funding) for asset, (open_interest, funding) in by_asset.items()}
+        for exchange, by_asset in data.items()
+    }
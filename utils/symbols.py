@@ -0,0 +1,215 @@
+import asyncio
+import bisect
+import json
+import time
+
+import config
+from utils.cmc import CMCProvider
+from utils.decode import ListingPayload, ListingRecord, StreamingArrayDecoder
+
+
+# Fields kept for a /price lookup
+QUOTE_FIELDS = frozenset(("id", "symbol", "name", "rank", "price", "market_cap", "percent_change_24h", "percent_change_7d"))
+
+UNRANKED = 1_000_000
+
+
+class MapStreamDecoder(StreamingArrayDecoder):
+    """Streams a CMC cryptocurrency/map body into (id, symbol, name, rank) tuples"""
+
+    def __init__(self):
+        super().__init__(self._project)
+
+    @staticmethod
+    def _project(coin: dict):
+        if coin.get("id") is None or not coin.get("symbol"):
+            return None
+        return (int(coin["id"]), str(coin["symbol"]), str(coin.get("name") or coin["symbol"]), coin.get("rank"))
+
+    def close(self) -> ListingPayload:
+        super().close()
+        return ListingPayload(self.extras.get("status") or {}, self.items)
+
+
+class CMCSymbolMap(CMCProvider):
+    """The id/symbol/name map of every active coin from cryptocurrency/map"""
+
+    name = "cmc-map"
+
+    async def fetch(self, fetcher) -> list:
+        payload = await self._get(
+            fetcher,
+            "/v1/cryptocurrency/map",
+            {"listing_status": "active", "sort": "cmc_rank"},
+            decoder=MapStreamDecoder
+        )
+        return payload.records
+
+
+class CMCQuoteLookup(CMCProvider):
+    """A single coin's quote by CMC id from quotes/latest"""
+
+    name = "cmc-lookup"
+
+    _project = staticmethod(ListingRecord.projector(QUOTE_FIELDS))
+
+    async def fetch(self, fetcher, coin_id: int) -> ListingRecord:
+        data = await self._get(fetcher, "/v2/cryptocurrency/quotes/latest", {"id": str(coin_id), "convert": "USD"})
+        coin = (data.get("data") or {}).get(str(coin_id))
+        if not coin:
+            return None
+        return self._project(coin)
+
+
+class SymbolIndex:
+    """In-memory prefix index over coin symbols and names.
+
+    Keys are lowercased symbols and names in one sorted list, so a prefix
+    search is a bisect to the first candidate plus a short forward scan.
+    The coin list is persisted to disk and refreshed once it is a day old.
+    """
+
+    def __init__(self, path: str = "./data/symbols.json", max_age: float = None):
+        self.path = path
+        self.max_age = max_age or getattr(config, "SYMBOL_INDEX_MAX_AGE", 86400)
+        self.coins = {}
+        self.keys = []
+        self.top = []
+        self.fetched_at = 0.0
+        self.load()
+
+    def build(self, coins) -> None:
+        """Index [(id, symbol, name, rank)]"""
+        self.coins = {}
+        keys = []
+        for coin_id, symbol, name, rank in coins:
+            rank = rank or UNRANKED
+            self.coins[coin_id] = (symbol, name, rank)
+            keys.append((symbol.lower(), rank, coin_id))
+            if name.lower() != symbol.lower():
+                keys.append((name.lower(), rank, coin_id))
+        keys.sort()
+        self.keys = keys
+        self.top = [coin_id for coin_id, _ in sorted(self.coins.items(), key=lambda item: item[1][2])[:25]]
+
+    def load(self) -> None:
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+            self.build(tuple(coin) for coin in data.get("coins", []))
+            self.fetched_at = data.get("fetched_at", 0.0)
+        except:
+            pass
+
+    def save(self) -> None:
+        try:
+            with open(self.path, "w") as file:
+                json.dump({
+                    "fetched_at": self.fetched_at,
+                    "coins": [[coin_id, symbol, name, rank] for coin_id, (symbol, name, rank) in self.coins.items()]
+                }, file)
+        except Exception as e:
+            print(f"Error saving symbol index: {e}")
+
+    def stale(self) -> bool:
+        return not self.coins or time.time() - self.fetched_at >= self.max_age
+
+    async def refresh(self, source: CMCSymbolMap, fetcher) -> None:
+        coins = await source.fetch(fetcher)
+        if not coins:
+            return
+        self.build(coins)
+        self.fetched_at = time.time()
+        self.save()
+        print(f"Symbol index refreshed: {len(self.coins)} coins")
+
+    def search(self, prefix: str, limit: int = 25) -> list:
+        """Coin ids whose symbol or name starts with ``prefix``; exact symbol matches first, then by rank"""
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return self.top[:limit]
+
+        matches = {}
+        index = bisect.bisect_left(self.keys, (prefix,))
+        # Cap the scan so one-letter prefixes (thousands of keys) stay cheap
+        scan_end = min(len(self.keys), index + limit * 40)
+        while index < scan_end:
+            key, rank, coin_id = self.keys[index]
+            if not key.startswith(prefix):
+                break
+            exact = key == prefix and self.coins[coin_id][0].lower() == prefix
+            best = matches.get(coin_id)
+            order = (not exact, rank)
+            if best is None or order < best:
+                matches[coin_id] = order
+            index += 1
+        return [coin_id for coin_id, _ in sorted(matches.items(), key=lambda item: item[1])[:limit]]
+
+    def resolve(self, text: str):
+        """Coin id for a typed value: an id picked from autocomplete, else the best match for the text"""
+        text = text.strip()
+        if text.isdigit() and int(text) in self.coins:
+            return int(text)
+        matches = self.search(text, limit=1)
+        return matches[0] if matches else None
+
+    def label(self, coin_id: int) -> str:
+        symbol, name, _ = self.coins[coin_id]
+        return f"{symbol} - {name}"[:100]
+
+    def __len__(self):
+        return len(self.coins)
+
+
+class PriceLookup:
+    """Answers /price from recent listings data or a short-TTL quote cache.
+
+    Concurrent lookups for the same coin share one upstream request, so a
+    burst of users asking for the same price costs a single CMC call.
+    """
+
+    def __init__(self, api_key: str, fetcher, listings=None, budget=None, ttl: float = None):
+        self.source = CMCQuoteLookup(api_key, budget)
+        self.fetcher = fetcher
+        self.listings = listings
+        self.ttl = ttl or getattr(config, "PRICE_CACHE_TTL", 60)
+        self.cache = {}
+        self._inflight = {}
+
+    def _from_listings(self, coin_id: int):
+        listings = self.listings
+        if listings is None or time.time() - listings.records_at > self.ttl:
+            return None
+        for record in listings.records:
+            if record.id == coin_id:
+                return record, listings.records_at
+        return None
+
+    async def get(self, coin_id: int):
+        """Return (ListingRecord, fetched_at) or (None, None)"""
+        recent = self._from_listings(coin_id)
+        if recent is not None:
+            return recent
+
+        cached = self.cache.get(coin_id)
+        if cached is not None and time.time() - cached[1] <= self.ttl:
+            return cached
+
+        task = self._inflight.get(coin_id)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(coin_id))
+            self._inflight[coin_id] = task
+            task.add_done_callback(lambda _: self._inflight.pop(coin_id, None))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, coin_id: int):
+        record = await self.source.fetch(self.fetcher, coin_id)
+        if record is None:
+            return None, None
+        entry = (record, time.time())
+        self.cache[coin_id] = entry
+        # Drop expired entries so the cache stays bounded by recent demand
+        if len(self.cache) > 512:
+            cutoff = time.time() - self.ttl
+            self.cache = {key: value for key, value in self.cache.items() if value[1] >= cutoff}
+        return entry
@@ -0,0 +1,149 @@
+import asyncio
+import contextlib
+import contextvars
+import itertools
+import json
+import logging
+import os
+import queue
+import time
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+import config
+
+
+# Trace (update cycle, command) the current task belongs to. Tasks started inside
+# it, like the shared fetch and its provider calls, inherit it.
+current_trace = contextvars.ContextVar("current_trace", default=None)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Queues the record as is; JSON encoding happens on the listener thread"""
+
+    def prepare(self, record):
+        return record
+
+
+class _JSONLineFormatter(logging.Formatter):
+    def format(self, record):
+        return json.dumps(record.msg, separators=(",", ":"), default=str)
+
+
+def percentile(ordered: list, pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class Tracer:
+    """Timed spans for each stage of a cycle, written as JSON lines and summarized in memory.
+
+    ``trace(kind)`` opens a trace (one update cycle or command) and ``span(stage)``
+    times one step inside it: a provider call, an HTTP request, a parse, a
+    render, a Discord edit. A span is a dict the caller can add attributes to
+    (byte counts, status, ``outcome``); it gets the duration, trace id and
+    outcome (``ok``, or ``error`` if the block raised) when it closes.
+
+    Records are handed to a QueueHandler, so the event loop never touches the
+    file; a QueueListener thread encodes them and writes them to a rotating
+    JSONL file. The last ``TRACE_SAMPLES`` durations of every stage are kept
+    for /perf-stats whether or not a file is being written.
+    """
+
+    def __init__(self, samples: int = None):
+        self.samples = samples or getattr(config, "TRACE_SAMPLES", 500)
+        self.stages = {}
+        self.logger = logging.getLogger("dashboard.trace")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.listener = None
+        self._handler = None
+        self._ids = itertools.count(1)
+
+    def start(self, path: str = None, max_bytes: int = None, backups: int = None) -> None:
+        """Start writing spans to ``path`` (rotated at ``max_bytes``) on a background thread"""
+        if self.listener is not None or not getattr(config, "TRACE_ENABLED", True):
+            return
+        path = path or getattr(config, "TRACE_PATH", "./logs/trace.jsonl")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        file_handler = RotatingFileHandler(
+            path,
+            maxBytes=max_bytes or getattr(config, "TRACE_MAX_BYTES", 5 * 2**20),
+            backupCount=backups if backups is not None else getattr(config, "TRACE_BACKUPS", 5),
+            encoding="utf-8",
+        )
+        file_handler.setFormatter(_JSONLineFormatter())
+        records = queue.SimpleQueue()
+        self._handler = _DeferredQueueHandler(records)
+        self.logger.addHandler(self._handler)
+        self.listener = QueueListener(records, file_handler)
+        self.listener.start()
+
+    def stop(self) -> None:
+        """Flush queued spans and close the file"""
+        if self.listener is None:
+            return
+        self.logger.removeHandler(self._handler)
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+        self.listener = None
+        self._handler = None
+
+    @contextlib.contextmanager
+    def trace(self, kind: str, **attrs):
+        """Open a new trace; spans inside it (and in tasks it starts) carry its id"""
+        token = current_trace.set(next(self._ids))
+        try:
+            with self.span(kind, **attrs) as span:
+                yield span
+        finally:
+            current_trace.reset(token)
+
+    @contextlib.contextmanager
+    def span(self, stage: str, **attrs):
+        span = {"stage": stage, **attrs}
+        started = time.perf_counter()
+        try:
+            yield span
+        except asyncio.CancelledError:
+            span.setdefault("outcome", "cancelled")
+            raise
+        except Exception as e:
+            span.setdefault("outcome", "error")
+            span.setdefault("error", str(e) or type(e).__name__)
+            raise
+        finally:
+            span["ms"] = round((time.perf_counter() - started) * 1000, 2)
+            span.setdefault("outcome", "ok")
+            self.record(span)
+
+    def record(self, span: dict) -> None:
+        stage = span["stage"]
+        samples = self.stages.get(stage)
+        if samples is None:
+            samples = self.stages[stage] = deque(maxlen=self.samples)
+        samples.append((span["ms"], span["outcome"] not in ("ok", "not_modified")))
+        if self.listener is not None:
+            span["trace"] = current_trace.get()
+            span["at"] = round(time.time(), 3)
+            self.logger.info(span)
+
+    def summary(self) -> dict:
+        """{stage: {"count", "p50", "p95", "p99", "errors"}} over the recent samples, durations in ms"""
+        result = {}
+        for stage, samples in self.stages.items():
+            ordered = sorted(ms for ms, _ in samples)
+            result[stage] = {
+                "count": len(ordered),
+                "p50": percentile(ordered, 50),
+                "p95": percentile(ordered, 95),
+                "p99": percentile(ordered, 99),
+                "errors": sum(failed for _, failed in samples),
+            }
+        return result
+
+
+# Shared by the fetcher, provider registry and cog, like the rate limiter's priority context
+tracer = Tracer()
@@ -0,0 +1,133 @@
+from datetime import datetime, timezone
+
+import discord
+
+import config
+from utils import formatting as fmt
+from utils.sources import STABLECOINS
+
+
+# Select value -> (menu label, listings field) for the performer windows
+WINDOWS = {
+    "performers:24h": ("Performers (24h)", "percent_change_24h"),
+    "performers:7d": ("Performers (7d)", "percent_change_7d"),
+    "performers:30d": ("Performers (30d)", "percent_change_30d"),
+}
+
+
+def detail_options() -> list:
+    options = [discord.SelectOption(label=label, value=key) for key, (label, _) in WINDOWS.items()]
+    options.append(discord.SelectOption(label="Derivatives by exchange", value="derivatives"))
+    for name in getattr(config, "WATCHLISTS", {}):
+        options.append(discord.SelectOption(label=f"Watchlist: {name}", value=f"watchlist:{name}"))
+    return options[:25]
+
+
+class DetailSelect(discord.ui.Select):
+    def __init__(self, render):
+        super().__init__(
+            custom_id="dashboard:detail",
+            placeholder="More detail...",
+            min_values=1,
+            max_values=1,
+            options=detail_options()
+        )
+        self.render = render
+
+    async def callback(self, interaction: discord.Interaction):
+        # Rendered from cached data only, so this always answers well inside the interaction deadline
+        await interaction.response.send_message(embed=self.render(self.values[0]), ephemeral=True)
+
+
+class DashboardView(discord.ui.View):
+    """Persistent components attached to every dashboard message.
+
+    The view has no timeout and a fixed custom_id, so registering one
+    instance with ``bot.add_view`` at startup makes every existing dashboard
+    message interactive again after a restart.
+    """
+
+    def __init__(self, render):
+        super().__init__(timeout=None)
+        self.select = DetailSelect(render)
+        self.add_item(self.select)
+
+    def rebind(self, render) -> None:
+        """Point the menu at a new render function; the view stays registered for every dashboard message"""
+        self.select.render = render
+
+
+def _embed(title: str, snapshot) -> discord.Embed:
+    return discord.Embed(
+        title=title,
+        color=0x5865F2,
+        timestamp=datetime.fromtimestamp(snapshot.taken_at, timezone.utc)
+    )
+
+
+def _movers(records: list, field: str, count: int = 10):
+    changes = [(record.symbol, getattr(record, field)) for record in records
+               if record.symbol not in STABLECOINS and getattr(record, field) is not None]
+    changes.sort(key=lambda item: item[1], reverse=True)
+    gainers = [item for item in changes[:count] if item[1] > 0]
+    losers = [item for item in changes[::-1][:count] if item[1] < 0]
+    return gainers, losers
+
+
+def render_performers(snapshot, records: list, key: str) -> discord.Embed:
+    label, field = WINDOWS[key]
+    embed = _embed(label, snapshot)
+    gainers, losers = _movers(records, field)
+    for title, movers in (("Top Gainers", gainers), ("Top Losers", losers)):
+        lines = [f"{rank}. {symbol}: {fmt.change(change)}" for rank, (symbol, change) in enumerate(movers, 1)]
+        embed.add_field(name=title, value=f"```\n{chr(10).join(lines) or 'No Data'}\n```", inline=True)
+    embed.set_footer(text=f"Top {len(records)} coins by market cap, stablecoins excluded")
+    return embed
+
+
+def render_derivatives(snapshot, quotes: dict) -> discord.Embed:
+    embed = _embed("Derivatives by Exchange", snapshot)
+    for asset in ("BTC", "ETH"):
+        lines = []
+        for exchange, by_asset in sorted(quotes.items()):
+            quote = by_asset.get(asset)
+            if quote is None:
+                continue
+            oi = fmt.billions(quote.open_interest) if quote.open_interest is not None else "N/A"
+            funding = f"{quote.funding:.4f}%" if quote.funding is not None else "N/A"
+            lines.append(f"{exchange:<8} OI ${oi:<7} FR {funding}")
+        total = fmt.field(snapshot, f"{asset}_OI", fmt.billions, "N/A", "N/A")
+        funding = fmt.field(snapshot, f"{asset}_FUNDING", fmt.decimals(4), "N/A", "N/A")
+        lines.append(f"{'total':<8} OI ${total:<7} FR {funding}%")
+        embed.add_field(name=asset, value=f"```\n{chr(10).join(lines)}\n```", inline=False)
+    embed.set_footer(text="Funding total is OI-weighted")
+    return embed
+
+
+def render_watchlist(snapshot, records: list, name: str) -> discord.Embed:
+    embed = _embed(f"Watchlist: {name}", snapshot)
+    by_symbol = {}
+    for record in records:
+        by_symbol.setdefault(record.symbol, record)
+
+    lines = []
+    for symbol in getattr(config, "WATCHLISTS", {}).get(name, []):
+        record = by_symbol.get(symbol)
+        if record is None or record.price is None:
+            lines.append(f"{symbol:<6} n/a")
+            continue
+        day = fmt.change(record.percent_change_24h) if record.percent_change_24h is not None else "n/a"
+        week = fmt.change(record.percent_change_7d) if record.percent_change_7d is not None else "n/a"
+        lines.append(f"{symbol:<6} ${fmt.price(record.price):<10} 24h {day:>8} 7d {week:>8}")
+    embed.description = f"```\n{chr(10).join(lines) or 'Empty watchlist'}\n```"
+    return embed
+
+
+def render_detail(key: str, snapshot, records: list, derivatives: dict) -> discord.Embed:
+    if key in WINDOWS:
+        return render_performers(snapshot, records, key)
+    if key == "derivatives":
+        return render_derivatives(snapshot, derivatives)
+    if key.startswith("watchlist:"):
+        return render_watchlist(snapshot, records, key.split(":", 1)[1])
+    return discord.Embed(title="Unknown view", color=discord.Color.red())